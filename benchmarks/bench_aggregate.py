@@ -0,0 +1,41 @@
+import pytest
+
+from tpp_toolkit.aggregate import county_results_by_race, party_slots, statewide_party_votes
+from tpp_toolkit.local import local_races
+from tpp_toolkit.views import (county_aggregates_by_state, house_aggregates, legislature_aggregates,
+                               presidential_aggregates)
+
+pytestmark = pytest.mark.benchmark(group="aggregate")
+
+
+@pytest.mark.parametrize("key", ["electNightUSH", "electNightStH"])
+def bench_party_slots(benchmark, tables, key):
+    benchmark(party_slots, tables[key])
+
+
+def bench_statewide_party_votes(benchmark, tables):
+    benchmark(statewide_party_votes, tables["electNightP"])
+
+
+def bench_county_results_by_race(benchmark, tables):
+    benchmark(county_results_by_race, tables["electNightP"])
+
+
+def bench_house_aggregates(benchmark, tables):
+    benchmark(house_aggregates, tables["electNightUSH"])
+
+
+def bench_legislature_aggregates(benchmark, tables):
+    benchmark(legislature_aggregates, tables["electNightStH"], "State House")
+
+
+def bench_presidential_aggregates(benchmark, tables):
+    benchmark(presidential_aggregates, tables["electNightP"])
+
+
+def bench_county_aggregates_by_state(benchmark, tables):
+    benchmark(county_aggregates_by_state, tables["electNightP"])
+
+
+def bench_local_races(benchmark, savefile):
+    benchmark(local_races, savefile)
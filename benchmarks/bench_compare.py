@@ -0,0 +1,27 @@
+import pytest
+
+from tpp_toolkit.columnar import build_tables
+from tpp_toolkit.compare import compare_counties, compare_races, rate_comparison
+from tpp_toolkit.synthetic import make_savefile
+
+pytestmark = pytest.mark.benchmark(group="compare")
+
+THRESHOLDS = (3, 7, 12)
+
+
+@pytest.fixture(scope="module")
+def other_tables():
+    return {key: build_tables(block) for key, block in make_savefile(seed=1).items()}
+
+
+def bench_compare_state_house(benchmark, tables, other_tables):
+    benchmark(compare_races, tables["electNightStH"], other_tables["electNightStH"], "State House Swing")
+
+
+def bench_compare_all_counties(benchmark, tables, other_tables):
+    benchmark(compare_counties, tables["electNightP"], other_tables["electNightP"], "President County Swing")
+
+
+def bench_rate_comparison(benchmark, tables, other_tables):
+    table = compare_counties(tables["electNightP"], other_tables["electNightP"], "President County Swing")
+    benchmark(rate_comparison, table, THRESHOLDS)
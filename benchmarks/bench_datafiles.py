@@ -0,0 +1,11 @@
+import pytest
+
+from tpp_toolkit.datafiles import FORMATS, to_bytes
+from tpp_toolkit.views import legislature_table
+
+pytestmark = pytest.mark.benchmark(group="datafiles")
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def bench_state_house_datafile(benchmark, tables, fmt):
+    benchmark(to_bytes, legislature_table(tables["electNightStH"], "State House", (3, 7, 12)), fmt)
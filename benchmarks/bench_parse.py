@@ -0,0 +1,33 @@
+import pytest
+
+from tpp_toolkit.columnar import build_tables
+from tpp_toolkit.ingest import ELECTION_KEYS, _LRU, content_hash, load_savefile
+from tpp_toolkit.savefile import extract_keys
+from tpp_toolkit.store import TableStore
+
+pytestmark = pytest.mark.benchmark(group="parse")
+
+
+def bench_extract_keys(benchmark, savefile_bytes):
+    benchmark(extract_keys, savefile_bytes, ELECTION_KEYS)
+
+
+@pytest.mark.parametrize("key", ["electNightUSH", "electNightStH", "electNightP", "electNightSB"])
+def bench_build_tables(benchmark, savefile, key):
+    benchmark(build_tables, savefile[key])
+
+
+@pytest.fixture(scope="module")
+def table_store(tmp_path_factory, savefile_bytes):
+    store = TableStore(str(tmp_path_factory.mktemp("store")))
+    load_savefile(savefile_bytes, _LRU(1), store=store)
+    return store
+
+
+def bench_open_stored(benchmark, table_store, savefile_bytes):
+    benchmark(load_savefile, savefile_bytes, _LRU(1), store=table_store)
+
+
+@pytest.mark.parametrize("key", ["electNightUSH", "electNightStH", "electNightP", "electNightSB"])
+def bench_read_stored_tables(benchmark, table_store, savefile_bytes, key):
+    benchmark(table_store.tables, content_hash(savefile_bytes), key)
@@ -0,0 +1,26 @@
+import pytest
+
+from tpp_toolkit.views import county_aggregates_by_state, legislature_aggregates, rate_table
+
+pytestmark = pytest.mark.benchmark(group="rating")
+
+THRESHOLDS = (3, 7, 12)
+
+
+@pytest.fixture(scope="module")
+def state_house(tables):
+    return legislature_aggregates(tables["electNightStH"], "State House")
+
+
+def bench_rate_table(benchmark, state_house):
+    benchmark(rate_table, state_house, THRESHOLDS)
+
+
+def bench_rate_all_states(benchmark, tables):
+    by_state = county_aggregates_by_state(tables["electNightP"])
+    benchmark(lambda: [rate_table(table, THRESHOLDS) for table in by_state.values()])
+
+
+def bench_display_frame(benchmark, state_house):
+    table = rate_table(state_house, THRESHOLDS)
+    benchmark(table.frame)
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from tpp_toolkit.colors import build_county_color_map, build_state_color_map
+from tpp_toolkit.counties import county_index
+from tpp_toolkit.svgassets import DEFAULT_SVG_DIR, minified_path
+from tpp_toolkit.svgmaps import element_id, load_template, state_region_id
+from tpp_toolkit.views import county_table, presidential_table
+
+pytestmark = pytest.mark.benchmark(group="svg")
+
+
+@pytest.fixture(scope="module")
+def texas(tables, colors):
+    presidential = tables["electNightP"]
+    race = presidential.races.index[presidential.races["state"] == "TX"][0]
+    table = county_table(presidential, race, (1, 5, 15))
+    asset_path = minified_path(os.path.join(DEFAULT_SVG_DIR, "tx.svg"))
+    ratings = table.frame()[["County", "Rating"]].iloc[:len(table.rows)]
+    return asset_path, ratings, build_county_color_map(ratings, *colors, county_index(asset_path))[0]
+
+
+@pytest.fixture(scope="module")
+def national(tables):
+    table = presidential_table(tables["electNightP"], (1, 5, 15))
+    return minified_path(os.path.join(DEFAULT_SVG_DIR, "presidential.svg")), table.frame()
+
+
+def bench_county_color_map(benchmark, texas, colors):
+    asset_path, ratings, _ = texas
+    benchmark(build_county_color_map, ratings, *colors, county_index(asset_path))
+
+
+def bench_state_color_map(benchmark, national, colors):
+    benchmark(build_state_color_map, national[1], *colors)
+
+
+def bench_county_render(benchmark, texas):
+    asset_path, _, color_map = texas
+    benchmark(load_template(asset_path).render, color_map, element_id)
+
+
+def bench_county_stylesheet(benchmark, texas):
+    asset_path, _, color_map = texas
+    benchmark(load_template(asset_path).stylesheet, color_map, element_id, ".tpp-map")
+
+
+def bench_national_render(benchmark, national, colors):
+    asset_path, frame = national
+    color_map = build_state_color_map(frame, *colors)
+    benchmark(load_template(asset_path).render, color_map, state_region_id)
@@ -0,0 +1,20 @@
+import pytest
+
+from tpp_toolkit.views import county_table, house_table, legislature_table
+from tpp_toolkit.xlsx import to_xlsx
+
+pytestmark = pytest.mark.benchmark(group="xlsx")
+
+
+def bench_house_xlsx(benchmark, tables):
+    benchmark(to_xlsx, house_table(tables["electNightUSH"], (1, 5, 15)))
+
+
+def bench_state_house_xlsx(benchmark, tables):
+    benchmark(to_xlsx, legislature_table(tables["electNightStH"], "State House", (3, 7, 12)))
+
+
+def bench_county_xlsx(benchmark, tables):
+    presidential = tables["electNightP"]
+    texas = presidential.races.index[presidential.races["state"] == "TX"][0]
+    benchmark(to_xlsx, county_table(presidential, texas, (1, 5, 15)))
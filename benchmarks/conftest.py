@@ -0,0 +1,39 @@
+"""Benchmarks of each stage, from savefile parsing to map recoloring.
+
+    pip install pytest pytest-benchmark
+    python -m pytest benchmarks
+    python -m pytest benchmarks --benchmark-autosave --benchmark-compare
+
+Every stage runs on the same real-world-sized synthetic savefile
+(``tpp_toolkit.synthetic``: 435 House, ~7,400 state legislative and ~3,100
+county rows per statewide race), generated once per session.  With
+``--benchmark-autosave`` each run is stored under ``.benchmarks/`` and
+``--benchmark-compare`` prints it next to the previous one.
+"""
+import json
+
+import pytest
+
+from tpp_toolkit.columnar import build_tables
+from tpp_toolkit.export import color_setting
+from tpp_toolkit.synthetic import make_savefile
+
+
+@pytest.fixture(scope="session")
+def savefile():
+    return make_savefile(seed=0)
+
+
+@pytest.fixture(scope="session")
+def savefile_bytes(savefile):
+    return json.dumps({"version": 1, **savefile}).encode("utf-8")
+
+
+@pytest.fixture(scope="session")
+def tables(savefile):
+    return {key: build_tables(block) for key, block in savefile.items()}
+
+
+@pytest.fixture(scope="session")
+def colors():
+    return color_setting()
@@ -1,210 +1,23 @@
 import streamlit as st
+import copy
 import json
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment
-from io import BytesIO
-from collections import defaultdict
 import os
-import streamlit.components.v1 as components
+from io import BytesIO
 import re
-from streamlit_javascript import st_javascript
-
-
-# --- Arrow-safe DataFrame helper (avoids PyArrow 'Expected bytes, got int' crash) ---
-def _arrow_safe_df(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    for col in df.columns:
-        s = df[col]
-        # If it's bytes or mixed objects, prefer safe string or numeric coercion
-        if s.dtype == object:
-            # Try numeric coercion; if mostly numeric, keep; else cast to string
-            try:
-                num = pd.to_numeric(s, errors="coerce")
-                if num.notna().sum() >= max(1, int(0.8 * len(s))):
-                    df[col] = num
-                else:
-                    df[col] = s.astype(str)
-            except Exception:
-                df[col] = s.astype(str)
-        else:
-            # bytes types -> strings for Arrow
-            try:
-                import numpy as np
-                if np.issubdtype(s.dtype, np.bytes_):
-                    df[col] = s.astype(str)
-            except Exception:
-                pass
-    # Ensure pandas 'string' dtype is realized as Python strings (Arrow-friendly)
-    try:
-        df = df.convert_dtypes()
-        for col in df.columns:
-            if str(df[col].dtype).startswith("string"):
-                df[col] = df[col].astype(str)
-    except Exception:
-        pass
-    return df
 
+# Only light modules here: pandas and the view builders load with the first
+# uploaded savefile, cairosvg with the first image export.
+from tpp_toolkit.graph import Graph
+from tpp_toolkit.ingest import ELECTION_KEYS, ELECTION_TYPES, load_savefile
+from tpp_toolkit.palette import DEFAULT_COLOR_SETTINGS
+from tpp_toolkit.raster import DPI_CHOICES, FORMATS as RASTER_FORMATS, RasterCache, available as raster_available, raster_key
+from tpp_toolkit.states import STATE_NAMES
+from tpp_toolkit.svgassets import map_catalog, minified_path
+from tpp_toolkit.svgmaps import element_id, export_svg, load_template, state_region_id
 
 
 st.set_page_config(page_title="TPP Election Toolkit", layout="wide")
 
-# === Color Generation Functions ===
-def normalize_county_id(name, state=None):
-    name = name.lower().strip()
-
-    # Remove generic suffixes
-    name = (name.replace(" census area", "")
-            .replace(" city and borough", "")
-            .replace(" municipality", "")
-            .replace(" borough", "")
-            .replace(" county", "")
-            .replace(" parish", " ")
-            .replace(" city", "")
-            .replace(".", "")
-            .replace("'", "")
-            .replace("-", "_")
-            .replace(" ", "_"))
-
-    # Fix common abbreviations
-    name = name.replace("st_", "st").replace("ste_", "ste")
-
-    # Strip trailing underscores
-    name = name.strip("_")
-
-    # Return normalized name
-    return name
-
-def build_state_color_map(df, dem_colors, rep_colors, ind_colors):
-    color_map = {}
-    rating_to_color = {
-        f"{strength} Democratic": dem_colors.get(strength, "#cccccc")
-        for strength in ["Safe", "Likely", "Lean", "Tilt"]
-    }
-    rating_to_color.update({
-        f"{strength} Republican": rep_colors.get(strength, "#cccccc")
-        for strength in ["Safe", "Likely", "Lean", "Tilt"]
-    })
-    rating_to_color.update({
-        f"{strength} Independent": ind_colors.get(strength, "#cccccc")
-        for strength in ["Safe", "Likely", "Lean", "Tilt"]
-    })
-
-    state_name_to_code = {
-        "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR",
-        "California": "CA", "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE",
-        "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID",
-        "Illinois": "IL", "Indiana": "IN", "Iowa": "IA", "Kansas": "KS",
-        "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
-        "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS",
-        "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV",
-        "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
-        "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK",
-        "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
-        "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT",
-        "Vermont": "VT", "Virginia": "VA", "Washington": "WA", "West Virginia": "WV",
-        "Wisconsin": "WI", "Wyoming": "WY", "District of Columbia": "DC"
-    }
-
-    for _, row in df.iterrows():
-        state = row.get("State", "")
-        rating = row.get("Rating", "")
-
-        if pd.isna(state) or pd.isna(rating):
-            continue
-
-        # Normalize state to 2-letter code
-        normalized = state.strip()
-        if len(normalized) > 2:  # convert full name to code
-            normalized = state_name_to_code.get(normalized, "")
-        else:
-            normalized = normalized.upper()
-
-        color = rating_to_color.get(rating.strip(), "#cccccc")
-        color_map[normalized] = color
-
-    return color_map
-
-def build_county_color_map(df, dem_colors, rep_colors, ind_colors):
-    color_map = {}
-    rating_to_color = {
-        f"{strength} Democratic": dem_colors.get(strength, "#cccccc")
-        for strength in ["Safe", "Likely", "Lean", "Tilt"]
-    }
-    rating_to_color.update({
-        f"{strength} Republican": rep_colors.get(strength, "#cccccc")
-        for strength in ["Safe", "Likely", "Lean", "Tilt"]
-    })
-    rating_to_color.update({
-        f"{strength} Independent": ind_colors.get(strength, "#cccccc")
-        for strength in ["Safe", "Likely", "Lean", "Tilt"]
-    })
-
-    for _, row in df.iterrows():
-        county = row.get("County", "")
-        rating = row.get("Rating", "")
-
-        if pd.isna(county) or pd.isna(rating):
-            continue
-
-        county = str(county).strip()
-        rating = str(rating).strip()
-
-        if not county or not rating:
-            continue
-
-        # Properly normalize county ID
-        county_id = normalize_county_id(county, state_code)
-        color = rating_to_color.get(rating, "#cccccc")
-        color_map[county_id] = color
-        color_map[f"{county_id}_city"] = color
-
-    return color_map
-
-def apply_state_colors_to_svg(svg_text, color_map):
-    def replace_fill(match):
-        tag = match.group(0)
-        tag_type = match.group(1)
-        tag_id = match.group(2)
-
-        # SVG uses 2-letter state codes like "NY" 
-        normalized_id = tag_id.strip().upper()
-        color = color_map.get(normalized_id)
-
-        if color:
-            if 'style=' in tag:
-                tag = re.sub(r'fill:[^;"]+', f'fill:{color}', tag)
-            else:
-                tag = tag.replace('>', f' style="fill:{color}">')
-        return tag
-
-    # Match all valid SVG shape tags
-    return re.sub(r'<(path|g|rect|polygon|polyline|circle)[^>]*id="([^"]+)"[^>]*>', replace_fill, svg_text)
-
-def apply_county_colors_to_svg(svg_text, color_map, state_code):
-    def replace_fill(match):
-        tag = match.group(0)
-        tag_type = match.group(1)
-        tag_id = match.group(2)
-
-        normalized_id = tag_id.strip().lower()
-
-        # Normalize county formatting
-        normalized_id = normalized_id.replace("-", "_").replace(" ", "_").replace("county", "").replace(".", "").replace("'", "")
-        normalized_id = normalized_id.replace("st_", "st").replace("ste_", "ste").strip("_")
-
-        color = color_map.get(normalized_id)
-        if color:
-            if 'style=' in tag:
-                tag = re.sub(r'fill:[^;"]+', f'fill:{color}', tag)
-            else:
-                tag = tag.replace('>', f' style="fill:{color}">')
-        return tag
-
-    # Apply fill color to matching SVG elements
-    return re.sub(r'<(path|g|rect|polygon|polyline|circle)[^>]*id="([^"]+)"[^>]*>', replace_fill, svg_text)
-
-
 def display_national_map(election_type):
     """Helper function to display national maps for President/Senate/Governor"""
     map_file = {
@@ -215,71 +28,118 @@ def display_national_map(election_type):
 
     if map_file:
         path = os.path.join("SVG", map_file)
-        if os.path.exists(path):
+        if map_file in svg_files:
             render_svg_file(path, title=f"🗺️ {election_type} National Map")
         else:
             st.warning(f"No national map found for {election_type}")
 
-def render_svg_file(svg_path: str, title: str = None, df_display=None, dem_colors=None, rep_colors=None, ind_colors=None, selected_state="National View", selected_election_type="Election"):
+def _finish_svg(svg_data):
+    """Root-tag edits shared by every map: black background, viewBox, responsive sizing.
+
+    Returns the document as downloaded and as displayed.
+    """
+    svg_data = export_svg(svg_data)
+    return svg_data, _display_svg(svg_data)
+
+def _display_svg(svg_data):
+    """``svg_data`` sized to fit its container."""
+    # Now do all styling edits in one pass
+    return re.sub(
+        r'<svg([^>]*)>',
+        lambda m: (
+            f'<svg{m.group(1)} preserveAspectRatio="xMidYMid meet" style="max-width: 100%; height: auto; display: block;">'
+            if 'style=' not in m.group(1)
+            else re.sub(
+                r'style="[^"]*"',
+                'style="max-width: 100%; height: auto; display: block;" preserveAspectRatio="xMidYMid meet"',
+                m.group(0)
+            )
+        ),
+        svg_data
+    )
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _static_map_markup(asset_path, scope="tpp-map"):
+    """Uncolored display markup of a map, built once per file (colors come as a stylesheet)."""
+    _, svg_display = _finish_svg(str(load_template(asset_path)))
+    return (
+        '<div style="display: flex; justify-content: center; align-items: center; width: 100%;">'
+        f'<div class="{scope}" style="width: 100%; max-width: 1000px;">{svg_display}</div></div>'
+    )
+
+def render_svg_file(svg_path: str, title: str = None, df_display=None, dem_colors=None, rep_colors=None, ind_colors=None, selected_state="National View", selected_election_type="Election", recolor="css", source=None, key=None):
+    """Show a map, colored from ``df_display`` when color schemes are given.
+
+    With ``recolor="css"`` the map markup is cached uncolored and the coloring
+    is a small stylesheet of ``#id { fill: ... }`` rules shown with it;
+    ``recolor="inline"`` writes the fills into the SVG.  Either way the map is
+    shown in a component iframe.  The downloaded SVG always has the fills
+    written in.
+
+    ``source`` is a recompute graph node producing ``df_display`` (see
+    ``view_nodes``); the color map, stylesheet and colored SVG are then nodes
+    downstream of it and are only rebuilt when the data, thresholds or colors change.
+
+    ``key`` tells apart two maps of the same file on one page (their
+    stylesheets and download widgets).
+    """
     import streamlit.components.v1 as components
-    import base64
-    import os
+    from tpp_toolkit.colors import build_county_color_map, build_state_color_map
+    from tpp_toolkit.counties import county_index
 
     try:
-        with open(svg_path, "r", encoding="utf-8") as f:
-            svg_data = f.read()
-            
-            # Add black background to SVG
-            svg_data = svg_data.replace('<svg', '<svg style="background-color: black;"')
+        # Maps are served from their minified copies (built on first use).
+        # Parsed once per file; recoloring only fills the template's region slots
+        asset_path = minified_path(svg_path)
+        template = load_template(asset_path)
 
         if title:
             st.subheader(title)
 
-        # Apply coloring if we have display data and color schemes
-        if df_display is not None and dem_colors and rep_colors and ind_colors:
-            # Choose map type based on filename
-            if "presidential" in svg_path or "states" in svg_path:
-                color_map = build_state_color_map(df_display, dem_colors, rep_colors, ind_colors)
-                svg_data = apply_state_colors_to_svg(svg_data, color_map)
-            else:
-                color_map = build_county_color_map(df_display, dem_colors, rep_colors, ind_colors)
-                svg_data = apply_county_colors_to_svg(svg_data, color_map, state_code)
-
-        encoded = base64.b64encode(svg_data.encode()).decode()
-
-        # === Apply proper SVG rendering rules ===
-        # 1. Only inject viewBox for national maps
-        # Inject viewBox if missing
-        if 'viewBox=' not in svg_data:
-            width_match = re.search(r'width="(\d+)"', svg_data)
-            height_match = re.search(r'height="(\d+)"', svg_data)
-            width = int(width_match.group(1)) if width_match else 1000
-            height = int(height_match.group(1)) if height_match else 600
-            svg_data = re.sub(r'<svg', f'<svg viewBox="0 0 {width} {height}"', svg_data)
-
-        # Now do all styling edits in one pass
-        svg_display = re.sub(
-            r'<svg([^>]*)>',
-            lambda m: (
-                f'<svg{m.group(1)} preserveAspectRatio="xMidYMid meet" style="max-width: 100%; height: auto; display: block;">'
-                if 'style=' not in m.group(1)
-                else re.sub(
-                    r'style="[^"]*"',
-                    'style="max-width: 100%; height: auto; display: block;" preserveAspectRatio="xMidYMid meet"',
-                    m.group(0)
-                )
-            ),
-            svg_data
-        )
-
-        components.html(
-                f"""
-                <div style="display: flex; justify-content: center; align-items: center; width: 100%;">
-                    <div style="width: 100%; max-width: 1000px;">
-                        {svg_display}
+        # Choose map type based on filename
+        national = "presidential" in svg_path or "states" in svg_path
+        normalize = state_region_id if national else element_id
+        scope = f"tpp-map-{key}" if key else "tpp-map"
+        color_key = None
+        if dem_colors and rep_colors and ind_colors:
+            color_key = tuple(tuple(colors.items()) for colors in (dem_colors, rep_colors, ind_colors))
+        if source is None:
+            source = Graph().node("frame", lambda: df_display)
+
+        def color_stage(frame):
+            # Apply coloring if we have display data and color schemes
+            if frame is None or color_key is None:
+                return {}, []
+            if national:
+                return build_state_color_map(frame, dem_colors, rep_colors, ind_colors), []
+            return build_county_color_map(frame, dem_colors, rep_colors, ind_colors, county_index(asset_path))
+
+        graph = source.graph
+        colored = graph.node("color_map", color_stage, source, params=(asset_path, color_key))
+        svg_node = graph.node("svg", lambda c: export_svg(template.render(c[0], normalize) if c[0] else str(template)),
+                              colored, params=(asset_path,))
+        color_map, unmatched = colored.value()
+        if unmatched:
+            st.caption(f"⚠️ Not on this map: {', '.join(unmatched)}")
+        svg_data = svg_node.value()
+
+        if recolor == "css":
+            # st.html sanitizes with an HTML-only profile that strips <svg>,
+            # so the stylesheet and markup go into the component iframe together.
+            stylesheet = graph.node("stylesheet",
+                                    lambda c: template.stylesheet(c[0], normalize, scope=f".{scope}"),
+                                    colored, params=(asset_path, scope)).value()
+            map_html = f"<style>{stylesheet}</style>{_static_map_markup(asset_path, scope)}"
+        else:
+            map_html = f"""
+                    <div style="display: flex; justify-content: center; align-items: center; width: 100%;">
+                        <div style="width: 100%; max-width: 1000px;">
+                            {_display_svg(svg_data)}
+                        </div>
                     </div>
-                </div>
-                """,
+                    """
+        components.html(
+                map_html,
                 height=825 if "ak" not in svg_path.lower() else 600,  # Alaska is wide, needs less height
                 scrolling=False
             )
@@ -289,24 +149,349 @@ def render_svg_file(svg_path: str, title: str = None, df_display=None, dem_color
         # Get state name from the selectbox, defaulting to "National_View" if not set
         state_name = st.session_state.get("select_state_box", "National_View")
 
+        file_stem = f"{state_name.replace(' ', '_')}_{selected_election_type.replace(' ', '_')}_Election"
         st.download_button(
             label="📥 Download Map (SVG)",
             data=svg_data.encode("utf-8"),
-            file_name=f"{state_name.replace(' ', '_')}_{selected_election_type.replace(' ', '_')}_Election.svg",
-            mime="image/svg+xml"
+            file_name=f"{file_stem}.svg",
+            mime="image/svg+xml",
+            key=f"{key}_svg_download" if key else None
         )
+        map_image_download(svg_data, asset_path, color_map, file_stem, key)
 
     except Exception as e:
         st.error(f"⚠️ Failed to render SVG: {e}")
 
+@st.cache_resource(show_spinner=False)
+def _raster_cache():
+    return RasterCache()
+
+def map_image_download(svg_data, asset_path, color_map, file_stem, widget_key=None):
+    """PNG/PDF download of the colored map, rendered in the background.
+
+    The first request starts a render and returns; the download button shows
+    up on a later rerun once the file is ready (renders are cached, so asking
+    again for the same map, colors and size is instant).
+    """
+    if not raster_available():
+        st.caption("PNG/PDF export needs cairosvg and the cairo library.")
+        return
+
+    widget_key = widget_key or os.path.basename(asset_path).split(".")[0]
+    col_format, col_dpi, col_action = st.columns([1, 1, 2])
+    fmt = col_format.selectbox("Image format", list(RASTER_FORMATS), format_func=str.upper,
+                               key=f"{widget_key}_raster_format")
+    dpi = col_dpi.selectbox("DPI", DPI_CHOICES, key=f"{widget_key}_raster_dpi", disabled=fmt != "png")
+
+    cache = _raster_cache()
+    key = raster_key(asset_path, color_map, fmt, dpi)
+    try:
+        data = cache.result(key)
+    except Exception as e:
+        st.error(f"⚠️ Failed to render map image: {e}")
+        data = None
+
+    with col_action:
+        if data is not None:
+            st.download_button(
+                label=f"📥 Download Map ({fmt.upper()})",
+                data=data,
+                file_name=f"{file_stem}.{fmt}",
+                mime=RASTER_FORMATS[fmt],
+                key=f"{widget_key}_raster_download"
+            )
+        elif cache.pending(key):
+            st.button("⏳ Rendering... check again", key=f"{widget_key}_raster_refresh")
+        elif st.button(f"🖼️ Render {fmt.upper()}", key=f"{widget_key}_raster_render"):
+            cache.submit(key, svg_data, fmt, dpi)
+            st.rerun()
+
 # === Map Generation ===
+# Listed once per process (and again only if the folder changes), not on every rerun
 svg_folder_path = os.path.join(os.getcwd(), "SVG")
-svg_files = [f for f in os.listdir(svg_folder_path) if f.endswith(".svg")]
+svg_files = map_catalog(svg_folder_path)
+
+@st.cache_resource(show_spinner=False)
+def _table_store():
+    from tpp_toolkit.store import TableStore
+
+    return TableStore()
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _cached_election_tables(digest, election_key, _block):
+    # A block of ``None`` was ingested into the table store (see IngestResult.stored)
+    if _block is None:
+        return _table_store().tables(digest, election_key)
+    from tpp_toolkit.columnar import build_tables
+
+    return build_tables(_block)
+
+
+def stored_or_reload(load, upload_key):
+    """``load()``; if the save was evicted from the table store since it was opened, a rerun
+    that ingests the upload under ``upload_key`` again."""
+    try:
+        return load()
+    except KeyError:
+        st.session_state.pop(upload_key, None)
+        st.rerun()
+
+
+def election_tables(election_key):
+    """Columnar tables for one electNight* block, shared across reruns and sessions."""
+    block = st.session_state["election_data"][election_key]
+    digest = st.session_state.get("election_digest")
+    if digest is None:
+        from tpp_toolkit.columnar import build_tables
+
+        return build_tables(block)
+    return stored_or_reload(lambda: _cached_election_tables(digest, election_key, block), "upload_file_id")
+
+
+def county_election_races(election_data):
+    """``local_races`` of the County Elections blocks, from the table store when the save is stored."""
+    from tpp_toolkit.local import local_races
+
+    if st.session_state.get("election_stored"):
+        digest = st.session_state["election_digest"]
+        return stored_or_reload(lambda: _table_store().local_races(digest), "upload_file_id")
+    return local_races(election_data)
+
+
+@st.cache_resource(show_spinner=False)
+def _recompute_graph():
+    return Graph(max_entries=64)
+
+
+def view_graph():
+    """``(graph, digest)``: the shared recompute graph, or a per-rerun one for saves without a digest."""
+    digest = st.session_state.get("election_digest")
+    return (Graph() if digest is None else _recompute_graph()), digest
+
+
+def view_nodes(election_key, aggregate, *args, thresholds, part=None):
+    """Recompute graph nodes ``(rated table, display frame)`` of one view.
+
+    ``aggregate(tables, *args)`` is computed once per uploaded save, ratings
+    once per ``thresholds`` on top of it, so moving a slider only redoes the
+    ratings and what depends on them.  When ``aggregate`` returns a dict of
+    tables (one per state), ``part`` picks the view's entry.  Saves without
+    a digest get a graph of their own that lives for this rerun.
+    """
+    from tpp_toolkit.views import rate_table
+
+    graph, digest = view_graph()
+    tables = graph.node("tables", lambda: election_tables(election_key), params=(digest, election_key))
+    base = graph.node("aggregates", lambda t: aggregate(t, *args), tables, params=(aggregate.__name__, args))
+    if part is not None:
+        base = graph.node("part", lambda parts: parts.get(part), base, params=(part,))
+    rated = graph.node("ratings", lambda b: None if b is None else rate_table(b, thresholds), base,
+                       params=tuple(thresholds))
+    frame = graph.node("frame", lambda t: None if t is None else t.frame(), rated)
+    return rated, frame
+
+
+def results_table(table, key, page_sizes=(50, 100, 250, 500)):
+    """``table`` filtered, sorted and paged on the server; only the visible page is sent to the browser."""
+    from tpp_toolkit.paging import FILTERS, filter_options, filter_rows, page, page_count, sort_rows
+
+    options = filter_options(table)
+    selected = {}
+    for col, (row_key, values) in zip(st.columns(len(options) or 1), options.items()):
+        with col:
+            selected[row_key] = st.multiselect(FILTERS[row_key], values, key=f"{key}_filter_{row_key}")
+
+    sortable = {column.key: label for column, label in zip(table.columns, table.labels())}
+    sort_col, order_col, size_col, page_col = st.columns([2, 1, 1, 1])
+    with sort_col:
+        sort_key = st.selectbox("Sort by", [None, *sortable], key=f"{key}_sort",
+                                format_func=lambda k: "View order" if k is None else sortable[k])
+    with order_col:
+        descending = st.checkbox("Descending", key=f"{key}_descending")
+    shown = sort_rows(filter_rows(table, selected), sort_key, descending)
+    with size_col:
+        page_size = st.selectbox("Rows per page", page_sizes, index=1, key=f"{key}_page_size")
+    pages = page_count(shown, page_size)
+    with page_col:
+        number = min(int(st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                                         key=f"{key}_page")), pages)
+
+    start = (number - 1) * page_size
+    st.caption(f"Rows {min(start + 1, len(shown.rows)):,}-{min(start + page_size, len(shown.rows)):,} "
+               f"of {len(shown.rows):,} · page {number} of {pages}")
+    st.dataframe(page(shown, number, page_size).styler(), use_container_width=True, hide_index=True)
+
+
+# Download formats of the result tables: the spreadsheet, and typed data files
+# for analysts (see tpp_toolkit.datafiles) that skip the workbook entirely.
+DOWNLOAD_FORMATS = {"xlsx": "XLSX", "parquet": "Parquet", "arrow": "Arrow IPC", "csv": "CSV"}
+
+
+def _table_file(table, fmt):
+    """``(data, mime type, extension)`` of ``table`` written as ``fmt``."""
+    if fmt == "xlsx":
+        from tpp_toolkit.xlsx import MIME_TYPE as XLSX_MIME_TYPE, to_xlsx
+
+        return to_xlsx(table), XLSX_MIME_TYPE, ".xlsx"
+    from tpp_toolkit.datafiles import EXTENSIONS, FORMATS, to_bytes
+
+    return to_bytes(table, fmt), FORMATS[fmt], EXTENSIONS[fmt]
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cached_table_file(digest, view_key, thresholds, fmt, _table):
+    return _table_file(_table, fmt)
+
+
+def spreadsheet_download(table, view_key, thresholds, label, file_name, key):
+    """Download button for ``table`` as XLSX, Parquet, Arrow IPC or CSV, built only once asked for.
+
+    Reruns never serialize the table: the file is generated when the user
+    prepares it and then cached per savefile, view, thresholds and format.
+    ``file_name``'s extension follows the chosen format.
+    """
+    format_col, action_col = st.columns([1, 3])
+    fmt = format_col.selectbox("Format", list(DOWNLOAD_FORMATS), format_func=DOWNLOAD_FORMATS.get,
+                               key=f"{key}_format", label_visibility="collapsed")
+    digest = st.session_state.get("election_digest")
+    cache_key = (digest, view_key, tuple(thresholds), fmt)
+    prepared = st.session_state.setdefault("prepared_downloads", set())
+    with action_col:
+        if cache_key not in prepared:
+            noun = "Spreadsheet" if fmt == "xlsx" else DOWNLOAD_FORMATS[fmt]
+            if not st.button(f"🧮 Prepare {noun}", key=f"{key}_prepare"):
+                return
+            prepared.add(cache_key)
+
+        with st.spinner("Building spreadsheet..." if fmt == "xlsx" else "Writing file..."):
+            if digest is None:
+                data, mime, extension = _table_file(table, fmt)
+            else:
+                data, mime, extension = _cached_table_file(digest, view_key, tuple(thresholds), fmt, table)
+        st.download_button(
+            label=label if fmt == "xlsx" else f"{label} ({DOWNLOAD_FORMATS[fmt]})",
+            data=data,
+            file_name=os.path.splitext(file_name)[0] + extension,
+            mime=mime,
+            key=key
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def _export_pool():
+    """Worker processes shared by every all-states export (``None`` on one CPU)."""
+    from tpp_toolkit.batch import export_pool
+
+    return export_pool()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _cached_states_zip(digest, election_key, election_type, thresholds, color_key, png_dpi, _tables, _colors):
+    from concurrent.futures.process import BrokenProcessPool
+    from tpp_toolkit.batch import export_states
+
+    stream = BytesIO()
+    pool = _export_pool()
+    try:
+        export_states(stream, _tables, election_type, thresholds, _colors, png_dpi=png_dpi, workers=0, pool=pool)
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool for the next export and finish this one here.
+        _export_pool.clear()
+        stream = BytesIO()
+        export_states(stream, _tables, election_type, thresholds, _colors, png_dpi=png_dpi, workers=0)
+    return stream.getvalue()
+
+
+def all_states_download(election_key, election_type, thresholds, colors):
+    """One ZIP with every state's county spreadsheet and colored county map (optionally PNGs)."""
+    with st.expander("📦 Export All States"):
+        png_dpi = None
+        if raster_available():
+            if st.checkbox("Include PNG maps", key=f"{election_key}_zip_png"):
+                png_dpi = st.selectbox("PNG DPI", DPI_CHOICES, key=f"{election_key}_zip_dpi")
+        color_key = tuple(tuple(sorted(c.items())) for c in colors)
+        cache_key = (st.session_state.get("election_digest"), election_key, tuple(thresholds), color_key, png_dpi)
+        prepared = st.session_state.setdefault("prepared_downloads", set())
+        if cache_key not in prepared:
+            if not st.button("🧮 Build All-States ZIP", key=f"{election_key}_zip_prepare"):
+                return
+            prepared.add(cache_key)
+        with st.spinner("Exporting every state..."):
+            data = _cached_states_zip(*cache_key[:2], election_type, *cache_key[2:], election_tables(election_key),
+                                      colors)
+        st.download_button(
+            label="📥 Download All States (ZIP)",
+            data=data,
+            file_name=f"{election_type.replace(' ', '_')}_All_States.zip",
+            mime="application/zip",
+            key=f"{election_key}_zip_download"
+        )
+
+
+def compare_view(election_type, thresholds, state_code=None, colors=None):
+    """Swing from the uploaded save to the comparison save for one election type.
+
+    The national view compares race by race; a state view compares that
+    state's counties, sliced from one join over every county.  Both saves'
+    tables and the join are graph nodes, so paging, filtering and moving
+    the threshold sliders only redo the ratings.  Statewide types also get a
+    map colored by swing when ``colors`` are given.
+    """
+    from tpp_toolkit.compare import compare_counties, compare_races, comparison_summary, rate_comparison, swing_frame
+    from tpp_toolkit.paging import filter_rows
+
+    election_key = ELECTION_TYPES[election_type]
+    compare_data = st.session_state["compare_data"]
+    compare_digest = st.session_state["compare_digest"]
+    if election_key not in compare_data:
+        st.info(f"The comparison save has no {election_type} results.")
+        return
+
+    graph, digest = view_graph()
+    base = graph.node("tables", lambda: election_tables(election_key), params=(digest, election_key))
+    other = graph.node("tables", lambda: stored_or_reload(
+        lambda: _cached_election_tables(compare_digest, election_key, compare_data[election_key]), "compare_file_id"),
+                       params=(compare_digest, election_key))
+    statewide = election_type in ("President", "Senate", "Governor")
+    if state_code is None:
+        title = f"{election_type} Swing"
+        joined = graph.node("swing", lambda b, o: compare_races(b, o, title, statewide), base, other,
+                            params=("races", title))
+    else:
+        title = f"{STATE_NAMES[state_code]} {election_type} County Swing"
+        joined = graph.node("swing", lambda b, o: compare_counties(b, o, f"{election_type} County Swing"),
+                            base, other, params=("counties", election_type))
+        joined = graph.node("part", lambda t: filter_rows(t, {"state": [STATE_NAMES[state_code]]}), joined,
+                            params=(state_code,))
+    rated = graph.node("ratings", lambda t: rate_comparison(t, thresholds), joined, params=tuple(thresholds))
+    table = rated.value()
+
+    st.subheader(f"🔀 {title} vs. {st.session_state.get('compare_name', 'comparison save')}")
+    summary = comparison_summary(table)
+    toward = "D" if summary["mean_swing"] >= 0 else "R"
+    st.caption(f"{summary['compared']:,} of {summary['rows']:,} {'counties' if state_code else 'races'} in both saves · "
+               f"{summary['flips']:,} flips · {summary['rating_changes']:,} rating changes · "
+               f"mean swing {toward}+{abs(summary['mean_swing']):.2f}")
+    view_key = f"compare_{election_key}_{state_code or 'national'}"
+    results_table(table, key=view_key)
+    spreadsheet_download(
+        table, ("Compare", election_type, state_code, compare_digest), thresholds,
+        label="📥 Download Swing Spreadsheet",
+        file_name=f"{(state_code + '_') if state_code else ''}{election_type.replace(' ', '_')}_Swing.xlsx",
+        key=view_key
+    )
+
+    if statewide and colors:
+        map_file = f"{state_code.lower()}.svg" if state_code else ("presidential.svg" if election_type == "President"
+                                                                   else "states.svg")
+        if map_file in svg_files:
+            dem_colors, rep_colors, ind_colors = colors
+            render_svg_file(os.path.join("SVG", map_file), title="🗺️ Swing Map", dem_colors=dem_colors,
+                            rep_colors=rep_colors, ind_colors=ind_colors,
+                            selected_election_type=f"{election_type} Swing",
+                            source=graph.node("swing_map", swing_frame, rated), key=view_key)
+
 
-# Categorize them
-pres_svg = "presidential.svg" in svg_files
-states_svg = "states.svg" in svg_files
-state_svgs = sorted([f for f in svg_files if f not in ("presidential.svg", "states.svg")])
 
 # Initialize session
 if "election_data" not in st.session_state:
@@ -322,26 +507,7 @@ if "likely_max" not in st.session_state:
 
 # Initialize color settings
 if "color_settings" not in st.session_state:
-    st.session_state["color_settings"] = {
-      "Democratic": {
-        "Tilt": "#949BB3",
-        "Lean": "#8AAFFF",
-        "Likely": "#577CCC",
-        "Safe": "#1C408C"
-      },
-      "Republican": {
-        "Tilt": "#CF8980",
-        "Lean": "#FF8B98",
-        "Likely": "#FF5865",
-        "Safe": "#BF1D29"
-      },
-      "Independent": {
-        "Tilt": "#FEF4B4",
-        "Lean": "#FED463",
-        "Likely": "#FE9929",
-        "Safe": "#CC4C02"
-      }
-    }
+    st.session_state["color_settings"] = copy.deepcopy(DEFAULT_COLOR_SETTINGS)
 
 st.title("🗳️ TPP Election Toolkit")
 
@@ -349,55 +515,70 @@ st.title("🗳️ TPP Election Toolkit")
 uploaded_file = st.file_uploader("Upload your savefile", type=["json"])
 
 if uploaded_file:
-    try:
-        raw_data = uploaded_file.read()
+    # Reruns keep the same file_id, so the upload is only read and hashed once;
+    # identical content uploaded again is served from the ingest cache, and a
+    # save processed before (by any instance sharing the store) from the table store.
+    if st.session_state.get("upload_file_id") != uploaded_file.file_id:
         try:
-            data = json.loads(raw_data)
-        except json.JSONDecodeError as e:
-            st.error(f"Invalid JSON file: {str(e)}")
-            st.error(f"Invalid JSON file: {str(e)}")
-            st.stop()
-
-        wanted_keys = [
-            "electNightSB", "electNightCC", "electNightM",
-            "electNightStH", "electNightStS", "electNightG",
-            "electNightUSH", "electNightUSS", "electNightP"
-        ]
+            try:
+                ingest = load_savefile(uploaded_file.getvalue(), store=_table_store())
+            except json.JSONDecodeError as e:
+                st.error(f"Invalid JSON file: {str(e)}")
+                st.stop()
+            st.session_state["upload_file_id"] = uploaded_file.file_id
+            st.session_state["election_digest"] = ingest.digest
+            st.session_state["ingest_stats"] = {
+                "payload_bytes": ingest.payload_bytes,
+                "parse_seconds": ingest.parse_seconds,
+                "cache_hit": ingest.cache_hit,
+                "stored": ingest.stored,
+            }
+            st.session_state["election_stored"] = ingest.stored
+            st.session_state["election_data"] = ingest.election_data
+        except Exception as e:
+            st.error(f"Failed to process election data: {str(e)}")
 
-        try:
-            extracted_data = {k: data[k] for k in wanted_keys if k in data}
-            if not any(k in data for k in wanted_keys):
-                st.warning("No election data found in file. Expected at least one of: " + ", ".join(wanted_keys))
-                st.session_state["election_data"] = {}
+    if not st.session_state["election_data"]:
+        st.warning("No election data found in file. Expected at least one of: " + ", ".join(ELECTION_KEYS))
+    else:
+        st.success("Election data extracted successfully.")
+        stats = st.session_state.get("ingest_stats")
+        if stats:
+            if stats["cache_hit"] and stats.get("stored"):
+                st.caption(f"Savefile: {stats['payload_bytes'] / 1_000_000:.1f} MB, "
+                           "opened from the table store without parsing")
             else:
-                st.session_state["election_data"] = extracted_data
-                st.success("Election data extracted successfully.")
+                source = "reused cached parse of" if stats["cache_hit"] else "parsed in"
+                st.caption(f"Savefile: {stats['payload_bytes'] / 1_000_000:.1f} MB, "
+                           f"{source} {stats['parse_seconds'] * 1000:.0f} ms (skipped on reruns)")
+
+with st.expander("🔀 Compare with another save"):
+    compare_file = st.file_uploader("Savefile to compare against", type=["json"], key="compare_upload")
+    if compare_file is None:
+        # Removing the file ends the comparison
+        if st.session_state.pop("compare_file_id", None) is not None:
+            st.session_state.pop("compare_data", None)
+    elif st.session_state.get("compare_file_id") != compare_file.file_id:
+        try:
+            compare_ingest = load_savefile(compare_file.getvalue(), store=_table_store())
+            st.session_state["compare_file_id"] = compare_file.file_id
+            st.session_state["compare_digest"] = compare_ingest.digest
+            st.session_state["compare_name"] = compare_file.name
+            st.session_state["compare_data"] = compare_ingest.election_data
         except Exception as e:
-            st.error(f"Failed to process election data: {str(e)}")
-    except Exception as e:
-        st.error(f"Failed to process election data: {str(e)}")
+            st.error(f"Failed to process comparison save: {str(e)}")
+    if st.session_state.get("compare_data"):
+        st.caption(f"Each view below is followed by its swing from this save to {st.session_state['compare_name']}.")
 
 # Initialize session state for selected state
 if "selected_state" not in st.session_state:
     st.session_state.selected_state = "National View"
 
 if st.session_state["election_data"]:
+    from tpp_toolkit.views import (county_aggregates_by_state, house_aggregates, legislature_aggregates,
+                                       presidential_aggregates, statewide_aggregates)
 
-    state_code_to_name = {
-        "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas",
-        "CA": "California", "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware",
-        "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho",
-        "IL": "Illinois", "IN": "Indiana", "IA": "Iowa", "KS": "Kansas",
-        "KY": "Kentucky", "LA": "Louisiana", "ME": "Maine", "MD": "Maryland",
-        "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota", "MS": "Mississippi",
-        "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
-        "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
-        "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma",
-        "OR": "Oregon", "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina",
-        "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah",
-        "VT": "Vermont", "VA": "Virginia", "WA": "Washington", "WV": "West Virginia",
-        "WI": "Wisconsin", "WY": "Wyoming", "DC": "District of Columbia"
-    }
+    state_code_to_name = STATE_NAMES
     
     # election types: now County Elections uses a list of keys
     election_types = {
@@ -448,39 +629,6 @@ if st.session_state["election_data"]:
                 election_key = election_types[selected_election_type]
                 election_data = st.session_state["election_data"][election_key]
 
-        def assign_rating(margin, winner, tilt_max, lean_max, likely_max):
-            if margin <= tilt_max:
-                level = "Tilt"
-            elif margin <= lean_max:
-                level = "Lean"
-            elif margin <= likely_max:
-                level = "Likely"
-            else:
-                level = "Safe"
-            return f"{level} {winner}"
-
-        def update_df_with_custom_ratings(df, tilt_max=None, lean_max=None, likely_max=None):
-            df = df.copy()
-            if "Rating" in df.columns and "Margin %" in df.columns:
-                # Use session state values if not provided
-                tilt = tilt_max if tilt_max is not None else st.session_state.get("tilt_max", 3)
-                lean = lean_max if lean_max is not None else st.session_state.get("lean_max", 7)
-                likely = likely_max if likely_max is not None else st.session_state.get("likely_max", 12)
-
-                df["Rating"] = df.apply(
-                    lambda row: assign_rating(
-                        abs(float(str(row["Margin %"]).strip("%"))),
-                        row["Rating"].split()[-1] if isinstance(row["Rating"], str) else "",
-                        tilt, lean, likely
-                    )
-                    if pd.notna(row.get("Rating")) and "%" in str(row["Margin %"])
-                    else row.get("Rating", ""),
-                    axis=1
-                )
-            return df
-
-        entries_to_convert = []
-
         # === U.S. House National View Spreadsheet Generator ===
         if selected_election_type == "U.S. House":
             # Margin thresholds for House - now using session state
@@ -488,217 +636,24 @@ if st.session_state["election_data"]:
             lean_max = st.slider("Lean Margin Max (%)", 5, 10, 5, key="house_lean")
             likely_max = st.slider("Likely Margin Max (%)", 10, 20, 15, key="house_likely")
 
-            from collections import defaultdict
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "U.S. House National View"
-
-            entries = election_data.get("elections", [])
-            party_labels = {"D": "Democratic", "R": "Republican", "I": "Independent"}
-            party_order = ["D", "R", "I"]
-            seats_won = {party: 0 for party in party_order} # Added to track seats won
-
-            # === Header Rows ===
-            ws.cell(row=2, column=1, value="State")
-            ws.cell(row=2, column=2, value="District")
-            col = 3
-            for party in party_order:
-                ws.cell(row=1, column=col, value=party_labels[party])
-                ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 2)
-                ws.cell(row=2, column=col, value="Candidate")
-                ws.cell(row=2, column=col + 1, value="#")
-                ws.cell(row=2, column=col + 2, value="%")
-                col += 3
-
-            ws.cell(row=1, column=col, value="Margins & Rating")
-            ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 3)
-            ws.cell(row=2, column=col, value="Margin #")
-            ws.cell(row=2, column=col + 1, value="Margin %")
-            ws.cell(row=2, column=col + 2, value="Total Vote")
-            ws.cell(row=2, column=col + 3, value="Rating")
-
-            for r in range(1, 3):
-                for c in range(1, col + 4):
-                    cell = ws.cell(row=r, column=c)
-                    cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal="center")
-
-            row_idx = 3
-            totals = {party: 0 for party in party_order}
-            grand_total = 0
-
-            for entry in entries:
-                state = entry.get("state", "??")
-                district = entry.get("district", "?")
-                ws.cell(row=row_idx, column=1, value=state)
-                ws.cell(row=row_idx, column=2, value=district)
-
-                # Group candidates by party
-                party_groups = defaultdict(list)
-                for c in entry.get("cands", []):
-                    party_groups[c["party"]].append(c)
-
-                # Determine winner
-                all_cands = sorted(entry.get("cands", []), key=lambda x: x["votes"], reverse=True)
-                winner = all_cands[0]["name"] if all_cands else None
-                winner_party = all_cands[0]["party"] if all_cands else None
-
-                # Prepare vote summary by party
-                party_votes = {}
-                party_names = {}
-                total_vote = sum(c["votes"] for c in entry.get("cands", []))
-
-                for party in party_order:
-                    candidates = sorted(party_groups.get(party, []), key=lambda x: x["votes"], reverse=True)
-                    if not candidates:
-                        party_names[party] = ""
-                        party_votes[party] = 0
-                        continue
-
-                    if len(candidates) == 1:
-                        party_names[party] = candidates[0]["name"]
-                        party_votes[party] = candidates[0]["votes"]
-                    else:
-                        if candidates[0]["name"] == winner:
-                            combined = sum(c["votes"] for c in candidates)
-                            party_names[party] = candidates[0]["name"]
-                            party_votes[party] = combined
-                        else:
-                            party_names[party] = candidates[0]["name"]
-                            party_votes[party] = candidates[0]["votes"]
-                            # Move lowest-vote candidate to Independent
-                            lowest = candidates[-1]
-                            # Safely initialize Independent party
-                            if "I" not in party_votes:
-                                party_votes["I"] = 0
-                            if "I" not in party_names:
-                                party_names["I"] = ""
-                            party_names["I"] = lowest["name"]
-                            party_votes["I"] += lowest["votes"]
-
-                col_idx = 3
-                for party in party_order:
-                    name = party_names.get(party, "")
-                    votes = int(round(party_votes.get(party, 0)))
-                    pct = round(votes / total_vote * 100, 2) if total_vote else 0
-
-                    ws.cell(row=row_idx, column=col_idx, value=name)
-                    ws.cell(row=row_idx, column=col_idx + 1, value=f"{votes:,}")
-                    ws.cell(row=row_idx, column=col_idx + 2, value=f"{pct:.2f}%")
-
-                    totals[party] += votes
-                    col_idx += 3
-
-                sorted_votes = sorted(party_votes.items(), key=lambda x: x[1], reverse=True)
-                margin = int(round(sorted_votes[0][1] - (sorted_votes[1][1] if len(sorted_votes) > 1 else 0)))
-                margin_pct = round(margin / total_vote * 100, 2) if total_vote else 0
-                rating = assign_rating(margin_pct, party_labels.get(sorted_votes[0][0], sorted_votes[0][0]), tilt_max, lean_max, likely_max)
-
-                ws.cell(row=row_idx, column=col_idx, value=f"{margin:,}")
-                ws.cell(row=row_idx, column=col_idx + 1, value=f"{margin_pct:.2f}%")
-                ws.cell(row=row_idx, column=col_idx + 2, value=f"{int(round(total_vote)):,}")
-                ws.cell(row=row_idx, column=col_idx + 3, value=rating)
-
-                if winner_party:
-                    seats_won[winner_party] +=1 #update seats won
-
-                grand_total += total_vote
-                row_idx += 1
-
-            # === Totals Row ===
-            ws.cell(row=row_idx, column=1, value="TOTALS")
-            ws.cell(row=row_idx, column=2, value="")
-            col_idx = 3
-            for party in party_order:
-                total = totals[party]
-                pct = round(total / grand_total * 100, 2) if grand_total else 0
-                ws.cell(row=row_idx, column=col_idx, value=f"{seats_won[party]} seats")
-                ws.cell(row=row_idx, column=col_idx + 1, value=f"{total:,}")
-                ws.cell(row=row_idx, column=col_idx + 2, value=f"{pct:.2f}%")
-                col_idx += 3
-
-            # Calculate margin for totals row
-            sorted_totals = sorted(totals.items(), key=lambda x: x[1], reverse=True)
-            margin_total = sorted_totals[0][1] - (sorted_totals[1][1] if len(sorted_totals) > 1 else 0)
-            margin_pct_total = round(margin_total / grand_total * 100, 2) if grand_total else 0
-            winner_party = sorted_totals[0][0]
-            rating = assign_rating(margin_pct_total, party_labels.get(winner_party, winner_party), tilt_max, lean_max, likely_max)
-
-            ws.cell(row=row_idx, column=col_idx, value=f"{margin_total:,}")
-            ws.cell(row=row_idx, column=col_idx + 1, value=f"{margin_pct_total:.2f}%")
-            ws.cell(row=row_idx, column=col_idx + 2, value=f"{int(round(grand_total)):,}")
-            ws.cell(row=row_idx, column=col_idx + 3, value=rating)
-
-            for c in range(1, col_idx + 4):
-                ws.cell(row=row_idx, column=c).font = Font(bold=True)
+            thresholds = (tilt_max, lean_max, likely_max)
+            rated, _ = view_nodes(election_types["U.S. House"], house_aggregates, thresholds=thresholds)
+            table = rated.value()
 
             # === Streamlit Display ===
-            from io import BytesIO
             st.subheader("🧾 U.S. House National View")
-            file_stream = BytesIO()
-            wb.save(file_stream)
-            file_stream.seek(0)
-
-            # Convert worksheet to displayable rows
-            excel_rows = []
-            for row in ws.iter_rows(min_row=1, max_row=ws.max_row, values_only=True):
-                excel_rows.append(list(row))
-
-            header_row = []
-            data_rows = []
-
-            if len(excel_rows) >= 2:
-                row1 = excel_rows[0]
-                row2 = excel_rows[1]
-                used_names = {}
-
-                for col1, col2 in zip(row1, row2):
-                    if col1 and col2:
-                        label = f"{col1} - {col2}"
-                    elif col1:
-                        label = str(col1)
-                    elif col2:
-                        label = str(col2)
-                    else:
-                        label = "Unnamed"
-
-                    if label in used_names:
-                        count = used_names[label] + 1
-                        used_names[label] = count
-                        label = f"{label} ({count})"
-                    else:
-                        used_names[label] = 1
-
-                    header_row.append(label)
-
-                data_rows = excel_rows[2:]
-
-            # Show dataframe
-            if header_row and data_rows:
-                df_display = pd.DataFrame(data_rows, columns=header_row)
-                # Convert all numeric-like strings to numeric values
-                df_display = df_display.pipe(_arrow_safe_df)
-                # Apply custom ratings based on session state thresholds
-                df_display = update_df_with_custom_ratings(
-                    df_display,
-                    tilt_max,
-                    lean_max,
-                    likely_max
-                )
-                st.dataframe(df_display, use_container_width=True)
+            results_table(table, key="house_national_view")
 
             # Download button
-            st.download_button(
+            spreadsheet_download(
+                table, "U.S. House", thresholds,
                 label="📥 Download House Spreadsheet",
-                data=file_stream,
                 file_name="House_National_View.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 key="house_national_view"
             )
 
         elif selected_election_type in ["President", "Senate", "Governor"]:
-            available_states = [entry.get("state") for entry in election_data.get("elections", [])]
-            available_states = sorted(set(available_states))
+            available_states = sorted(set(election_tables(election_key).races["state"].dropna().astype(str)))
             state_options = ["National View"] + [state_code_to_name.get(code, code) for code in available_states]
             selected_state = st.selectbox(
                 "Select State",
@@ -796,208 +751,32 @@ if st.session_state["election_data"]:
             if selected_state != "National View":
                 state_code = next((code for code, name in state_code_to_name.items() if name == selected_state), None)
                 if state_code:
-                    state_entries = [entry for entry in election_data.get("elections", []) if entry.get("state") == state_code]
-                    if state_entries:
-                        state_entry = state_entries[0]
-                        counties = state_entry.get("counties", [])
-                        spreadsheet_rows = []
-
-                        for county in counties:
-                            county_name = county.get("name", "Unknown County")
-                            for cand in county.get("cands", []):
-                                spreadsheet_rows.append({
-                                    "State": state_code,
-                                    "County": county_name,
-                                    "Candidate": cand.get("name", ""),
-                                    "Party": cand.get("party", ""),
-                                    "Votes": cand.get("votes", 0),
-                                    "Incumbent": cand.get("incumbent", False),
-                                    "Caucus": cand.get("caucus", ""),
-                                })
-
-                        if spreadsheet_rows:
-                            df = pd.DataFrame(spreadsheet_rows)
-
-                            wb = Workbook()
-                            ws = wb.active
-                            ws.title = f"{state_code} County Results"
-
-                            # === Create party blocks dynamically from candidates ===
-                            party_labels = {"D": "Democratic", "R": "Republican", "I": "Independent"}
-
-                            candidates = state_entry.get("cands", [])
-                            party_to_candidates = {}
-
-                            for cand in candidates:
-                                party = cand["party"]
-                                if party not in party_to_candidates:
-                                    party_to_candidates[party] = []
-                                party_to_candidates[party].append(cand["name"])
-
-                            party_order = list(party_to_candidates.keys())
-
-                            # === Header rows ===
-                            ws.cell(row=2, column=1, value="County")
-                            col = 2
-
-                            for party in party_order:
-                                full_party_name = party_labels.get(party, party)
-                                candidate_names = party_to_candidates[party]
-
-                                span = len(candidate_names) * 2
-                                if span > 0:
-                                    ws.cell(row=1, column=col, value=full_party_name)
-                                    ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + span - 1)
-
-                                    for cand in candidate_names:
-                                        ws.cell(row=2, column=col, value=cand)
-                                        ws.cell(row=2, column=col + 1, value="%")
-                                        col += 2
-
-                            ws.cell(row=1, column=col, value="Margins & Rating")
-                            ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 3)
-                            ws.cell(row=2, column=col, value="Margin #")
-                            ws.cell(row=2, column=col + 1, value="Margin %")
-                            ws.cell(row=2, column=col + 2, value="Total Vote")
-                            ws.cell(row=2, column=col + 3, value="Rating")
-
-                            # Format headers
-                            for r in range(1, 3):
-                                for c in range(1, col + 4):
-                                    cell = ws.cell(row=r, column=c)
-                                    cell.font = Font(bold=True)
-                                    cell.alignment = Alignment(horizontal="center", vertical="center")
-
-                            # === Data rows ===
-                            row_idx = 3
-                            ordered_candidates = [(party, name) for party in party_order for name in party_to_candidates[party]]
-                            candidate_totals = {cand_name: 0 for _, cand_name in ordered_candidates}
-
-                            for county in counties:
-                                clean_name = county.get("name", "Unknown County").replace(" County", "").title()
-                                ws.cell(row=row_idx, column=1, value=clean_name)
-
-                                vote_map = {c["name"]: round(c["votes"], 2) for c in county.get("cands", [])}
-                                total_vote = sum(vote_map.values())
-                                vote_values = []
-
-                                col = 2
-                                for _, candidate_name in ordered_candidates:
-                                    v = int(round(vote_map.get(candidate_name, 0)))
-                                    pct = round(v / total_vote * 100, 2) if total_vote else 0
-                                    ws.cell(row=row_idx, column=col, value="{:,}".format(v))
-                                    ws.cell(row=row_idx, column=col + 1, value="{:.2f}%".format(pct))
-                                    candidate_totals[candidate_name] += v
-                                    vote_values.append((candidate_name, v))
-                                    col += 2
-
-                                vote_values.sort(key=lambda x: x[1], reverse=True)
-                                margin = vote_values[0][1] - vote_values[1][1] if len(vote_values) > 1 else vote_values[0][1]
-                                margin_pct = round(margin / total_vote * 100, 2) if total_vote else 0
-                                winner = vote_values[0][0]
-                                winner_party = next((c["party"] for c in candidates if c["name"] == winner), "?")
-                                rating = assign_rating(margin_pct, party_labels.get(winner_party, winner_party), tilt_max, lean_max, likely_max)
-
-                                ws.cell(row=row_idx, column=col, value="{:,}".format(margin))
-                                ws.cell(row=row_idx, column=col + 1, value="{:.2f}%".format(margin_pct))
-                                ws.cell(row=row_idx, column=col + 2, value="{:,}".format(int(round(total_vote))))
-                                ws.cell(row=row_idx, column=col + 3, value=rating)
-                                row_idx += 1
-
-                            # === Totals row ===
-                            ws.cell(row=row_idx, column=1, value="TOTALS")
-                            grand_total = sum(candidate_totals.values())
-                            col = 2
-                            for _, cand_name in ordered_candidates:
-                                v = int(round(candidate_totals[cand_name]))
-                                pct = round(v / grand_total * 100, 2) if grand_total else 0
-                                ws.cell(row=row_idx, column=col, value="{:,}".format(v))
-                                ws.cell(row=row_idx, column=col + 1, value="{:.2f}%".format(pct))
-                                col += 2
-
-                            # Margin/Rating
-                            sorted_totals = sorted(candidate_totals.items(), key=lambda x: x[1], reverse=True)
-                            top = sorted_totals[0][1]
-                            second = sorted_totals[1][1] if len(sorted_totals) > 1 else 0
-                            margin = top - second
-                            margin_pct = round(margin / grand_total * 100, 2) if grand_total else 0
-                            winner_party = next((c["party"] for c in candidates if c["name"] == sorted_totals[0][0]), "?")
-                            rating = assign_rating(margin_pct, party_labels.get(winner_party, winner_party), tilt_max, lean_max, likely_max)
-
-                            ws.cell(row=row_idx, column=col, value="{:,}".format(margin))
-                            ws.cell(row=row_idx, column=col + 1, value="{:.2f}%".format(margin_pct))
-                            ws.cell(row=row_idx, column=col + 2, value="{:,}".format(int(round(grand_total))))
-                            ws.cell(row=row_idx, column=col + 3, value=rating)
-
-                        from openpyxl.styles import Font
-
-                        # Bold Totals row
-                        for col_idx in range(1, col + 4):
-                            ws.cell(row=row_idx, column=col_idx).font = Font(bold=True)
-
-                        # Save file to memory
-                        file_stream = BytesIO()
-                        wb.save(file_stream)
-                        file_stream.seek(0)
-
-                        # === DISPLAY FORMATTED PREVIEW IN STREAMLIT ===
-                        # Collect rows from worksheet
-                        excel_rows = []
-                        for row in ws.iter_rows(min_row=1, max_row=ws.max_row, values_only=True):
-                            excel_rows.append(list(row))
-
-                            # Merge row 1 and 2 into a single header string with uniqueness
-                        header_row = []
-                        if len(excel_rows) >= 2:
-                            row1 = excel_rows[0]
-                            row2 = excel_rows[1]
-                            used_names = {}
-
-                            for col1, col2 in zip(row1, row2):
-                                if col1 and col2:
-                                    label = f"{col1} - {col2}"
-                                elif col1:
-                                    label = str(col1)
-                                elif col2:
-                                    label = str(col2)
-                                else:
-                                    label = "Unnamed"
-
-                                if label in used_names:
-                                    count = used_names[label] + 1
-                                    used_names[label] = count
-                                    label = f"{label} ({count})"
-                                else:
-                                    used_names[label] = 1
-
-                                header_row.append(label)
-
-                        # Use remaining rows as data
-                        data_rows = excel_rows[2:]
-
-                        # Display in Streamlit
-                        df_display = pd.DataFrame(data_rows, columns=header_row)
-                        # Convert all numeric-like strings to numeric values
-                        df_display = df_display.pipe(_arrow_safe_df)
+                    # Every state's county table is aggregated once; switching states is a lookup
+                    thresholds = (tilt_max, lean_max, likely_max)
+                    rated, frame = view_nodes(election_types[selected_election_type], county_aggregates_by_state,
+                                              thresholds=thresholds, part=state_code)
+                    table = rated.value()
+                    if table is not None:
+                        df_display = frame.value()
                         st.subheader(f"🧾 {selected_state} County-Level Results")
-                        st.dataframe(df_display, use_container_width=True)
+                        st.dataframe(table.styler(df_display), use_container_width=True)
 
                         # Create download button (one time only)
-                        st.download_button(
-                            label="📥 Download County-Level Spreadsheet", 
-                            data=file_stream,
-                            file_name = f"{state_code}_{selected_election_type}_County_Results.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        spreadsheet_download(
+                            table, (selected_election_type, state_code), thresholds,
+                            label="📥 Download County-Level Spreadsheet",
+                            file_name=f"{state_code}_{selected_election_type}_County_Results.xlsx",
                             key=f"county_download_{state_code}"
                         )
 
                         # Show county-level map
                         svg_filename = f"{state_code.lower()}.svg"
                         svg_path = os.path.join("SVG", svg_filename)
-                        if os.path.exists(svg_path):
+                        if svg_filename in svg_files:
                             # Extract County and Rating from displayed df
-                            coloring_df = df_display[["County", "Rating"]].copy()
-                            render_svg_file(svg_path, title="🗺️ County-Level Map", df_display=coloring_df, dem_colors=dem_colors, rep_colors=rep_colors, ind_colors=ind_colors, selected_election_type=selected_election_type)
+                            coloring = frame.graph.node("coloring", lambda t, f: f[["County", "Rating"]].iloc[:len(t.rows)],
+                                                        rated, frame)
+                            render_svg_file(svg_path, title="🗺️ County-Level Map", dem_colors=dem_colors, rep_colors=rep_colors, ind_colors=ind_colors, selected_election_type=selected_election_type, source=coloring)
                         else:
                             st.warning(f"❌ No county-level map found for {state_code}")
                     else:
@@ -1006,393 +785,47 @@ if st.session_state["election_data"]:
                     st.warning("Selected state not found.")
             else:
                 # === Presidential National View Spreadsheet ===
-                entries_to_convert = election_data.get("elections", [])
-
                 if selected_election_type == "President":
-                    wb = Workbook()
-                    ws = wb.active
-                    ws.title = "Presidential National View"
-
-                    candidates = []
-                    party_labels = {"D": "Democratic", "R": "Republican", "I": "Independent"}
-                    party_to_candidate = {}
-
-                    # Extract candidate names and parties
-                    if entries_to_convert:
-                        first_entry = entries_to_convert[0]
-                        for cand in first_entry.get("cands", []):
-                            party = cand["party"]
-                            name = cand["name"]
-                            party_to_candidate[party] = name
-
-                        candidate_parties = list(party_to_candidate.keys())
-
-                        # === Header rows ===
-                        ws.cell(row=2, column=1, value="State")
-                        ws.cell(row=2, column=2, value="Electoral Votes")
-                        col = 3
-
-                        for party in candidate_parties:
-                            full_party = party_labels.get(party, party)
-                            candidate = party_to_candidate[party]
-
-                            ws.cell(row=1, column=col, value=full_party)
-                            ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 2)
-
-                            ws.cell(row=2, column=col, value=candidate)  # Raw votes
-                            ws.cell(row=2, column=col + 1, value="%")
-                            ws.cell(row=2, column=col + 2, value="#")
-                            col += 3
-
-                        ws.cell(row=1, column=col, value="Margins & Rating")
-                        ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 3)
-                        ws.cell(row=2, column=col, value="Margin #")
-                        ws.cell(row=2, column=col + 1, value="Margin %")
-                        ws.cell(row=2, column=col + 2, value="Total Vote")
-                        ws.cell(row=2, column=col + 3, value="Rating")
-
-                        for r in range(1, 3):
-                            for c in range(1, col + 4):
-                                cell = ws.cell(row=r, column=c)
-                                cell.font = Font(bold=True)
-                                cell.alignment = Alignment(horizontal="center", vertical="center")
-
-                        # === Data Rows ===
-                        row_idx = 3
-                        total_votes = {p: 0 for p in candidate_parties}
-                        electoral_totals = {p: 0 for p in candidate_parties}
-
-                        all_states = {e["state"]: e for e in entries_to_convert}
-
-                        for state_code in state_code_to_name:
-                            entry = all_states.get(state_code)
-                            if not entry:
-                                continue
-
-                            ws.cell(row=row_idx, column=1, value=state_code_to_name[state_code])
-                            state_votes = {c["name"]: c["votes"] for c in entry["cands"]}
-                            party_votes = {c["party"]: c["votes"] for c in entry["cands"]}
-                            party_names = {c["party"]: c["name"] for c in entry["cands"]}
-
-                            total = sum(party_votes.values())
-                            # Set raw electoral votes column (column 2)
-                            state_electoral_votes = sum(c.get("electoralVotes", 0) for c in entry.get("cands", []))
-                            ws.cell(row=row_idx, column=2, value=state_electoral_votes)
-
-                            sorted_parties = sorted(party_votes.items(), key=lambda x: x[1], reverse=True)
-                            winner_party = sorted_parties[0][0]
-                            margin = int(round(sorted_parties[0][1] - (sorted_parties[1][1] if len(sorted_parties) > 1 else 0)))
-                            margin_pct = round(margin / total * 100, 2) if total else 0
-                            rating = assign_rating(margin_pct, party_labels.get(winner_party, winner_party), tilt_max, lean_max, likely_max)
-
-                            col = 3
-                            for p in candidate_parties:
-                                v = int(round(party_votes.get(p, 0)))
-                                pct = round(v / total * 100, 2) if total else 0
-                                candidate_name = party_to_candidate[p]
-
-                                candidate_ev = next((c.get("electoralVotes", 0) for c in entry.get("cands", []) if c["name"] == candidate_name), 0)
-                                display_ev = candidate_ev if p == winner_party else "-"
-
-                                ws.cell(row=row_idx, column=col, value=f"{v:,}")                      # Raw votes
-                                ws.cell(row=row_idx, column=col + 1, value=f"{pct:.2f}%")            # %
-                                ws.cell(row=row_idx, column=col + 2, value=display_ev)               # Electoral votes
-                                total_votes[p] += v
-                                if p == winner_party:
-                                    electoral_totals[p] += candidate_ev
-                                col += 3
-
-                            ws.cell(row=row_idx, column=col, value=f"{margin:,}")
-                            ws.cell(row=row_idx, column=col + 1, value=f"{margin_pct:.2f}%")
-                            ws.cell(row=row_idx, column=col + 2, value=f"{int(round(total)):,}")
-                            ws.cell(row=row_idx, column=col + 3, value=rating)
-                            row_idx += 1
-
-                        # === Totals row ===
-                        ws.cell(row=row_idx, column=1, value="TOTALS")
-                        # Correctly sum the electoral votes
-                        total_ev = sum(int(ws.cell(row=r, column=2).value or 0) for r in range(3, row_idx))
-                        ws.cell(row=row_idx, column=2, value=total_ev)
-
-                        col = 3
-                        grand_total = sum(total_votes.values())
-                        sorted_totals = sorted(total_votes.items(), key=lambda x: x[1], reverse=True)
-                        winner_party = sorted_totals[0][0]
-                        top = sorted_totals[0][1]
-                        second = sorted_totals[1][1] if len(sorted_totals) > 1 else 0
-                        margin = int(round(top - second))
-                        margin_pct = round(margin / grand_total * 100, 2) if grand_total else 0
-                        rating = assign_rating(margin_pct, party_labels.get(winner_party, winner_party), tilt_max, lean_max, likely_max)
-
-                        for p in candidate_parties:
-                            raw_total = total_votes[p]
-                            ws.cell(row=row_idx, column=col, value=f"{raw_total:,}")  # Vote total
-                            pct = round(raw_total / grand_total * 100, 2) if grand_total else 0
-                            ws.cell(row=row_idx, column=col + 1, value=f"{pct:.2f}%")
-                            ws.cell(row=row_idx, column=col + 2, value=electoral_totals[p])  # Electoral votes total
-                            col += 3
-
-                        # Calculate margins first
-                        margin_total = sorted_totals[0][1] - (sorted_totals[1][1] if len(sorted_totals) >1 > 1 else 0)
-                        margin_pct_total = round(margin_total / grand_total* 100, 2) if grand_total else 0
-
-                        # Then use the calculated values
-                        ws.cell(row=row_idx, column=col, value=f"{margin_total:,}")
-                        ws.cell(row=row_idx, column=col + 1, value=f"{margin_pct_total:.2f}%")
-                        ws.cell(row=row_idx, column=col + 2, value=f"{int(round(grand_total)):,}")
-                        ws.cell(row=row_idx, column=col + 3, value=rating)
-
-                        for c in range(1, col + 4):
-                            ws.cell(row=row_idx, column=c).font = Font(bold=True)
-
-                    # Save to buffer
-                    file_stream = BytesIO()
-                    wb.save(file_stream)
-                    file_stream.seek(0)
-
-                    # === DISPLAY PREVIEW ===
-                    excel_rows = []
-                    for row in ws.iter_rows(min_row=1, max_row=ws.max_row, values_only=True):
-                        excel_rows.append(list(row))
-
-                    header_row = []
-                    if len(excel_rows) >= 2:
-                        row1 = excel_rows[0]
-                        row2 = excel_rows[1]
-                        used_names = {}
-
-                        for col1, col2 in zip(row1, row2):
-                            if col1 and col2:
-                                label = f"{col1} - {col2}"
-                            elif col1:
-                                label = str(col1)
-                            elif col2:
-                                label = str(col2)
-                            else:
-                                label ="Unnamed"
-
-                            if label in used_names:
-                                count = used_names[label] + 1
-                                used_names[label] = count
-                                label = f"{label} ({count})"
-                            else:
-                                used_names[label] = 1
-
-                            header_row.append(label)
-
-                    data_rows = excel_rows[2:]
-                    df_display = pd.DataFrame(data_rows, columns=header_row)
-                    # Convert all numeric-like strings to numeric values
-                    df_display = df_display.pipe(_arrow_safe_df)
+                    thresholds = (tilt_max, lean_max, likely_max)
+                    rated, frame = view_nodes(election_types["President"], presidential_aggregates, thresholds=thresholds)
+                    table = rated.value()
+                    df_display = frame.value()
 
                     st.subheader("🧾 Presidential National View")
-                    st.dataframe(df_display, use_container_width=True)
+                    st.dataframe(table.styler(df_display), use_container_width=True)
 
-                    st.download_button(
+                    spreadsheet_download(
+                        table, "President", thresholds,
                         label="📥 Download Presidential Spreadsheet",
-                        data=file_stream,
                         file_name="Presidential_National_View.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         key="president_national_view"
                     )
 
                     # === Presidential National View Map ===
                     pres_path = os.path.join("SVG", "presidential.svg")
-                    if os.path.exists(pres_path):
-                        render_svg_file(pres_path, title="🗺️ Presidential National Map", df_display=df_display, dem_colors=dem_colors, rep_colors=rep_colors, ind_colors=ind_colors)
+                    if "presidential.svg" in svg_files:
+                        render_svg_file(pres_path, title="🗺️ Presidential National Map", dem_colors=dem_colors, rep_colors=rep_colors, ind_colors=ind_colors, source=frame)
                     else:
                         st.warning("No national map found for President.")
+
+                    all_states_download(election_types["President"], "President", thresholds,
+                                        (dem_colors, rep_colors, ind_colors))
                 # === Senate/Governor National View Spreadsheet Generator ===
                 elif selected_election_type in ["Senate", "Governor"] and selected_state == "National View":
-                    from collections import defaultdict
-                    wb = Workbook()
-                    ws = wb.active
-                    ws.title = f"{selected_election_type} National View"
-
-                    entries = election_data.get("elections", [])
-                    party_labels = {"D": "Democratic", "R": "Republican", "I": "Independent"}
-                    party_order = ["D", "R", "I"]
-                    seats_won = {party: 0 for party in party_order}
-
-                    # === Header Rows ===
-                    ws.cell(row=2, column=1, value="State")
-                    col = 2
-                    for party in party_order:
-                        ws.cell(row=1, column=col, value=party_labels[party])
-                        ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 2)
-                        ws.cell(row=2, column=col, value="Candidate")
-                        ws.cell(row=2, column=col + 1, value="#")
-                        ws.cell(row=2, column=col + 2, value="%")
-                        col += 3
-
-                    ws.cell(row=1, column=col, value="Margins & Rating")
-                    ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 3)
-                    ws.cell(row=2, column=col, value="Margin #")
-                    ws.cell(row=2, column=col + 1, value="Margin %")
-                    ws.cell(row=2, column=col + 2, value="Total Vote")
-                    ws.cell(row=2, column=col + 3, value="Rating")
-
-                    for r in range(1, 3):
-                        for c in range(1, col + 4):
-                            cell = ws.cell(row=r, column=c)
-                            cell.font = Font(bold=True)
-                            cell.alignment = Alignment(horizontal="center")
-
-                    row_idx = 3
-                    totals = {party: 0 for party in party_order}
-                    grand_total = 0
-
-                    for entry in entries:
-                        state = state_code_to_name.get(entry.get("state", "???"), entry.get("state", "???"))
-                        ws.cell(row=row_idx, column=1, value=state)
-
-                        # Group candidates by party
-                        party_groups = defaultdict(list)
-                        for c in entry.get("cands", []):
-                            party_groups[c["party"]].append(c)
-
-                        # Determine winner
-                        all_cands = sorted(entry.get("cands", []), key=lambda x: x["votes"], reverse=True)
-                        winner = all_cands[0]["name"] if all_cands else None
-                        winner_party = all_cands[0]["party"] if all_cands else None
-
-                        # Prepare vote summary by party
-                        party_votes = {}
-                        party_names = {}
-                        total_vote = sum(c["votes"] for c in entry.get("cands", []))
-
-                        for party in party_order:
-                            candidates = sorted(party_groups.get(party, []), key=lambda x: x["votes"], reverse=True)
-                            if not candidates:
-                                party_names[party] = ""
-                                party_votes[party] = 0
-                                continue
-
-                            if len(candidates) == 1:
-                                party_names[party] = candidates[0]["name"]
-                                party_votes[party] = candidates[0]["votes"]
-                            else:
-                                if candidates[0]["name"] == winner:
-                                    combined = sum(c["votes"] for c in candidates)
-                                    party_names[party] = candidates[0]["name"]
-                                    party_votes[party] = combined
-                                else:
-                                    party_names[party] = candidates[0]["name"]
-                                    party_votes[party] = candidates[0]["votes"]
-                                    # Move lowest-vote candidate to Independent
-                                    lowest = candidates[-1]
-                                    # Safely initialize Independent party
-                                    if "I" not in party_votes:
-                                        party_votes["I"] = 0
-                                    if "I" not in party_names:
-                                        party_names["I"] = ""
-                                    party_names["I"] = lowest["name"]
-                                    party_votes["I"] += lowest["votes"]
-
-                        col_idx = 2
-                        for party in party_order:
-                            name = party_names.get(party, "")
-                            votes = int(round(party_votes.get(party, 0)))
-                            pct = round(votes / total_vote * 100, 2) if total_vote else 0
-
-                            ws.cell(row=row_idx, column=col_idx, value=name)
-                            ws.cell(row=row_idx, column=col_idx + 1, value=f"{votes:,}")
-                            ws.cell(row=row_idx, column=col_idx + 2, value=f"{pct:.2f}%")
-
-                            totals[party] += votes
-                            col_idx += 3
-
-                        sorted_votes = sorted(party_votes.items(), key=lambda x: x[1], reverse=True)
-                        margin = int(round(sorted_votes[0][1] - (sorted_votes[1][1] if len(sorted_votes) > 1 else 0)))
-                        margin_pct = round(margin / total_vote * 100, 2) if total_vote else 0
-                        winner_party = sorted_votes[0][0]
-                        if winner_party in seats_won:
-                            seats_won[winner_party] += 1
-                        rating = assign_rating(margin_pct, party_labels.get(winner_party, winner_party), tilt_max, lean_max, likely_max)
-
-                        ws.cell(row=row_idx, column=col_idx, value=f"{margin:,}")
-                        ws.cell(row=row_idx, column=col_idx + 1, value=f"{margin_pct:.2f}%")
-                        ws.cell(row=row_idx, column=col_idx + 2, value=f"{int(round(total_vote)):,}")
-                        ws.cell(row=row_idx, column=col_idx + 3, value=rating)
-
-                        grand_total += total_vote
-                        row_idx += 1
-
-                    # === Totals Row ===
-                    ws.cell(row=row_idx, column=1, value="TOTALS")
-                    col_idx = 2
-                    for party in party_order:
-                        total = totals[party]
-                        pct = round(total / grand_total * 100, 2) if grand_total else 0
-                        ws.cell(row=row_idx, column=col_idx, value=f"{seats_won[party]} seats")
-                        ws.cell(row=row_idx, column=col_idx + 1, value=f"{total:,}")
-                        ws.cell(row=row_idx, column=col_idx + 2, value=f"{pct:.2f}%")
-                        col_idx += 3
-
-                    # Calculate margin for totals row
-                    sorted_totals = sorted(totals.items(), key=lambda x: x[1], reverse=True)
-                    margin_total = sorted_totals[0][1] - (sorted_totals[1][1] if len(sorted_totals) > 1 else 0)
-                    margin_pct_total = round(margin_total / grand_total * 100, 2) if grand_total else 0
-                    winner_party = sorted_totals[0][0]
-                    rating = assign_rating(margin_pct_total, party_labels.get(winner_party, winner_party), tilt_max, lean_max, likely_max)
-
-                    ws.cell(row=row_idx, column=col_idx, value=f"{margin_total:,}")
-                    ws.cell(row=row_idx, column=col_idx + 1, value=f"{margin_pct_total:.2f}%")
-                    ws.cell(row=row_idx, column=col_idx + 2, value=f"{int(round(grand_total)):,}")
-                    ws.cell(row=row_idx, column=col_idx + 3, value=rating)
-
-                    for c in range(1, col_idx + 4):
-                        ws.cell(row=row_idx, column=c).font = Font(bold=True)
+                    thresholds = (tilt_max, lean_max, likely_max)
+                    rated, frame = view_nodes(election_types[selected_election_type], statewide_aggregates,
+                                              selected_election_type, thresholds=thresholds)
+                    table = rated.value()
 
                     # === Streamlit Display ===
                     st.subheader(f"🧾 {selected_election_type} National View")
-                    file_stream = BytesIO()
-                    wb.save(file_stream)
-                    file_stream.seek(0)
-
-                    # === Convert Excel data to preview ===
-                    excel_rows = []
-                    for row in ws.iter_rows(min_row=1, max_row=ws.max_row, values_only=True):
-                        excel_rows.append(list(row))
-
-                    header_row = []
-                    if len(excel_rows) >= 2:
-                        row1 = excel_rows[0]
-                        row2 = excel_rows[1]
-                        used_names = {}
-
-                        for col1, col2 in zip(row1, row2):
-                            if col1 and col2:
-                                label = f"{col1} - {col2}"
-                            elif col1:
-                                label = str(col1)
-                            elif col2:
-                                label = str(col2)
-                            else:
-                                label = "Unnamed"
-
-                            if label in used_names:
-                                count = used_names[label] + 1
-                                used_names[label] = count
-                                label = f"{label} ({count})"
-                            else:
-                                used_names[label] = 1
-
-                            header_row.append(label)
-
-                    data_rows = excel_rows[2:]
-                    df_display = pd.DataFrame(data_rows, columns=header_row)
-                    # Convert all numeric-like strings to numeric values
-                    df_display = df_display.pipe(_arrow_safe_df)
+                    df_display = frame.value()
+                    st.dataframe(table.styler(df_display), use_container_width=True)
 
-                    st.subheader(f"🧾 {selected_election_type} National View")
-                    st.dataframe(df_display, use_container_width=True)
-
-                    st.download_button(
+                    spreadsheet_download(
+                        table, selected_election_type, thresholds,
                         label=f"📥 Download {selected_election_type} Spreadsheet",
-                        data=file_stream,
                         file_name=f"{selected_election_type.replace(' ', '_')}_National_View.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         key=f"{selected_election_type.lower().replace(' ', '_')}_national_view"
                     )
 
@@ -1402,219 +835,74 @@ if st.session_state["election_data"]:
                     if selected_state == "National View":
                         if selected_election_type == "President":
                             pres_path = os.path.join("SVG", "presidential.svg")
-                            if os.path.exists(pres_path):
+                            if "presidential.svg" in svg_files:
                                 render_svg_file(pres_path, title="🗺️ Presidential National Map", df_display=df_display, dem_colors=dem_colors, rep_colors=rep_colors, indcolors=ind_colors)
                         elif selected_election_type in ["Senate", "Governor"]:
                             states_path = os.path.join("SVG", "states.svg")
-                            if os.path.exists(states_path):
-                                render_svg_file(states_path, title=f"🗺️ {selected_election_type} National Map", df_display=df_display, dem_colors=dem_colors, rep_colors=rep_colors, ind_colors=ind_colors)
+                            if "states.svg" in svg_files:
+                                render_svg_file(states_path, title=f"🗺️ {selected_election_type} National Map", dem_colors=dem_colors, rep_colors=rep_colors, ind_colors=ind_colors, source=frame)
+
+                    all_states_download(election_types[selected_election_type], selected_election_type, thresholds,
+                                        (dem_colors, rep_colors, ind_colors))
 
 
         # === State Legislature National View Spreadsheet Generator ===
         elif selected_election_type in ["State House", "State Senate"]:
 
-            from collections import defaultdict
             data_key = "electNightStH" if selected_election_type == "State House" else "electNightStS"
-            wb = Workbook()
-            ws = wb.active
-            ws.title = f"{selected_election_type} National View"
-
-            entries = sorted(election_data.get("elections", []), key=lambda x: int(x.get("district", 0)))
-            party_labels = {"D": "Democratic", "R": "Republican", "I": "Independent"}
-            party_order = ["D", "R", "I"]
-            seats_won = {"D": 0, "R": 0, "I": 0}  # Initialize seats counter
-
-            # === Header Rows ===
-            ws.cell(row=1, column=1, value="District")
-            ws.merge_cells(start_row=1, start_column=1, end_row=2, end_column=1)
-            col = 2
-            for party in party_order:
-                ws.cell(row=1, column=col, value=party_labels[party])
-                ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 2)
-                ws.cell(row=2, column=col, value="Candidate")
-                ws.cell(row=2, column=col + 1, value="#")
-                ws.cell(row=2, column=col + 2, value="%")
-                col += 3
-
-            ws.cell(row=1, column=col, value="Margins & Rating")
-            ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 3)
-            ws.cell(row=2, column=col, value="Margin #")
-            ws.cell(row=2, column=col + 1, value="Margin %")
-            ws.cell(row=2, column=col + 2, value="Total Vote")
-            ws.cell(row=2, column=col + 3, value="Rating")
-
-            for r in range(1, 3):
-                for c in range(1, col + 4):
-                    cell = ws.cell(row=r, column=c)
-                    cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal="center")
-
-            row_idx = 3
-            totals= {party: 0 for party in party_order}
-            grand_total = 0
-
-            district_counter= 1
-            for entry in entries:
-                ws.cell(row=row_idx, column=1, value=district_counter)
-                district_counter += 1
-
-                # Group candidates by party and find winner
-                party_groups = defaultdict(list)
-                # Findwinner based on vote count
-                candidates = sorted(entry.get("cands", []), key=lambda x: x["votes"], reverse=True)
-                if candidates:
-                    winner = candidates[0]["name"]
-                    winner_party = candidates[0]["party"]
-                    if winner_party in seats_won:
-                        seats_won[winner_party] += 1
-
-                # Group candidates by party
-                for c in entry.get("cands", []):
-                            party_groups[c["party"]].append(c)
-
-                # Prepare vote summary by party
-                party_votes = {}
-                party_names = {}
-                total_vote = sum(c["votes"] for c in entry.get("cands", []))
-
-                for party in party_order:
-                    candidates = sorted(party_groups.get(party, []), key=lambda x: x["votes"], reverse=True)
-                    if not candidates:
-                        party_names[party] = ""
-                        party_votes[party] = 0
-                        continue
-
-                    if len(candidates) == 1:
-                        party_names[party] = candidates[0]["name"]
-                        party_votes[party] = candidates[0]["votes"]
-                    else:
-                        winner_in_group = next((c for c in candidates if c["name"] == winner), None)
-                        if winner_in_group:
-                            combined = sum(c["votes"] for c in candidates)
-                            party_names[party]= candidates[0]["name"]
-                            party_votes[party] = combined
-                        else:
-                            party_names[party] = candidates[0]["name"]
-                            party_votes[party] = candidates[0]["votes"]
-                            # Move lowest-vote candidate to Independent
-                            lowest = candidates[-1]
-                            # Safely initialize Independent party
-                            if "I" not in party_votes:
-                                party_votes["I"] = 0
-                            if "I" not in party_names:
-                                party_names["I"] = ""
-                            party_names["I"] = lowest["name"]
-                            party_votes["I"] += lowest["votes"]
-
-                col_idx = 2
-                for party in party_order:
-                    name = party_names.get(party, "")
-                    votes = int(round(party_votes.get(party, 0)))
-                    pct = round(votes / total_vote * 100, 2) if total_vote else 0
-
-                    ws.cell(row=row_idx, column=col_idx, value=name)
-                    ws.cell(row=row_idx, column=col_idx + 1, value=f"{votes:,}")
-                    ws.cell(row=row_idx, column=col_idx + 2, value=f"{pct:.2f}%")
-
-                    totals[party] += votes
-                    col_idx += 3
-
-                sorted_votes = sorted(party_votes.items(), key=lambda x: x[1], reverse=True)
-                margin = int(round(sorted_votes[0][1] - (sorted_votes[1][1] if len(sorted_votes) > 1 else 0)))
-                margin_pct = round(margin / total_vote * 100, 2) if total_vote else 0
-                rating = assign_rating(margin_pct, party_labels.get(sorted_votes[0][0], sorted_votes[0][0]), st.session_state["tilt_max"], st.session_state["lean_max"], st.session_state["likely_max"])
-
-                ws.cell(row=row_idx, column=col_idx, value=f"{margin:,}")
-                ws.cell(row=row_idx, column=col_idx + 1, value=f"{margin_pct:.2f}%")
-                ws.cell(row=row_idx, column=col_idx + 2, value=f"{int(round(total_vote)):,}")
-                ws.cell(row=row_idx, column=col_idx + 3, value=rating)
-
-                grand_total += total_vote
-                row_idx += 1
-
-            # === Totals Row ===
-            ws.cell(row=row_idx, column=1, value="TOTALS")
-            col_idx = 2
-            for party in party_order:
-                total = totals[party]
-                pct = round(total / grand_total * 100, 2) if grand_total else 0
-                seats = seats_won[party]
-                ws.cell(row=row_idx, column=col_idx, value=f"{seats} seats")
-                ws.cell(row=row_idx, column=col_idx + 1, value=f"{total:,}")
-                ws.cell(row=row_idx, column=col_idx + 2, value=f"{pct:.2f}%")
-                col_idx += 3
-
-            sorted_totals = sorted(totals.items(), key=lambda x: x[1], reverse=True)
-            margin_total = sorted_totals[0][1] - (sorted_totals[1][1] if len(sorted_totals) > 1 else 0)
-            margin_pct_total = round(margin_total / grand_total * 100, 2) if grand_total else 0
-            winner_party = sorted_totals[0][0]
-            rating = assign_rating(margin_pct_total, party_labels.get(winner_party, winner_party), st.session_state["tilt_max"], st.session_state["lean_max"], st.session_state["likely_max"])
-
-            ws.cell(row=row_idx, column=col_idx, value=f"{margin_total:,}")
-            ws.cell(row=row_idx, column=col_idx + 1, value=f"{margin_pct_total:.2f}%")
-            ws.cell(row=row_idx, column=col_idx + 2, value=f"{int(round(grand_total)):,}")
-            ws.cell(row=row_idx, column=col_idx + 3, value=rating)
-
-            for c in range(1, col_idx + 4):
-                ws.cell(row=row_idx, column=c).font = Font(bold=True)
+            thresholds = (st.session_state["tilt_max"], st.session_state["lean_max"], st.session_state["likely_max"])
+            rated, _ = view_nodes(data_key, legislature_aggregates, selected_election_type, thresholds=thresholds)
+            table = rated.value()
 
             # === Streamlit Display ===
             st.subheader(f"🧾 {selected_election_type} National View")
-            file_stream = BytesIO()
-            wb.save(file_stream)
-            file_stream.seek(0)
-
-            # Convert worksheet to displayable rows
-            excel_rows = []
-            for row in ws.iter_rows(min_row=1, max_row=ws.max_row, values_only=True):
-                excel_rows.append(list(row))
-
-            header_row = []
-            if len(excel_rows) >= 2:
-                row1 = excel_rows[0]
-                row2 = excel_rows[1]
-                used_names = {}
-
-                for col1, col2 in zip(row1, row2):
-                    if col1 and col2:
-                        label = f"{col1} - {col2}"
-                    elif col1:
-                        label = str(col1)
-                    elif col2:
-                        label = str(col2)
-                    else:
-                        label = "Unnamed"
-
-                    if label in used_names:
-                        count = used_names[label] + 1
-                        used_names[label] = count
-                        label = f"{label} ({count})"
-                    else:
-                        used_names[label] = 1
-
-                    header_row.append(label)
-
-            data_rows = excel_rows[2:]
-
-            if header_row and data_rows:
-                df_display = pd.DataFrame(data_rows, columns=header_row)
-                # Convert all numeric-like strings to numeric values
-                df_display = df_display.pipe(_arrow_safe_df)
-                # Apply custom ratings based on session state thresholds
-                df_display = update_df_with_custom_ratings(
-                    df_display
-                )
-                st.dataframe(df_display, use_container_width=True)
+            results_table(table, key=f"{selected_election_type.lower().replace(' ', '_')}_national_view")
 
             # Download button
-            st.download_button(
+            spreadsheet_download(
+                table, selected_election_type, thresholds,
                 label=f"📥 Download {selected_election_type} Spreadsheet",
-                data=file_stream,
                 file_name=f"{selected_election_type.replace(' ', '_')}_National_View.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 key=f"{selected_election_type.lower().replace(' ', '_')}_national_view"
             )
+
+        # === County Elections (School Board / City Council / Mayor) ===
+        elif selected_election_type == "County Elections":
+            from tpp_toolkit.local import local_aggregates, seat_tally
+            from tpp_toolkit.views import rate_table
+
+            thresholds = (st.session_state["tilt_max"], st.session_state["lean_max"], st.session_state["likely_max"])
+            # Races are summarized once per save; a threshold change only re-rates the summaries
+            graph, digest = view_graph()
+            races = graph.node("tables", lambda: county_election_races(election_data), params=(digest, "County Elections"))
+            rated = graph.node("ratings", lambda b: rate_table(b, thresholds),
+                               graph.node("aggregates", local_aggregates, races), params=thresholds)
+            table = rated.value()
+
+            st.subheader("🧾 County Elections")
+            if table.rows.empty:
+                st.info("This save has no school board, city council or mayor races.")
+            else:
+                st.markdown("**Seats won by office**")
+                st.dataframe(seat_tally(table), use_container_width=True)
+            results_table(table, key="county_elections")
+
+            spreadsheet_download(
+                table, "County Elections", thresholds,
+                label="📥 Download County Elections Spreadsheet",
+                file_name="County_Elections.xlsx",
+                key="county_elections"
+            )
         else:
             st.warning("This election type is not yet supported.")
+
+        # === Two-Save Comparison ===
+        if st.session_state.get("compare_data") and selected_election_type in ELECTION_TYPES:
+            if selected_election_type in ["President", "Senate", "Governor"]:
+                state_code = next((code for code, name in state_code_to_name.items() if name == selected_state), None)
+                compare_view(selected_election_type, (tilt_max, lean_max, likely_max), state_code,
+                             (dem_colors, rep_colors, ind_colors))
+            else:
+                compare_view(selected_election_type, thresholds)
     else:
         st.warning("No recognized election data found in this file.")
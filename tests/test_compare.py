@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from tpp_toolkit.columnar import build_tables
+from tpp_toolkit.compare import (
+    compare_counties, compare_races, comparison_summary, county_shares, race_shares, rate_comparison, swing_frame,
+)
+
+THRESHOLDS = (3, 7, 12)
+
+
+def cands(*entries):
+    return [{"name": name, "party": party, "votes": votes} for name, party, votes in entries]
+
+
+def race(state, district, *entries, counties=()):
+    return {"state": state, "district": district, "cands": cands(*entries),
+            "counties": [{"name": name, "cands": cands(*county)} for name, county in counties]}
+
+
+def tables(*races):
+    return build_tables({"elections": list(races)})
+
+
+def by_key(table, *keys):
+    rows = table.rows
+    return {tuple(row[k] for k in keys): row for _, row in rows.iterrows()}
+
+
+@pytest.fixture
+def house():
+    base = tables(race("TX", 1, ("A", "D", 60), ("B", "R", 40)),
+                  race("TX", 2, ("C", "D", 45), ("E", "R", 55)),
+                  race("OH", 1, ("F", "D", 30), ("G", "R", 70)))
+    other = tables(race("ME", 1, ("H", "D", 70), ("I", "R", 30)),
+                   race("TX", 2, ("C", "D", 51), ("E", "R", 49)),
+                   race("TX", 1, ("A", "D", 52), ("B", "R", 48)))
+    return rate_comparison(compare_races(base, other, "House"), THRESHOLDS)
+
+
+def test_races_align_on_state_and_district_not_file_order(house):
+    rows = by_key(house, "state", "district")
+    assert set(rows) == {("Texas", "1"), ("Texas", "2"), ("Ohio", "1"), ("Maine", "1")}
+    tx1 = rows[("Texas", "1")]
+    assert (tx1["base_D_pct"], tx1["D_pct"]) == (60.0, 52.0)
+    assert (tx1["D_change"], tx1["R_change"]) == (-8.0, 8.0)
+
+
+def test_swing_is_positive_toward_democrats(house):
+    rows = by_key(house, "state", "district")
+    # D-R margin +20 -> +4, and -10 -> +2
+    assert rows[("Texas", "1")]["swing"] == -16.0
+    assert rows[("Texas", "2")]["swing"] == 12.0
+    assert rows[("Texas", "1")]["swing_rating"] == "Safe Republican"
+    assert rows[("Texas", "2")]["swing_rating"] == "Safe Democratic"
+
+
+def test_holds_flips_and_one_sided_rows(house):
+    rows = by_key(house, "state", "district")
+    assert rows[("Texas", "1")]["change"] == "Hold"
+    assert rows[("Texas", "2")]["change"] == "Flip"
+    ohio, maine = rows[("Ohio", "1")], rows[("Maine", "1")]
+    assert ohio["change"] == "Base only"
+    assert (ohio["base_winner"], ohio["winner"], ohio["rating"]) == ("Republican", "", "")
+    assert np.isnan(ohio["D_pct"]) and np.isnan(ohio["swing"]) and ohio["swing_rating"] == ""
+    assert maine["change"] == "Comparison only"
+    assert (maine["base_winner"], maine["base_rating"], maine["winner"]) == ("", "", "Democratic")
+    assert maine["rating_change"] == ""
+
+
+def test_rating_changes(house):
+    rows = by_key(house, "state", "district")
+    assert rows[("Texas", "1")]["rating_change"] == "Safe Democratic → Lean Democratic"
+    assert rows[("Texas", "2")]["rating_change"] == "Likely Republican → Tilt Democratic"
+
+
+def test_unchanged_rating_has_no_rating_change():
+    base = tables(race("TX", 1, ("A", "D", 60), ("B", "R", 40)))
+    other = tables(race("TX", 1, ("A", "D", 61), ("B", "R", 39)))
+    row = rate_comparison(compare_races(base, other, "House"), THRESHOLDS).rows.iloc[0]
+    assert (row["base_rating"], row["rating"], row["rating_change"]) == ("Safe Democratic", "Safe Democratic", "")
+    assert row["swing_rating"] == "Lean Democratic"
+
+
+def test_summary(house):
+    assert comparison_summary(house) == {"rows": 4, "compared": 2, "flips": 1, "rating_changes": 2, "mean_swing": -2.0}
+
+
+def test_repeated_races_align_by_position():
+    # Two Senate races in one state: the first lines up with the other save's first.
+    base = tables(race("GA", None, ("A", "D", 48), ("B", "R", 52)), race("GA", None, ("C", "D", 55), ("E", "R", 45)))
+    other = tables(race("GA", None, ("A", "D", 50), ("B", "R", 50)), race("GA", None, ("C", "D", 53), ("E", "R", 47)))
+    shares = race_shares(base)
+    assert shares["seq"].tolist() == [0, 1]
+    rows = compare_races(base, other, "Senate", statewide=True).rows
+    assert rows["base_D_pct"].tolist() == [48.0, 55.0]
+    assert rows["swing"].tolist() == [4.0, -4.0]
+
+
+def test_shares_add_up_a_partys_candidates():
+    shares = race_shares(tables(race("NY", 3, ("A", "D", 30), ("B", "D", 20), ("C", "R", 40), ("E", "I", 10))))
+    row = shares.iloc[0]
+    assert (row["D_pct"], row["R_pct"], row["party"], row["margin_pct"], row["total"]) == (50.0, 40.0, "D", 10.0, 100)
+
+
+def test_race_without_votes():
+    shares = race_shares(tables(race("VT", 1, ("A", "D", 0), ("B", "R", 0)), race("VT", 2)))
+    assert shares["party"].tolist() == [None, None]
+    assert shares["D_pct"].tolist() == [0.0, 0.0]
+
+
+def county_race(state, *counties):
+    return race(state, None, ("A", "D", 1), ("B", "R", 1),
+                counties=[(name, [("A", "D", d), ("B", "R", r)]) for name, d, r in counties])
+
+
+def test_counties_align_on_county_key():
+    base = tables(county_race("MO", ("St. Louis City", 80, 20), ("Doña Ana", 40, 60), ("Greene", 30, 70)),
+                  county_race("MO", ("Greene", 99, 1)))
+    other = tables(county_race("MO", ("SAINT LOUIS CITY", 70, 30), ("Dona Ana", 45, 55), ("Boone", 50, 50)))
+    assert county_shares(base)["county"].tolist() == ["stlouis_city", "dona_ana", "greene"]
+    table = rate_comparison(compare_counties(base, other, "Senate"), THRESHOLDS)
+    rows = by_key(table, "state", "name")
+    # the base save's display name is kept where it has the county
+    assert rows[("Missouri", "St. Louis City")]["swing"] == -20.0
+    assert rows[("Missouri", "Doña Ana")]["swing"] == 10.0
+    # only each state's first race is compared
+    assert rows[("Missouri", "Greene")]["change"] == "Base only"
+    assert rows[("Missouri", "Greene")]["base_D_pct"] == 30.0
+    assert rows[("Missouri", "Boone")]["change"] == "Comparison only"
+    assert swing_frame(table).columns.tolist() == ["County", "Rating"]
+
+
+def test_counties_listing_a_candidate_twice_count_the_last_entry():
+    base = tables(race("KS", None, ("A", "D", 1), counties=[("Wyandotte", [("A", "D", 10), ("B", "R", 30),
+                                                                           ("A", "D", 70)])]))
+    shares = county_shares(base)
+    assert (shares["D_pct"].iloc[0], shares["R_pct"].iloc[0]) == (70.0, 30.0)
+
+
+def test_race_swing_frame_is_by_state(house):
+    frame = swing_frame(house)
+    assert frame.columns.tolist() == ["State", "Rating"]
+    assert frame["State"].tolist() == house.rows["state"].tolist()
+    assert frame["Rating"].tolist() == house.rows["swing_rating"].tolist()
@@ -0,0 +1,52 @@
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+
+from tpp_toolkit.columnar import build_tables
+from tpp_toolkit.datafiles import to_arrow, to_bytes
+from tpp_toolkit.views import house_table
+
+THRESHOLDS = (3, 7, 12)
+
+
+@pytest.fixture
+def table():
+    block = {"elections": [
+        {"state": "TX", "district": 1, "cands": [{"name": "A", "party": "D", "votes": 60},
+                                                {"name": "B", "party": "R", "votes": 40}]},
+        {"state": "OH", "district": 2, "cands": [{"name": "C", "party": "R", "votes": 7}]},
+    ]}
+    return house_table(build_tables(block), THRESHOLDS)
+
+
+def test_every_grouped_column_is_qualified(table):
+    names = to_arrow(table).schema.names
+    assert len(set(names)) == len(names)
+    assert names[:8] == ["State", "District", "Democratic - Candidate", "Democratic - #", "Democratic - %",
+                         "Republican - Candidate", "Republican - #", "Republican - %"]
+    assert names[-2:] == ["Margins & Rating - Total Vote", "Margins & Rating - Rating"]
+
+
+def test_fields_are_typed_by_kind(table):
+    arrow = to_arrow(table)
+    assert arrow.num_rows == len(table.rows)
+    assert arrow.schema.field("District").type == pa.int64()
+    assert arrow.schema.field("Democratic - #").type == pa.int64()
+    assert arrow.schema.field("Democratic - %").type == pa.float64()
+    assert arrow.schema.field("Democratic - Candidate").type == pa.string()
+    assert arrow.column("Democratic - Candidate").to_pylist() == ["A", None]
+    metadata = arrow.schema.field("Republican - %").metadata
+    assert (metadata[b"group"], metadata[b"label"], metadata[b"kind"]) == (b"Republican", b"%", b"percent")
+
+
+@pytest.mark.parametrize("fmt, read", [
+    ("parquet", lambda data: pq.read_table(io.BytesIO(data))),
+    ("arrow", lambda data: feather.read_table(io.BytesIO(data))),
+    ("csv", lambda data: pacsv.read_csv(io.BytesIO(data))),
+])
+def test_formats_keep_the_names(table, fmt, read):
+    assert read(to_bytes(table, fmt)).schema.names == to_arrow(table).schema.names
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from tpp_toolkit.local import OFFICES, local_aggregates, local_races, seat_tally
+from tpp_toolkit.views import rate_table
+
+THRESHOLDS = (3, 7, 12)
+
+
+def race(state, county, district, *cands):
+    return {"state": state, "county": county, "district": district,
+            "cands": [{"name": name, "party": party, "votes": votes} for name, party, votes in cands]}
+
+
+def rated(election_data, **kwargs):
+    return rate_table(local_aggregates(local_races(election_data, **kwargs)), THRESHOLDS)
+
+
+@pytest.mark.parametrize("election_data", [
+    {},
+    {"electNightSB": {"elections": []}},
+    {key: {"elections": []} for key in OFFICES},
+    {"electNightCC": {}},
+])
+def test_empty_blocks(election_data):
+    table = rated(election_data)
+    assert table.rows.empty
+    tally = seat_tally(table)
+    assert tally.index.tolist() == ["Total"]
+    assert tally.loc["Total", "Total"] == 0
+
+
+def test_race_without_candidates():
+    races = local_races({"electNightM": {"elections": [race("TX", "Harris", 1)]}})
+    row = races.iloc[0]
+    assert (row["winner_name"], row["winner_party"]) == ("", "?")
+    assert (row["winner_votes"], row["margin"], row["total"], row["candidates"]) == (0, 0, 0, 0)
+    assert row["margin_pct"] == 0
+    tally = seat_tally(rate_table(local_aggregates(races), THRESHOLDS))
+    assert tally.loc["Mayor", "Total"] == 1
+
+
+def test_summaries_and_tally():
+    data = {
+        "electNightSB": {"elections": [
+            race("TX", "Harris", 2, ("A", "D", 60), ("B", "R", 40)),
+            race("TX", "Harris", 1, ("C", "R", 75), ("D", "D", 20), ("E", "I", 5)),
+        ]},
+        "electNightM": {"elections": [race("AL", "Jefferson", None, ("F", "I", 10))]},
+    }
+    table = rated(data, chunk_size=1)
+    rows = table.rows
+    # Alabama before Texas, districts in order within an office
+    assert rows["state"].tolist() == ["Alabama", "Texas", "Texas"]
+    assert rows["district"].tolist()[1:] == [1, 2]
+    texas = rows.iloc[1]
+    assert (texas["winner_name"], texas["winner"], texas["margin"], texas["total"]) == ("C", "Republican", 55, 100)
+    assert texas["margin_pct"] == pytest.approx(55.0)
+    assert texas["rating"] == "Safe Republican"
+    unopposed = rows.iloc[0]
+    assert (unopposed["margin"], unopposed["margin_pct"]) == (10, 100.0)
+
+    tally = seat_tally(table)
+    assert tally.index.tolist() == ["School Board", "Mayor", "Total"]
+    assert tally.loc["School Board", "Democratic"] == 1
+    assert tally.loc["School Board", "Republican"] == 1
+    assert tally.loc["Mayor", "Independent"] == 1
+    assert tally.loc["Mayor", "Democratic"] == 0
+    assert tally.loc["Total", "Total"] == 3
+
+
+def test_chunking_does_not_change_summaries():
+    data = {"electNightCC": {"elections": [race("OH", f"C{i}", i, ("A", "D", i + 1), ("B", "R", 2 * i))
+                                           for i in range(10)]}}
+    pd.testing.assert_frame_equal(local_races(data, chunk_size=3), local_races(data))
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tpp_toolkit.paging import filter_options, filter_rows, page, page_count, sort_rows
+from tpp_toolkit.tables import COUNT, Column, ResultsTable
+
+
+def make_table(n=10, totals=True):
+    rows = pd.DataFrame({
+        "state": ["Texas", "Ohio", "Texas", "Maine", "Ohio", "Texas", "Utah", "Ohio", "Texas", "Maine"][:n],
+        "district": [3, 10, 2, 1, None, 20, 5, 4, 1, 7][:n],
+        "winner": ["Republican", "Democratic", "Republican", "Democratic", "Republican",
+                   "Independent", "Republican", "Democratic", "Democratic", "Republican"][:n],
+        "votes": [30, 5, 12, 9, 40, 7, 1, 22, 3, 18][:n],
+        "rating": ["Safe Republican", "Tilt Democratic", "Lean Republican", "Safe Democratic", "Tilt Republican",
+                   "Safe Independent", "Safe Republican", "Likely Democratic", "Tilt Democratic",
+                   "Lean Republican"][:n],
+    }, index=range(100, 100 + n))
+    columns = (Column("state", "State"), Column("district", "District"), Column("winner", "Party"),
+               Column("votes", "Votes", kind=COUNT), Column("rating", "Rating"))
+    totals = {"state": "Total", "votes": int(rows["votes"].sum())} if totals else None
+    return ResultsTable("t", columns, rows, totals=totals)
+
+
+def test_filter_options_in_first_seen_order():
+    options = filter_options(make_table())
+    assert options["state"] == ["Texas", "Ohio", "Maine", "Utah"]
+    assert options["winner"] == ["Republican", "Democratic", "Independent"]
+    assert set(options) == {"state", "winner", "rating"}
+
+
+def test_filter_options_skip_missing_columns():
+    table = make_table()
+    table = ResultsTable("t", table.columns[:2], table.rows[["state", "district"]])
+    assert list(filter_options(table)) == ["state"]
+
+
+def test_filter_rows_intersects_selections_and_drops_totals():
+    table = make_table()
+    filtered = filter_rows(table, {"state": ["Texas", "Ohio"], "winner": ["Democratic"]})
+    assert filtered.rows["votes"].tolist() == [5, 22, 3]
+    assert filtered.totals is None
+
+
+def test_filter_rows_without_a_selection_is_unchanged():
+    table = make_table()
+    assert filter_rows(table, {"state": [], "winner": None, "missing": ["x"]}) is table
+
+
+def test_filter_rows_can_match_nothing():
+    filtered = filter_rows(make_table(), {"rating": ["Safe Green"]})
+    assert filtered.rows.empty and filtered.totals is None
+
+
+def test_sort_numbers_numerically_blanks_last():
+    table = make_table()
+    ascending = sort_rows(table, "district").rows
+    assert ascending["district"].tolist()[:-1] == [1, 1, 2, 3, 4, 5, 7, 10, 20]
+    assert np.isnan(ascending["district"].tolist()[-1])
+    descending = sort_rows(table, "district", descending=True).rows
+    assert descending["district"].tolist()[:-1] == [20, 10, 7, 5, 4, 3, 2, 1, 1]
+    assert np.isnan(descending["district"].tolist()[-1])
+
+
+def test_sort_is_stable():
+    table = make_table()
+    ordered = sort_rows(table, "district").rows
+    # the two district-1 rows keep their view order (Maine, then Texas)
+    assert ordered["state"].tolist()[:2] == ["Maine", "Texas"]
+    by_state = sort_rows(table, "state").rows
+    assert by_state.loc[by_state["state"] == "Texas", "votes"].tolist() == [30, 12, 7, 3]
+
+
+def test_sort_text_case_insensitively():
+    table = make_table(4)
+    table = ResultsTable("t", table.columns, table.rows.assign(state=["beta", "Alpha", "gamma", "Delta"]))
+    assert sort_rows(table, "state").rows["state"].tolist() == ["Alpha", "beta", "Delta", "gamma"]
+
+
+def test_sort_mixed_column_as_text():
+    table = make_table(3)
+    table = ResultsTable("t", table.columns, table.rows.assign(district=[10, "At-large", 9]))
+    assert sort_rows(table, "district").rows["district"].tolist() == [10, 9, "At-large"]
+
+
+def test_sort_by_nothing_keeps_the_table():
+    table = make_table()
+    assert sort_rows(table, None) is table
+    assert sort_rows(table, "missing") is table
+
+
+def test_sort_keeps_totals():
+    table = make_table()
+    assert sort_rows(table, "votes").totals == table.totals
+
+
+@pytest.mark.parametrize("rows, size, pages", [(0, 5, 1), (1, 5, 1), (5, 5, 1), (6, 5, 2), (10, 3, 4), (10, 10, 1)])
+def test_page_count(rows, size, pages):
+    assert page_count(make_table(rows), size) == pages
+
+
+def test_pages_cover_rows_once_with_totals_on_the_last():
+    table = make_table()
+    pages = [page(table, n, 3) for n in range(1, page_count(table, 3) + 1)]
+    assert [len(p.rows) for p in pages] == [3, 3, 3, 1]
+    assert pd.concat([p.rows for p in pages]).equals(table.rows)
+    assert [p.totals is not None for p in pages] == [False, False, False, True]
+
+
+@pytest.mark.parametrize("number, first", [(0, 30), (-3, 30), (99, 18), ("2", 9)])
+def test_page_number_is_clamped(number, first):
+    assert page(make_table(), number, 3).rows["votes"].iloc[0] == first
+
+
+def test_page_of_an_empty_table_keeps_totals():
+    table = make_table(0)
+    shown = page(table, 1, 50)
+    assert shown.rows.empty and shown.totals == table.totals
+
+
+def test_filter_sort_page_together():
+    table = make_table()
+    shown = page(sort_rows(filter_rows(table, {"winner": ["Republican"]}), "votes", descending=True), 2, 2)
+    assert shown.rows["votes"].tolist() == [18, 12]
+    assert shown.totals is None
@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from tpp_toolkit.ratings import DEFAULT_THRESHOLDS, assign_rating, rate
+
+MARGINS = [0.0, -0.0, 0.001, 1, 2.999, 3, 3.001, 5, 7, 7.5, 12, 12.0001, 50, 100, -1, -5, np.inf, -np.inf, np.nan]
+THRESHOLDS = [
+    DEFAULT_THRESHOLDS,
+    (0, 0, 0),
+    (5, 5, 5),
+    (3, 3, 12),
+    (3, 12, 12),
+    (12, 7, 3),
+    (7, 3, 12),
+    (3, 12, 7),
+    (-1, 0, 1),
+    (0.5, 2.5, 2.5),
+]
+WINNERS = ["Democratic", "Republican", "Independent", "D", ""]
+
+
+def expected(margins, winners, thresholds):
+    return [assign_rating(m, w, *thresholds) for m, w in zip(margins, winners)]
+
+
+@pytest.mark.parametrize("thresholds", THRESHOLDS)
+def test_matches_assign_rating(thresholds):
+    pairs = list(itertools.product(MARGINS, WINNERS))
+    margins = np.array([m for m, _ in pairs])
+    winners = np.array([w for _, w in pairs], dtype=object)
+    assert list(rate(margins, winners, *thresholds)) == expected(margins, winners, thresholds)
+
+
+@pytest.mark.parametrize("thresholds", THRESHOLDS)
+def test_matches_assign_rating_on_threshold_edges(thresholds):
+    edges = np.array(thresholds, dtype=np.float64)
+    margins = np.concatenate([edges, np.nextafter(edges, np.inf), np.nextafter(edges, -np.inf)])
+    winners = ["Republican"] * len(margins)
+    assert list(rate(margins, winners, *thresholds)) == expected(margins, winners, thresholds)
+
+
+def test_matches_assign_rating_on_random_margins():
+    rng = np.random.default_rng(0)
+    margins = np.round(rng.uniform(-5, 40, 5000), 2)
+    margins[rng.random(5000) < 0.05] = np.nan
+    winners = rng.choice(np.array(WINNERS, dtype=object), 5000)
+    for _ in range(20):
+        thresholds = tuple(np.round(rng.uniform(0, 20, 3), 1))
+        assert list(rate(margins, winners, *thresholds)) == expected(margins, winners, thresholds)
+
+
+def test_integer_and_list_inputs():
+    assert list(rate([0, 3, 4, 20], ["D", "D", "R", "R"], 3, 7, 12)) == [
+        "Tilt D", "Tilt D", "Lean R", "Safe R"]
+
+
+def test_empty():
+    assert len(rate(np.array([]), np.array([], dtype=object), *DEFAULT_THRESHOLDS)) == 0
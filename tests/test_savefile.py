@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from tpp_toolkit import savefile
+from tpp_toolkit.savefile import extract_keys
+
+KEYS = ("electNightP", "electNightS", "electNightG")
+
+
+def expected(doc, keys=KEYS):
+    data = json.loads(doc)
+    return {k: data[k] for k in keys if k in data} if isinstance(data, dict) else {}
+
+
+DOCUMENTS = [
+    b"{}",
+    b" \n{ } \t",
+    b"[1, 2]",
+    b"null",
+    b'"text"',
+    b'\xef\xbb\xbf{"electNightP": []}',
+    b'{"electNightP": {"a": [1, {"b": [[[{"c": [2]}]]]}]}, "other": [[[[[[{"x": "]}"}]]]]]]}',
+    b'{"version": 1, "electNightS": [1.5e3, -0, true, false, null], "z": -2.5E-3}',
+    b'{"other": "say \\"hi\\" {[", "electNightG": "a\\\\", "after": "\\\\\\""}',
+    b'{"electNightP": "\\u00e9\\ud83d\\ude00", "name": "\\/\\b\\f\\n\\r\\t"}',
+    '{"electNightP": ["Québec", "東京", "😀"], "skip": {"ñ": "ü}]"}}'.encode("utf-8"),
+    b'{"electNightP": 1, "electNightP": 2}',
+    b'{"other": {"electNightP": 1}, "electNightS": 12345678901234567890}',
+]
+
+
+@pytest.mark.parametrize("doc", DOCUMENTS)
+def test_matches_json_loads(doc):
+    assert extract_keys(doc, KEYS) == expected(doc)
+    assert extract_keys(memoryview(doc), KEYS) == expected(doc)
+
+
+def test_key_order_is_canonical():
+    doc = b'{"electNightG": 3, "electNightP": 1}'
+    assert list(extract_keys(doc, KEYS)) == ["electNightP", "electNightG"]
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 5, 7, 16])
+@pytest.mark.parametrize("doc", DOCUMENTS)
+def test_small_windows(monkeypatch, doc, window):
+    # Every value of these documents crosses a window boundary somewhere.
+    monkeypatch.setattr(savefile, "_WINDOW", window)
+    assert extract_keys(doc, KEYS) == expected(doc)
+
+
+@pytest.mark.parametrize("shift", range(4))
+def test_multibyte_text_across_the_window(shift):
+    # "€" is three bytes, "😀" four and "é" two; as the padding shifts, the
+    # first window ends inside each of them and between two.
+    pad = "x" * (savefile._WINDOW - 40 + shift)
+    value = {"pad": pad, "text": "€😀é" * 20, "n": 1234567890123}
+    doc = json.dumps({"a": 1, "electNightP": value, "electNightS": ["ü" * 10]}, ensure_ascii=False).encode("utf-8")
+    assert extract_keys(doc, KEYS) == expected(doc)
+
+
+def test_number_cut_by_the_window():
+    doc = b'{"electNightP": 0.' + b"9" * (savefile._WINDOW + 10) + b"}"
+    assert extract_keys(doc, KEYS) == expected(doc)
+
+
+MALFORMED = [
+    b"",
+    b"   ",
+    b"{",
+    b"{,}",
+    b'{"a"}',
+    b'{"a" 1}',
+    b'{"a": }',
+    b'{"a": 1,}',
+    b'{"a": 1 "b": 2}',
+    b'{"a": 1} x',
+    b'{"a": 1}}',
+    b'{a: 1}',
+    b'{"a": tru}',
+    b'{"a": nul}',
+    b'{"a": 01}',
+    b'{"a": 1.}',
+    b'{"a": -}',
+    b'{"a": "\\q"}',
+    b'{"a": "open}',
+    b'{"a": [1, 2}',
+    b'{"a": [1, 2]',
+    b'{"a": {"b": "}"}',
+    b'{"electNightP": tru}',
+    b'{"electNightP": [1, 2}',
+    b'{"electNightP": {"a": 1,}}',
+    b'{"electNightP": "\\ud83d\\u"}',
+    b'[1, 2',
+]
+
+
+@pytest.mark.parametrize("doc", MALFORMED)
+def test_malformed_raises(doc):
+    with pytest.raises(ValueError):
+        json.loads(doc)
+    with pytest.raises(json.JSONDecodeError):
+        extract_keys(doc, KEYS)
+
+
+def test_skipped_containers_are_only_bracket_matched():
+    # Documented: the inside of a skipped container is not validated.
+    assert extract_keys(b'{"a": [tru, , 1 2], "electNightP": 1}', KEYS) == {"electNightP": 1}
+
+
+def test_read_savefile(tmp_path):
+    doc = '{"x": [1], "electNightS": {"ü": "😀"}}'.encode("utf-8")
+    path = tmp_path / "save.json"
+    path.write_bytes(doc)
+    assert savefile.read_savefile(path, KEYS) == expected(doc)
+    path.write_bytes(b"")
+    with pytest.raises(json.JSONDecodeError):
+        savefile.read_savefile(path, KEYS)
@@ -0,0 +1,120 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from tpp_toolkit.columnar import build_tables
+from tpp_toolkit.ingest import _LRU, content_hash, load_savefile
+from tpp_toolkit.local import local_races
+from tpp_toolkit.store import MANIFEST, TableStore
+from tpp_toolkit.synthetic import make_savefile
+
+
+@pytest.fixture(scope="module")
+def save():
+    return make_savefile(seed=3, scale=0.02)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TableStore(str(tmp_path / "store"))
+
+
+def touch(store, digest, when):
+    os.utime(os.path.join(store.root, digest, MANIFEST), (when, when))
+
+
+def test_tables_round_trip(store, save):
+    store.save("a" * 64, save)
+    assert store.blocks("a" * 64) == tuple(save)
+    for key, block in save.items():
+        stored, built = store.tables("a" * 64, key), build_tables(block)
+        for name in ("races", "candidates", "counties", "county_votes"):
+            pd.testing.assert_frame_equal(getattr(stored, name), getattr(built, name), check_index_type=False,
+                                          check_categorical=False)
+        pd.testing.assert_series_equal(stored.parties, built.parties)
+
+
+def test_local_races_round_trip(store, save):
+    store.save("a" * 64, save)
+    stored, built = store.local_races("a" * 64), local_races(save)
+    pd.testing.assert_frame_equal(stored, built, check_categorical=False)
+
+
+def test_text_districts_round_trip(store):
+    data = {"electNightM": {"elections": [
+        {"state": "TX", "county": "Harris", "district": d, "cands": [{"name": "A", "party": "D", "votes": 1}]}
+        for d in ("At-large", None, "2")]}}
+    store.save("b" * 64, data)
+    assert store.local_races("b" * 64)["district"].tolist() == ["At-large", None, "2"]
+
+
+def test_missing_saves_and_blocks(store, save):
+    assert store.blocks("c" * 64) is None
+    with pytest.raises(KeyError):
+        store.tables("c" * 64, "electNightP")
+    store.save("c" * 64, {"electNightP": save["electNightP"]})
+    with pytest.raises(KeyError):
+        store.tables("c" * 64, "electNightG")
+    with pytest.raises(KeyError):
+        store.local_races("c" * 64)
+
+
+def test_files_removed_under_a_reader_raise_key_error(store, save):
+    store.save("d" * 64, save)
+    os.remove(os.path.join(store.root, "d" * 64, "electNightP", "races.parquet"))
+    with pytest.raises(KeyError):
+        store.tables("d" * 64, "electNightP")
+
+
+def test_stale_manifest_is_not_stored(store, save):
+    store.save("e" * 64, save)
+    with open(os.path.join(store.root, "e" * 64, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"version": 0, "blocks": {}, "local": False}, f)
+    assert store.blocks("e" * 64) is None
+
+
+def test_evicts_least_recently_opened_first(store, save):
+    block = {"electNightP": save["electNightP"]}
+    for i, digest in enumerate("fgh"):
+        store.save(digest * 64, block)
+        touch(store, digest * 64, 1000 + i)
+    store.blocks("f" * 64)  # opening moves f to the back
+    assert [digest[0] for digest, _, _ in store.entries()] == ["g", "h", "f"]
+    size = store.entries()[0][1]
+    store.max_bytes = 2 * size
+    assert store.evict() == 2 * size
+    assert store.blocks("g" * 64) is None
+    assert store.blocks("h" * 64) is not None and store.blocks("f" * 64) is not None
+
+
+def test_evict_keeps_the_save_being_stored(store, save):
+    store.max_bytes = 1
+    store.save("i" * 64, save)
+    store.save("j" * 64, save)
+    assert [digest[0] for digest, _, _ in store.entries()] == ["j"]
+
+
+def test_clear(store, save):
+    store.save("k" * 64, save)
+    store.clear()
+    assert store.entries() == [] and store.blocks("k" * 64) is None
+
+
+def test_load_savefile_with_a_store(store, save):
+    raw = json.dumps(save).encode()
+    first = load_savefile(raw, cache=_LRU(2), store=store)
+    assert first.stored and not first.cache_hit
+    assert first.election_data == dict.fromkeys(save)
+    again = load_savefile(raw, cache=_LRU(2), store=store)
+    assert again.stored and again.cache_hit and again.digest == content_hash(raw)
+
+
+def test_save_parquet_cannot_hold_stays_in_memory(store):
+    # a candidate named by a number in one race and by text in another
+    data = {"electNightP": {"elections": [{"state": "TX", "cands": [{"name": name, "party": "D", "votes": 1}]}
+                                          for name in (7, "A")]}}
+    result = load_savefile(json.dumps(data).encode(), cache=_LRU(2), store=store)
+    assert not result.stored and result.election_data == data
+    assert store.entries() == []
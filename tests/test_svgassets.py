@@ -0,0 +1,21 @@
+from tpp_toolkit.svgassets import minify_svg
+from tpp_toolkit.svgmaps import SvgTemplate, element_id
+
+
+def test_single_quoted_attributes_are_kept():
+    text = "<svg><path id='x' d='M 1.23456 2 L 3 4' style='fill:#fff;font-size:3px'/><g id=\"y\" class='a \"b\"'/></svg>"
+    assert minify_svg(text) == ('<svg><path id="x" d="M 1.23 2 L 3 4" style="fill:#fff"/>'
+                                '<g id="y" class="a &quot;b&quot;"/></svg>\n')
+
+
+def test_single_quoted_regions_recolor():
+    text = "<svg><path id='Harris' d='M0 0' style='fill:#ccc;stroke:#fff'/><path id='Travis' d='M1 1'/></svg>"
+    template = SvgTemplate.parse(minify_svg(text))
+    assert template.slot_ids == ["Harris", "Travis"]
+    rendered = template.render({"Harris": "#f00", "Travis": "#00f"}, element_id)
+    assert 'style="fill:#f00;stroke:#fff"' in rendered and 'style="fill:#00f"' in rendered
+
+
+def test_editor_attributes_in_either_quotes_are_dropped():
+    text = "<svg xmlns:inkscape='i' inkscape:version=\"1\"><path id=\"a\" sodipodi:nodetypes='cc' d=\"M0 0\"/></svg>"
+    assert minify_svg(text) == '<svg><path id="a" d="M0 0"/></svg>\n'
@@ -0,0 +1,46 @@
+import warnings
+
+import pandas as pd
+import pytest
+
+from tpp_toolkit.columnar import build_tables
+from tpp_toolkit.tables import COUNT, Column, ResultsTable
+from tpp_toolkit.views import house_table, legislature_table, presidential_table, statewide_table
+from tpp_toolkit.xlsx import to_xlsx
+
+THRESHOLDS = (3, 7, 12)
+EMPTY = build_tables({"elections": []})
+
+
+def test_column_values_appends_totals():
+    table = ResultsTable("t", (Column("votes", "Votes", kind=COUNT), Column("name", "Name")),
+                         pd.DataFrame({"votes": [1, 2], "name": ["a", "b"]}), totals={"votes": 3, "name": "Total"})
+    assert table.column_values(table.columns[0]).tolist() == [1, 2, 3]
+    assert table.column_values(table.columns[1]).tolist() == ["a", "b", "Total"]
+
+
+@pytest.mark.parametrize("build", [
+    lambda: house_table(EMPTY, THRESHOLDS),
+    lambda: statewide_table(EMPTY, "Senate", THRESHOLDS),
+    lambda: legislature_table(EMPTY, "State House", THRESHOLDS),
+    lambda: presidential_table(EMPTY, THRESHOLDS),
+])
+def test_empty_block_views_are_only_totals(build):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        table = build()
+        frame = table.frame()
+        to_xlsx(table)
+    assert len(frame) == 1
+    for label, column in zip(frame.columns, table.columns):
+        if column.kind == COUNT:
+            assert pd.api.types.is_numeric_dtype(frame[label])
+
+
+def test_labels_qualify_group_starts_or_every_grouped_column():
+    columns = (Column("state", "State"), Column("d", "Votes", "Democratic", COUNT), Column("dp", "%", "Democratic"),
+               Column("r", "Votes", "Republican", COUNT), Column("rp", "%", "Republican"), Column("note", group="Notes"))
+    table = ResultsTable("t", columns, pd.DataFrame())
+    assert table.labels() == ["State", "Democratic - Votes", "%", "Republican - Votes", "% (2)", "Notes"]
+    assert table.labels(qualified=True) == ["State", "Democratic - Votes", "Democratic - %", "Republican - Votes",
+                                            "Republican - %", "Notes"]
@@ -0,0 +1,34 @@
+"""Streamlit-free core of the TPP Election Toolkit.
+
+The names below are imported on first access, so ``import tpp_toolkit`` (and
+``tpp_toolkit.ingest`` for reading a savefile) does not pull in pandas.
+"""
+import importlib
+
+_EXPORTS = {
+    "ElectionTables": "columnar",
+    "build_tables": "columnar",
+    "ELECTION_KEYS": "ingest",
+    "ELECTION_TYPES": "ingest",
+    "IngestResult": "ingest",
+    "content_hash": "ingest",
+    "extract_election_data": "ingest",
+    "load_savefile": "ingest",
+    "extract_keys": "savefile",
+    "read_savefile": "savefile",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,292 @@
+"""Per-race and per-county aggregation over ``ElectionTables``.
+
+These reproduce the spreadsheet rules the views have always used, but as
+grouped/vectorized operations over the columnar tables:
+
+* ``party_slots`` - the D/R/I three-column summary used by the U.S. House,
+  Senate/Governor and State House/Senate national views.
+* ``statewide_party_votes`` - the per-state party totals behind the
+  Presidential national view.
+* ``county_results`` - the county-by-candidate breakdown of one statewide race
+  (``county_results_by_race`` computes it for every race at once).
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+PARTY_ORDER = ("D", "R", "I")
+
+
+def round2(values):
+    """``values`` rounded to two decimals, as every displayed percentage is."""
+    return np.round(values, 2)
+
+
+def margin_percent(margin, total):
+    """``margin`` as a rounded percentage of ``total`` (0 where the total is 0)."""
+    total = np.asarray(total, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = round2(np.asarray(margin, dtype=np.float64) / total * 100)
+    return np.where(total != 0, pct, 0.0)
+
+
+def top_two(matrix, fill=0.0):
+    """Largest and second-largest value of each row, ``fill`` where a row is too short.
+
+    Only the top two are needed for a margin, so the rows are partitioned
+    rather than sorted.
+    """
+    n, width = matrix.shape
+    if width < 2:
+        top = matrix[:, 0] if width else np.full(n, fill)
+        return top, np.full(n, fill)
+    pair = np.partition(matrix, width - 2, axis=1)[:, -2:]
+    return pair[:, 1], pair[:, 0]
+
+
+def race_fields(cands, n):
+    """Leader, runner-up vote, last-placed candidate, combined vote and size of each race's field.
+
+    Found with per-race reductions over the candidates in ``cands`` (stored
+    in file order, so each race is a contiguous run) rather than by sorting
+    every field: the leader is the first listed with the most votes, the
+    last-placed the last listed with the fewest, and ``second_votes`` the
+    most votes of anyone but the leader (NaN in a one-candidate field).
+    Races without candidates in ``cands`` are NaN.
+    """
+    race = cands["race"].to_numpy()
+    votes = cands["votes"].to_numpy(dtype=np.float64)
+    if len(race):
+        starts = np.flatnonzero(np.r_[True, race[1:] != race[:-1]])
+        sizes = np.diff(np.r_[starts, len(race)])
+        segment = np.repeat(np.arange(len(starts)), sizes)
+        position = np.arange(len(race))
+        top = np.minimum.reduceat(np.where(votes == np.maximum.reduceat(votes, starts)[segment], position, len(race)),
+                                  starts)
+        low = np.maximum.reduceat(np.where(votes == np.minimum.reduceat(votes, starts)[segment], position, -1),
+                                  starts)
+        combined = np.add.reduceat(votes, starts)
+        others = np.where(position == top[segment], -np.inf, votes)
+        second = np.where(sizes > 1, np.maximum.reduceat(others, starts), np.nan)
+    else:
+        starts = top = low = sizes = np.zeros(0, dtype=np.int64)
+        combined = second = np.zeros(0)
+    names = cands["name"].to_numpy(dtype=object)
+    fields = pd.DataFrame({
+        "top_name": names[top], "top_party": cands["party"].to_numpy(dtype=object)[top], "top_votes": votes[top],
+        "second_votes": second, "low_name": names[low], "low_votes": votes[low], "combined": combined, "count": sizes,
+    }, index=race[starts])
+    return fields.reindex(pd.RangeIndex(n, name="race"))
+
+
+def party_slots(tables, party_order=PARTY_ORDER, spill_party="I"):
+    """One row per race with a name/votes slot per party plus margin columns.
+
+    Slot rules: a party's slot holds its leading candidate.  When the party ran
+    several candidates and one of them is the race winner, the slot gets the
+    party's combined vote; otherwise only the leader's vote counts.  For
+    ``spill_party`` a non-winning multi-candidate field shows its last-placed
+    candidate and the leader's plus last-placed votes (the spill-over rule the
+    spreadsheets have always applied).
+
+    Columns: ``state``, ``district``, ``total``, ``winner_name``,
+    ``winner_party`` (top candidate overall), ``<party>_name`` and
+    ``<party>_votes`` per slot, ``slot_winner`` (the leading slot),
+    ``margin`` (leading slot minus runner-up slot, rounded to whole votes)
+    and ``margin_pct``.
+    """
+    n = len(tables.races)
+    index = pd.RangeIndex(n, name="race")
+    cands = tables.candidates
+
+    leaders = race_fields(cands, n)
+    winner_name = leaders["top_name"]
+
+    out = pd.DataFrame({
+        "state": tables.races["state"].astype(object).to_numpy(),
+        "district": tables.races["district"].astype(object).to_numpy(),
+        "total": leaders["combined"].fillna(0.0).to_numpy(),
+        "winner_name": winner_name.to_numpy(),
+        "winner_party": leaders["top_party"].to_numpy(),
+    }, index=index)
+
+    slot_votes = []
+    for party in party_order:
+        stats = race_fields(cands[(cands["party"] == party).to_numpy()], n)
+        count = stats["count"].fillna(0).to_numpy()
+        several = count > 1
+        leads_race = (stats["top_name"] == winner_name).to_numpy()
+
+        names = stats["top_name"].fillna("").to_numpy(dtype=object)
+        votes = np.where(several & leads_race, stats["combined"], stats["top_votes"])
+        if party == spill_party:
+            spilled = several & ~leads_race
+            names = np.where(spilled, stats["low_name"].fillna("").to_numpy(dtype=object), names)
+            votes = np.where(spilled, stats["top_votes"] + stats["low_votes"], votes)
+        votes = np.where(count > 0, votes, 0.0)
+
+        out[f"{party}_name"] = names
+        out[f"{party}_votes"] = votes
+        slot_votes.append(votes)
+
+    matrix = np.column_stack(slot_votes) if slot_votes else np.zeros((n, 0))
+    top, second = top_two(matrix)
+    out["slot_winner"] = np.asarray(party_order, dtype=object)[matrix.argmax(axis=1)] if n else []
+    out["margin"] = np.rint(top - second).astype(np.int64)
+    out["margin_pct"] = margin_percent(out["margin"], out["total"])
+    return out
+
+
+def statewide_party_votes(tables, nominees=None):
+    """Per-race party vote totals, electoral votes and margins.
+
+    Returns ``(frame, parties)`` where ``parties`` lists party codes in the
+    order they first appear.  When a party lists several candidates the last
+    one's votes are used, as the Presidential view always did.  ``frame`` has
+    ``<party>_votes`` and ``<party>_ev`` per party plus ``electoral_votes``
+    (sum over all candidates), ``total``, ``winner_party``, ``margin`` and
+    ``margin_pct``.  ``<party>_ev`` is the electoral vote of the candidate
+    named ``nominees[party]`` in each race (default: the race's own nominee).
+    """
+    n = len(tables.races)
+    index = pd.RangeIndex(n, name="race")
+    cands = tables.candidates.assign(
+        name=lambda d: d["name"].astype(object), party=lambda d: d["party"].astype(object)
+    )
+    parties = list(pd.unique(cands["party"]))
+
+    last = cands.drop_duplicates(["race", "party"], keep="last")
+    votes = last.pivot(index="race", columns="party", values="votes").reindex(index=index, columns=parties)
+    present = votes.notna().to_numpy()
+    matrix = votes.fillna(0.0).to_numpy()
+
+    out = pd.DataFrame(index=index)
+    out["state"] = tables.races["state"].astype(object).to_numpy()
+    out["electoral_votes"] = cands.groupby("race")["electoral_votes"].sum().reindex(index, fill_value=0).to_numpy()
+    out["total"] = matrix.sum(axis=1)
+
+    # Electoral votes of the first candidate in each race with the nominee's name.
+    ev_by_name = cands.drop_duplicates(["race", "name"], keep="first").set_index(["race", "name"])["electoral_votes"]
+    for i, party in enumerate(parties):
+        out[f"{party}_votes"] = matrix[:, i]
+        if nominees is not None:
+            keys = pd.MultiIndex.from_arrays([index, [nominees.get(party)] * n], names=["race", "name"])
+        else:
+            keys = pd.MultiIndex.from_frame(last[last["party"] == party][["race", "name"]])
+        ev = pd.Series(ev_by_name.reindex(keys).to_numpy(), index=keys.get_level_values("race"))
+        out[f"{party}_ev"] = ev.reindex(index).fillna(0).astype(np.int64).to_numpy()
+
+    masked = np.where(present, matrix, -np.inf)
+    top, second = top_two(masked, fill=-np.inf)
+    top, second = np.where(np.isfinite(top), top, 0.0), np.where(np.isfinite(second), second, 0.0)
+    out["winner_party"] = np.asarray(parties, dtype=object)[masked.argmax(axis=1)] if parties else None
+    out["margin"] = np.rint(top - second).astype(np.int64)
+    out["margin_pct"] = margin_percent(out["margin"], out["total"])
+    return out, parties
+
+
+def county_results(tables, race):
+    """County-by-candidate results for one race.
+
+    Returns ``(ordered, frame, totals)``.  ``ordered`` is the race's
+    ``(party, name)`` candidate list grouped by party in first-appearance
+    order.  ``frame`` has one row per county block with ``county`` (display
+    name), one integer vote column per position in ``ordered`` (``0``, ``1``,
+    ...), ``total`` (all county candidates, votes rounded to cents),
+    ``winner_name``, ``winner_party``, ``margin`` and ``margin_pct``.
+    ``totals`` holds the statewide sums of the county columns: ``votes`` (per
+    position in ``ordered``), ``total``, ``margin``, ``margin_pct`` and
+    ``winner_party``.  ``None`` when the race has no county results.
+    """
+    return county_results_by_race(tables, [race]).get(race)
+
+
+def county_results_by_race(tables, races=None):
+    """``{race: county_results(tables, race)}`` for every race with county results.
+
+    The deduplication, pivot and ranking run once over the county blocks of
+    all races (or only of ``races``); each race's frame is then a slice of
+    the shared arrays, so looking up another state costs nothing further.
+    """
+    cands, counties, cv = tables.candidates, tables.counties, tables.county_votes
+    if races is not None:
+        cands = cands[cands["race"].isin(races)]
+        cv = cv[cv["race"].isin(races)]
+    race_ids = np.unique(cv["race"].to_numpy())
+    counties = counties[counties["race"].isin(race_ids)]
+    cands = cands[cands["race"].isin(race_ids)]
+
+    # Candidates grouped by party in first-appearance order within each race;
+    # a name's party is the one it is first listed with.
+    cands = cands.assign(name=cands["name"].astype(object), party=cands["party"].astype(object),
+                         row=np.arange(len(cands)))
+    first_row = cands.groupby(["race", "party"], sort=False, dropna=False)["row"].transform("min")
+    ordered = cands.assign(first_row=first_row).sort_values(["race", "first_row", "row"], kind="stable")
+    ordered["pos"] = ordered.groupby("race").cumcount().to_numpy()
+    first_party = cands.drop_duplicates(["race", "name"])[["race", "name", "party"]]
+    ordered = ordered.merge(first_party.rename(columns={"party": "name_party"}), on=["race", "name"], how="left")
+    width_of = ordered.groupby("race").size().reindex(race_ids, fill_value=0).to_numpy()
+    width = int(width_of.max()) if len(width_of) else 0
+
+    race_row = np.searchsorted(race_ids, ordered["race"].to_numpy())
+    names = np.full((len(race_ids), width), None, dtype=object)
+    names[race_row, ordered["pos"]] = ordered["name"].to_numpy()
+    name_parties = np.full((len(race_ids), width), None, dtype=object)
+    name_parties[race_row, ordered["pos"]] = ordered["name_party"].to_numpy()
+
+    cv = cv.assign(name=cv["name"].astype(object), votes=round2(cv["votes"]))
+    cv = cv.drop_duplicates(["county", "name"], keep="last")
+    total = cv.groupby("county")["votes"].sum().reindex(counties.index, fill_value=0.0).to_numpy()
+
+    # A candidate listed twice fills both of its columns.
+    slots = cv.merge(ordered[["race", "name", "pos"]], on=["race", "name"])
+    matrix = np.zeros((len(counties), width), dtype=np.int64)
+    matrix[counties.index.get_indexer(slots["county"]), slots["pos"]] = np.rint(slots["votes"]).astype(np.int64)
+
+    county_race = np.searchsorted(race_ids, counties["race"].to_numpy())
+    n = width_of[county_race]
+    masked = np.where(np.arange(width) < n[:, None], matrix, -np.inf)
+    top, second = top_two(masked, fill=-np.inf)
+    with np.errstate(invalid="ignore"):
+        margin = np.where(n > 1, top - second, np.where(n == 1, top, 0))
+    winner = masked.argmax(axis=1) if width else np.zeros(len(counties), dtype=np.int64)
+    margin = margin.astype(np.int64)
+    winner_name = np.where(n > 0, names[county_race, winner] if width else None, None)
+    winner_party = np.where(n > 0, name_parties[county_race, winner] if width else None, "?")
+    margin_pct = margin_percent(margin, total)
+    display = counties["name"].astype(str).str.replace(" County", "").str.title().to_numpy()
+
+    starts = np.searchsorted(county_race, np.arange(len(race_ids)))
+    ends = np.searchsorted(county_race, np.arange(len(race_ids)), side="right")
+    pairs = list(zip(ordered["party"], ordered["name"]))
+    pair_starts = np.searchsorted(race_row, np.arange(len(race_ids)))
+    results = {}
+    for i, race in enumerate(race_ids.tolist()):
+        lo, hi, k = starts[i], ends[i], width_of[i]
+        race_ordered = pairs[pair_starts[i]:pair_starts[i] + k]
+        frame = pd.DataFrame(matrix[lo:hi, :k], index=counties.index[lo:hi], columns=range(k))
+        frame.insert(0, "county", display[lo:hi])
+        frame["total"] = total[lo:hi]
+        frame["margin"] = margin[lo:hi]
+        frame["winner_name"] = winner_name[lo:hi]
+        frame["winner_party"] = winner_party[lo:hi]
+        frame["margin_pct"] = margin_pct[lo:hi]
+
+        # A candidate listed twice accumulates both columns, as in the old loop.
+        by_name, party_of = {}, dict(zip(names[i, :k], name_parties[i, :k]))
+        for name, votes in zip(names[i, :k], matrix[lo:hi, :k].sum(axis=0).tolist()):
+            by_name[name] = by_name.get(name, 0) + votes
+        grand_total = sum(by_name.values())
+        ranked_totals = heapq.nlargest(2, by_name.items(), key=lambda x: x[1])
+        top = ranked_totals[0][1] if ranked_totals else 0
+        second = ranked_totals[1][1] if len(ranked_totals) > 1 else 0
+        totals = {
+            "votes": [by_name[name] for name in names[i, :k]],
+            "total": grand_total,
+            "margin": top - second,
+            "margin_pct": round((top - second) / grand_total * 100, 2) if grand_total else 0,
+            "winner_party": party_of.get(ranked_totals[0][0], "?") if ranked_totals else "?",
+        }
+        results[race] = (race_ordered, frame, totals)
+    return results
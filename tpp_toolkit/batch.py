@@ -0,0 +1,109 @@
+"""Every state's county spreadsheet and county map in one ZIP.
+
+``export_states`` builds the county ``ResultsTable`` of each state's first
+race in the calling process (one vectorized pass over all states), then fans
+the expensive part -- writing the .xlsx, recoloring the map and, optionally,
+rasterizing it to PNG -- out over a process pool.  Files are written into
+the ZIP as each state finishes, in state order, so the archive streams to
+``stream`` rather than being assembled in memory.  On a single CPU there is nothing to
+fan out to and the states are exported in the calling process.
+
+Member names match the app's single-state downloads::
+
+    TX/TX_Senate_County_Results.xlsx
+    TX/Texas_Senate_Election.svg
+    TX/Texas_Senate_Election.png
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import zipfile
+
+from .colors import build_county_color_map
+from .counties import county_index
+from .states import STATE_NAMES
+from .svgassets import DEFAULT_SVG_DIR, map_catalog, minified_path
+from .svgmaps import element_id, export_svg, load_template
+from .views import county_aggregates_by_state, rate_table
+from .xlsx import to_xlsx
+
+def state_jobs(tables, election_type, thresholds, svg_dir=DEFAULT_SVG_DIR):
+    """``(state_code, table, svg_path or None)`` for every state with county results."""
+    jobs = []
+    by_state = county_aggregates_by_state(tables)
+    for code in STATE_NAMES:
+        if code not in by_state:
+            continue
+        table = rate_table(by_state[code], thresholds)
+        svg_file = f"{code.lower()}.svg"
+        jobs.append((code, table, os.path.join(svg_dir, svg_file) if svg_file in map_catalog(svg_dir) else None))
+    return jobs
+
+
+def export_state(code, election_type, table, svg_path, colors, png_dpi=None):
+    """``[(member name, bytes, already compressed)]`` of one state's files."""
+    election = election_type.replace(" ", "_")
+    stem = f"{STATE_NAMES.get(code, code).replace(' ', '_')}_{election}_Election"
+    files = [(f"{code}/{code}_{election}_County_Results.xlsx", to_xlsx(table), True)]
+    if svg_path is not None:
+        asset_path = minified_path(svg_path)
+        ratings = table.rows[["county", "rating"]].set_axis(["County", "Rating"], axis=1)
+        color_map, _ = build_county_color_map(ratings, *colors, county_index(asset_path))
+        svg_data = export_svg(load_template(asset_path).render(color_map, element_id))
+        files.append((f"{code}/{stem}.svg", svg_data.encode("utf-8"), False))
+        if png_dpi:
+            from .raster import rasterize
+
+            files.append((f"{code}/{stem}.png", rasterize(svg_data, "png", png_dpi), True))
+    return files
+
+
+def _export_job(args):
+    return export_state(*args)
+
+
+def resolve_workers(workers=None):
+    """Worker processes for ``workers`` (``None``: one per CPU)."""
+    return (os.cpu_count() or 1) if workers is None else workers
+
+
+def export_pool(workers=None):
+    """A process pool for ``export_states``, or ``None`` when one worker would be all it has.
+
+    Starting a pool spawns fresh interpreters that re-import the toolkit, so
+    a long-running process (the Streamlit server) keeps one for all exports.
+    """
+    workers = resolve_workers(workers)
+    if workers <= 1:
+        return None
+    # spawn: the Streamlit server is multi-threaded, which fork does not survive safely
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def export_states(stream, tables, election_type, thresholds, colors, png_dpi=None, svg_dir=DEFAULT_SVG_DIR,
+                  workers=None, pool=None):
+    """Write all states' county files for ``election_type`` as a ZIP into ``stream``.
+
+    ``colors`` is the ``(dem_colors, rep_colors, ind_colors)`` setting of the
+    maps.  The states are exported on ``pool`` (see ``export_pool``) when one
+    is given; otherwise on a pool of ``workers`` (default: one per CPU)
+    processes started for this export, or in this process when that is one
+    worker or fewer.  Returns the state codes exported.
+    """
+    jobs = state_jobs(tables, election_type, thresholds, svg_dir)
+    args = [(code, election_type, table, svg_path, colors, png_dpi) for code, table, svg_path in jobs]
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zf:
+        if pool is not None and len(args) > 1:
+            _write_members(zf, pool.map(_export_job, args))
+        elif resolve_workers(workers) <= 1 or len(args) < 2:
+            _write_members(zf, map(_export_job, args))
+        else:
+            with export_pool(min(resolve_workers(workers), len(args))) as own_pool:
+                _write_members(zf, own_pool.map(_export_job, args))
+    return [code for code, _, _ in jobs]
+
+
+def _write_members(zf, results):
+    for files in results:
+        for name, data, compressed in files:
+            zf.writestr(name, data, compress_type=zipfile.ZIP_STORED if compressed else zipfile.ZIP_DEFLATED)
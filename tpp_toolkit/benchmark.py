@@ -0,0 +1,54 @@
+"""Per-race cost of the aggregation core, measured on a savefile.
+
+    python -m tpp_toolkit bench save.json --repeat 5
+
+Every ``electNight*`` block of the save is normalized once, then each
+aggregation stage runs ``repeat`` times over it; the report shows the best
+run in total and divided by the races the stage covers (for the county
+stage, the races with county results).
+"""
+import time
+
+import numpy as np
+
+from .aggregate import county_results_by_race, party_slots, statewide_party_votes
+from .columnar import build_tables
+
+STAGES = {
+    "party_slots": party_slots,
+    "statewide_party_votes": statewide_party_votes,
+    "county_results_by_race": county_results_by_race,
+}
+
+
+def best_of(func, repeat=5):
+    """Fastest of ``repeat`` calls of ``func()``, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_stages(election_data, repeat=5):
+    """``[(block, stage, races, best seconds)]`` for every stage over every block of ``election_data``."""
+    rows = []
+    for key, block in election_data.items():
+        tables = build_tables(block)
+        for stage, func in STAGES.items():
+            if stage == "county_results_by_race":
+                races = len(np.unique(tables.county_votes["race"].to_numpy()))
+            else:
+                races = len(tables.races)
+            if races:
+                rows.append((key, stage, races, best_of(lambda: func(tables), repeat)))
+    return rows
+
+
+def format_report(rows):
+    """Plain-text table of ``time_stages`` rows."""
+    lines = [f"{'Block':<14} {'Stage':<24} {'Races':>7} {'ms':>9} {'us/race':>9}"]
+    lines += [f"{key:<14} {stage:<24} {races:>7,} {seconds * 1000:>9.2f} {seconds / races * 1e6:>9.1f}"
+              for key, stage, races, seconds in rows]
+    return "\n".join(lines)
@@ -0,0 +1,141 @@
+"""Command line export of savefiles, without Streamlit.
+
+    python -m tpp_toolkit export save1.json save2.json --type "U.S. House" --out exports/
+    python -m tpp_toolkit export save1.json --format parquet --format csv
+    python -m tpp_toolkit importtime main.py
+    python -m tpp_toolkit bench save1.json
+    python -m tpp_toolkit synth synthetic.json --scale 1
+
+Each savefile gets its own folder under ``--out`` (named after the file)
+holding the same spreadsheets and maps the app offers for download.  Saves
+are processed in parallel, one per worker process (``--jobs``, default one
+per CPU).  ``importtime`` prints the cold-start import report of a script
+(see ``tpp_toolkit.importtime``); ``bench`` times the aggregation stages per
+race on a savefile (see ``tpp_toolkit.benchmark``) and ``synth`` writes a
+synthetic savefile (see ``tpp_toolkit.synthetic``).
+
+Only the standard library is imported until a command runs.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import os
+import sys
+import time
+
+from .ingest import ELECTION_TYPES
+
+TABLE_FORMATS = ("xlsx", "parquet", "arrow", "csv")
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog="python -m tpp_toolkit", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write spreadsheets and maps for savefiles")
+    export.add_argument("saves", nargs="+", help="savefile(s) to export")
+    export.add_argument("--type", dest="types", action="append", choices=list(ELECTION_TYPES),
+                        help="election type to export (repeatable; default: every type in the save)")
+    export.add_argument("--out", default="exports", help="output folder (default: exports)")
+    export.add_argument("--thresholds", nargs=3, type=float, metavar=("TILT", "LEAN", "LIKELY"),
+                        help="rating margin thresholds in %% (default: the app's defaults per view)")
+    export.add_argument("--colors", help="color settings JSON saved from the app")
+    export.add_argument("--states", action="store_true",
+                        help="also write the all-states county ZIP for President/Senate/Governor")
+    export.add_argument("--png-dpi", type=int, help="include PNG county maps at this DPI in the ZIPs")
+    export.add_argument("--format", dest="formats", action="append", choices=list(TABLE_FORMATS),
+                        help="national view file format (repeatable; default: xlsx)")
+    export.add_argument("--jobs", type=int, default=0, help="worker processes (default: one per CPU)")
+
+    importtime = commands.add_parser("importtime", help="report the import time of a script's imports")
+    importtime.add_argument("script", nargs="?", default="main.py")
+    importtime.add_argument("--top", type=int, default=15, help="rows per table (default: 15)")
+
+    bench = commands.add_parser("bench", help="time the aggregation stages per race on a savefile")
+    bench.add_argument("save", help="savefile to aggregate")
+    bench.add_argument("--repeat", type=int, default=5, help="runs per stage; the best is reported (default: 5)")
+
+    synth = commands.add_parser("synth", help="write a synthetic savefile")
+    synth.add_argument("out", help="savefile to write")
+    synth.add_argument("--seed", type=int, default=0)
+    synth.add_argument("--scale", type=float, default=1.0, help="race count multiplier (default: 1, real-world size)")
+    return parser
+
+
+def _out_dir(out, save, saves):
+    """``out/<save name>``, disambiguated when two saves share a file name."""
+    stem = os.path.splitext(os.path.basename(save))[0]
+    if sum(os.path.splitext(os.path.basename(s))[0] == stem for s in saves) > 1:
+        stem = f"{stem}_{saves.index(save) + 1}"
+    return os.path.join(out, stem)
+
+
+def export(args):
+    from .export import color_setting, export_savefile
+
+    colors = None
+    if args.colors:
+        with open(args.colors, "r", encoding="utf-8") as f:
+            colors = color_setting(json.load(f))
+    saves = list(dict.fromkeys(args.saves))
+    options = dict(election_types=args.types, thresholds=args.thresholds, colors=colors, states=args.states,
+                   png_dpi=args.png_dpi, formats=tuple(dict.fromkeys(args.formats or ["xlsx"])))
+    jobs = min(args.jobs or os.cpu_count() or 1, len(saves))
+
+    start = time.perf_counter()
+    failures = 0
+    if jobs == 1:
+        results = []
+        for save in saves:
+            try:
+                results.append((save, export_savefile(save, _out_dir(args.out, save, saves), **options), None))
+            except Exception as e:
+                results.append((save, [], e))
+        outcomes = iter(results)
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        futures = {pool.submit(export_savefile, save, _out_dir(args.out, save, saves), **options): save
+                   for save in saves}
+
+        def outcomes_of():
+            with pool:
+                for future in as_completed(futures):
+                    error = future.exception()
+                    yield futures[future], ([] if error else future.result()), error
+
+        outcomes = outcomes_of()
+
+    for save, written, error in outcomes:
+        if error is not None:
+            failures += 1
+            print(f"{save}: failed: {error}", file=sys.stderr)
+        else:
+            print(f"{save}: {len(written)} files")
+    print(f"Exported {len(saves) - failures}/{len(saves)} savefiles in {time.perf_counter() - start:.1f}s",
+          file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    if args.command == "export":
+        return export(args)
+    if args.command == "importtime":
+        from .importtime import format_report, measure, script_imports
+
+        print(format_report(measure(script_imports(args.script)), args.top))
+        return 0
+    if args.command == "bench":
+        from .benchmark import format_report, time_stages
+        from .ingest import load_savefile
+
+        with open(args.save, "rb") as f:
+            print(format_report(time_stages(load_savefile(f.read()).election_data, args.repeat)))
+        return 0
+    if args.command == "synth":
+        from .synthetic import make_savefile
+
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(make_savefile(args.seed, args.scale), f)
+        return 0
+    return 2
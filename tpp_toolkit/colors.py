@@ -0,0 +1,61 @@
+"""Map fills from rating columns.
+
+Each builder maps a table's region column (state or county) and its
+``Rating`` column through lookup Series in one pass, so coloring a map costs
+a couple of vectorized ``map`` calls rather than a Python loop over rows.
+The rating -> color lookup is built once per color setting.
+"""
+from functools import lru_cache
+
+import pandas as pd
+
+from .palette import DEFAULT_COLOR, PARTY_NAMES, STRENGTHS
+from .states import STATE_CODES
+
+STATE_NAME_TO_CODE = pd.Series(STATE_CODES, dtype=object)
+
+
+@lru_cache(maxsize=32)
+def _rating_colors(settings):
+    return pd.Series({
+        f"{strength} {party}": colors.get(strength, DEFAULT_COLOR)
+        for party, colors in zip(PARTY_NAMES, map(dict, settings))
+        for strength in STRENGTHS
+    }, dtype=object)
+
+
+def rating_colors(dem_colors, rep_colors, ind_colors):
+    """Rating label ("Lean Republican") -> color Series for one color setting."""
+    return _rating_colors(tuple(tuple(sorted(colors.items())) for colors in (dem_colors, rep_colors, ind_colors)))
+
+
+def _rated(df, key_column):
+    """``key_column`` and stripped ``Rating`` of the rows that have both."""
+    keys, ratings = df[key_column], df["Rating"]
+    present = keys.notna() & ratings.notna()
+    return keys[present], ratings[present].astype(str).str.strip()
+
+
+def build_state_color_map(df, dem_colors, rep_colors, ind_colors):
+    """State code -> color from the ``State`` (name or code) and ``Rating`` columns."""
+    states, ratings = _rated(df, "State")
+    states = states.astype(str).str.strip()
+    codes = states.map(STATE_NAME_TO_CODE).fillna("").where(states.str.len() > 2, states.str.upper())
+    colors = ratings.map(rating_colors(dem_colors, rep_colors, ind_colors)).fillna(DEFAULT_COLOR)
+    return dict(zip(codes, colors))
+
+
+def build_county_color_map(df, dem_colors, rep_colors, ind_colors, index):
+    """Map element id -> color for each county row, plus the county names ``index`` could not place."""
+    counties, ratings = _rated(df, "County")
+    counties = counties.astype(str).str.strip()
+    keep = (counties != "") & (ratings != "")
+    counties, ratings = counties[keep], ratings[keep]
+
+    names = pd.unique(counties)
+    resolved = pd.Series([index.resolve(name) for name in names], index=names, dtype=object)
+    regions = counties.map(resolved)
+    colors = ratings.map(rating_colors(dem_colors, rep_colors, ind_colors)).fillna(DEFAULT_COLOR)
+    placed = regions.notna()
+    unmatched = resolved.index[resolved.isna()].tolist()
+    return dict(zip(regions[placed], colors[placed])), unmatched
@@ -0,0 +1,105 @@
+"""Columnar election tables.
+
+Every ``electNight*`` block has the same shape: ``{"elections": [entry, ...]}``
+where each entry has a ``state``, an optional ``district``, a ``cands`` list and
+an optional ``counties`` list whose items carry their own ``cands``.  The
+normalizer walks that structure once and produces flat, typed tables that the
+views aggregate with pandas/NumPy instead of re-walking nested dicts:
+
+``races``         one row per entry, in file order (``race`` is the row number)
+``candidates``    one row per statewide/district candidate
+``counties``      one row per county block
+``county_votes``  one row per candidate result inside a county block
+``parties``       party code -> display label for every code seen
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+PARTY_LABELS = {"D": "Democratic", "R": "Republican", "I": "Independent"}
+
+
+@dataclass(frozen=True)
+class ElectionTables:
+    races: pd.DataFrame
+    candidates: pd.DataFrame
+    counties: pd.DataFrame
+    county_votes: pd.DataFrame
+    parties: pd.Series
+
+
+def district_column(values):
+    """Integral districts become nullable ints; anything else stays text."""
+    numeric = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+    present = pd.notna(pd.Series(values, dtype=object))
+    if numeric[present].notna().all() and (numeric[present] % 1 == 0).all():
+        return numeric.astype("Int64")
+    return pd.Series(values, dtype="string")
+
+
+def build_tables(block: dict) -> ElectionTables:
+    """Normalize one ``electNight*`` block into columnar tables."""
+    entries = block.get("elections", []) if isinstance(block, dict) else []
+
+    race_state, race_district = [], []
+    cand_race, cand_name, cand_party, cand_votes, cand_ev, cand_inc, cand_caucus = [], [], [], [], [], [], []
+    county_race, county_name = [], []
+    cv_county, cv_name, cv_party, cv_votes = [], [], [], []
+
+    for race, entry in enumerate(entries):
+        race_state.append(entry.get("state"))
+        race_district.append(entry.get("district"))
+        for c in entry.get("cands", []):
+            cand_race.append(race)
+            cand_name.append(c.get("name", ""))
+            cand_party.append(c.get("party", ""))
+            cand_votes.append(c.get("votes", 0))
+            cand_ev.append(c.get("electoralVotes", 0))
+            cand_inc.append(bool(c.get("incumbent", False)))
+            cand_caucus.append(c.get("caucus", ""))
+        for county in entry.get("counties", []):
+            county_id = len(county_race)
+            county_race.append(race)
+            county_name.append(county.get("name", "Unknown County"))
+            for c in county.get("cands", []):
+                cv_county.append(county_id)
+                cv_name.append(c.get("name", ""))
+                cv_party.append(c.get("party", ""))
+                cv_votes.append(c.get("votes", 0))
+
+    races = pd.DataFrame({
+        "state": pd.Categorical(race_state),
+        "district": district_column(race_district),
+    })
+    races.index.name = "race"
+
+    candidates = pd.DataFrame({
+        "race": np.asarray(cand_race, dtype=np.int32),
+        "name": pd.Categorical(cand_name),
+        "party": pd.Categorical(cand_party),
+        "votes": np.asarray(cand_votes, dtype=np.float64),
+        "electoral_votes": np.asarray(cand_ev, dtype=np.int32),
+        "incumbent": np.asarray(cand_inc, dtype=bool),
+        "caucus": pd.Categorical(cand_caucus),
+    })
+
+    counties = pd.DataFrame({
+        "race": np.asarray(county_race, dtype=np.int32),
+        "name": pd.Categorical(county_name),
+    })
+    counties.index.name = "county"
+
+    county_ids = np.asarray(cv_county, dtype=np.int32)
+    county_votes = pd.DataFrame({
+        "county": county_ids,
+        "race": counties["race"].to_numpy()[county_ids],
+        "name": pd.Categorical(cv_name),
+        "party": pd.Categorical(cv_party),
+        "votes": np.asarray(cv_votes, dtype=np.float64),
+    })
+
+    codes = pd.Index(candidates["party"].cat.categories.union(county_votes["party"].cat.categories))
+    parties = pd.Series([PARTY_LABELS.get(code, code) for code in codes], index=codes, name="label")
+
+    return ElectionTables(races, candidates, counties, county_votes, parties)
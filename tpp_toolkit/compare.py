@@ -0,0 +1,199 @@
+"""Two-save comparison: vote-share swing, rating changes and flips.
+
+Each save's tables are reduced to one row per race (``race_shares``) or per
+county (``county_shares``) holding the Democratic and Republican vote
+shares, the leading party and its margin over the next party.  Rows are
+keyed by state and district (or county key, see ``counties.county_key``)
+plus ``seq``, the row's position among rows with the same key, so a state's
+second Senate race lines up with the other save's second.  The two sides
+are aligned with a single outer merge on those keys and every comparison
+column is an array operation on the merged frame, so comparing all ~3,000
+counties costs about as much as aggregating one save.
+
+Shares and margins are by party (a party's candidates are added together).
+Swing is the change in the Democratic-minus-Republican margin in points,
+positive toward Democrats.  ``rate_comparison`` rates both sides with the
+usual thresholds and the swing against ``SWING_THRESHOLDS``, labelling it
+with the party it moved toward ("Lean Democratic" is a 1-3 point swing to
+Democrats), so swing maps are colored with the existing party schemes.
+"""
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import margin_percent, round2, top_two
+from .columnar import PARTY_LABELS
+from .counties import county_key
+from .ratings import rate
+from .states import STATE_NAMES
+from .tables import PERCENT, Column, ResultsTable
+
+SWING_THRESHOLDS = (1, 3, 6)
+BASE_GROUP = "Base save"
+OTHER_GROUP = "Comparison save"
+SWING_GROUP = "Swing"
+
+
+def _shares(group, parties, votes, n):
+    """Party shares of ``n`` groups from per-candidate ``group`` ids, parties and votes."""
+    codes, uniques = pd.factorize(np.asarray(parties, dtype=object))
+    k = len(uniques)
+    matrix = np.bincount(np.asarray(group, dtype=np.int64) * k + codes, weights=np.asarray(votes, dtype=np.float64),
+                         minlength=n * k).reshape(n, k)
+    total = matrix.sum(axis=1)
+    top, second = top_two(matrix)
+    leader = np.asarray(uniques, dtype=object)[matrix.argmax(axis=1)] if k else np.full(n, None, dtype=object)
+
+    def share(party):
+        found = np.flatnonzero(np.asarray(uniques, dtype=object) == party)
+        return margin_percent(matrix[:, found[0]], total) if len(found) else np.zeros(n)
+
+    return pd.DataFrame({
+        "D_pct": share("D"),
+        "R_pct": share("R"),
+        "party": np.where(total > 0, leader, None),
+        "margin_pct": margin_percent(top - second, total),
+        "total": np.rint(total).astype(np.int64),
+    })
+
+
+def _with_seq(frame, keys):
+    frame.insert(len(keys), "seq", frame.groupby(list(keys), sort=False).cumcount().to_numpy())
+    return frame
+
+
+def race_shares(tables):
+    """One row per race: ``state``, ``district``, ``seq`` and the party shares, in file order."""
+    races, cands = tables.races, tables.candidates
+    shares = _shares(cands["race"].to_numpy(), cands["party"], cands["votes"], len(races))
+    shares.insert(0, "state", races["state"].astype(str).to_numpy())
+    shares.insert(1, "district", races["district"].astype(str).to_numpy())
+    return _with_seq(shares, ("state", "district"))
+
+
+def county_shares(tables):
+    """One row per county block of each state's first race (the races the county views show).
+
+    ``county`` is the matching key of the block's name and ``name`` the
+    county as the county views display it.
+    """
+    first_races = tables.races.index.to_series().groupby(tables.races["state"], observed=True).first()
+    counties = tables.counties[tables.counties["race"].isin(first_races)]
+    cv = tables.county_votes[tables.county_votes["race"].isin(first_races)]
+    # A candidate listed twice in a block counts once, with its last entry, as in the county views.
+    cv = cv.assign(name=cv["name"].astype(object)).drop_duplicates(["county", "name"], keep="last")
+    shares = _shares(counties.index.get_indexer(cv["county"]), cv["party"], round2(cv["votes"]), len(counties))
+    names = counties["name"].astype(str)
+    shares.insert(0, "state", tables.races["state"].astype(str).to_numpy()[counties["race"].to_numpy()])
+    shares.insert(1, "county", names.map({name: county_key(name) for name in names.unique()}).to_numpy())
+    shares.insert(2, "name", names.str.replace(" County", "").str.title().to_numpy())
+    return _with_seq(shares, ("state", "county"))
+
+
+def _party_labels(parties, labels):
+    parties = pd.Series(np.asarray(parties, dtype=object))
+    return parties.map(labels).fillna(parties).where(parties.notna(), "").to_numpy(dtype=object)
+
+
+def compare_shares(base, other, keys, lead_columns, title, labels=PARTY_LABELS):
+    """``ResultsTable`` of two ``*_shares`` frames joined on ``keys`` (ratings empty, see ``rate_comparison``).
+
+    Rows present in only one save are kept, with the other side blank; the
+    ``change`` column tells them apart from holds and flips.
+    """
+    merged = base.merge(other, on=[*keys, "seq"], how="outer", suffixes=("_base", ""), sort=False, indicator=True)
+    side = merged.pop("_merge").astype(str).to_numpy()
+    base_winner = _party_labels(merged["party_base"], labels)
+    winner = _party_labels(merged["party"], labels)
+    swing = (merged["D_pct"] - merged["R_pct"]) - (merged["D_pct_base"] - merged["R_pct_base"])
+
+    columns = [*lead_columns]
+    rows = {"state": merged["state"].map(STATE_NAMES).fillna(merged["state"]).to_numpy()}
+    for column in lead_columns[1:]:
+        # Columns outside the keys (a county's display name) are the base save's where it has the row.
+        values = merged[column.key]
+        if f"{column.key}_base" in merged:
+            values = merged[f"{column.key}_base"].fillna(values)
+        rows[column.key] = values.to_numpy()
+    for group, prefix, side_winner, suffix in ((BASE_GROUP, "base_", base_winner, "_base"),
+                                               (OTHER_GROUP, "", winner, "")):
+        columns += [
+            Column(f"{prefix}winner", "Leader", group),
+            Column(f"{prefix}D_pct", "Dem %", group, PERCENT),
+            Column(f"{prefix}R_pct", "Rep %", group, PERCENT),
+            Column(f"{prefix}margin_pct", "Margin %", group, PERCENT),
+            Column(f"{prefix}rating", "Rating", group),
+        ]
+        rows[f"{prefix}winner"] = side_winner
+        for field in ("D_pct", "R_pct", "margin_pct"):
+            rows[f"{prefix}{field}"] = merged[f"{field}{suffix}"].to_numpy()
+    columns += [
+        Column("D_change", "Dem ±", SWING_GROUP, PERCENT),
+        Column("R_change", "Rep ±", SWING_GROUP, PERCENT),
+        Column("swing", "D-R Swing", SWING_GROUP, PERCENT),
+        Column("change", "Result", SWING_GROUP),
+        Column("rating_change", "Rating Change", SWING_GROUP),
+    ]
+    rows["D_change"] = round2(merged["D_pct"] - merged["D_pct_base"]).to_numpy()
+    rows["R_change"] = round2(merged["R_pct"] - merged["R_pct_base"]).to_numpy()
+    rows["swing"] = round2(swing).to_numpy()
+    rows["change"] = np.select(
+        [side == "left_only", side == "right_only", base_winner != winner],
+        ["Base only", "Comparison only", "Flip"], "Hold")
+    return ResultsTable(title, tuple(columns), pd.DataFrame(rows))
+
+
+def compare_races(base_tables, other_tables, title, statewide=False, labels=PARTY_LABELS):
+    """Race-by-race comparison of one election type in two saves (statewide races show no district)."""
+    lead_columns = [Column("state", "State")] + ([] if statewide else [Column("district", "District")])
+    return compare_shares(race_shares(base_tables), race_shares(other_tables), ("state", "district"),
+                          lead_columns, title, labels)
+
+
+def compare_counties(base_tables, other_tables, title, labels=PARTY_LABELS):
+    """County-by-county comparison of each state's first statewide race in two saves."""
+    return compare_shares(county_shares(base_tables), county_shares(other_tables), ("state", "county"),
+                          [Column("state", "State"), Column("name", "County")], title, labels)
+
+
+def rate_comparison(table, thresholds, swing_thresholds=SWING_THRESHOLDS, labels=PARTY_LABELS):
+    """``table`` from ``compare_shares`` with both sides' ratings, rating changes and swing ratings filled in.
+
+    ``swing_rating`` (not shown) rates the swing's size toward the party it
+    moved to, for coloring swing maps.
+    """
+    rows = table.rows
+    rated = {}
+    for prefix in ("base_", ""):
+        winner = rows[f"{prefix}winner"].to_numpy(dtype=object)
+        rating = rate(rows[f"{prefix}margin_pct"], winner, *thresholds)
+        rated[f"{prefix}rating"] = np.where(winner != "", rating, "")
+    swing = rows["swing"].to_numpy(dtype=np.float64)
+    toward = np.where(swing >= 0, labels.get("D", "D"), labels.get("R", "R"))
+    moved = rated["base_rating"] != rated["rating"]
+    present = (rated["base_rating"] != "") & (rated["rating"] != "")
+    rated["rating_change"] = np.where(present & moved,
+                                      pd.Series(rated["base_rating"]) + " → " + pd.Series(rated["rating"]), "")
+    rated["swing_rating"] = np.where(np.isnan(swing), "", rate(np.abs(swing), toward, *swing_thresholds))
+    return replace(table, rows=rows.assign(**rated))
+
+
+def swing_frame(table):
+    """Map frame of a rated comparison: region (``State`` or ``County``) and its swing rating as ``Rating``."""
+    region = ("County", "name") if "name" in table.rows else ("State", "state")
+    return pd.DataFrame({region[0]: table.rows[region[1]].to_numpy(), "Rating": table.rows["swing_rating"].to_numpy()})
+
+
+def comparison_summary(table):
+    """Counts of compared, flipped and re-rated rows and the mean swing of a rated comparison."""
+    rows = table.rows
+    change = rows["change"]
+    swing = rows["swing"].dropna()
+    return {
+        "rows": len(rows),
+        "compared": int(change.isin(("Hold", "Flip")).sum()),
+        "flips": int((change == "Flip").sum()),
+        "rating_changes": int((rows["rating_change"] != "").sum()),
+        "mean_swing": float(swing.mean()) if len(swing) else 0.0,
+    }
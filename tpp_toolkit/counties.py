@@ -0,0 +1,95 @@
+"""County name -> county map element id, resolved through a per-map alias index.
+
+County names in a save ("St. Louis City", "Fairfax County", "Doña Ana") and
+element ids in the maps ("St_Louis_City", "Fairfax_County", "Dona_Ana") are
+both reduced to keys by the same precompiled rules: lowercase, accents and
+punctuation dropped, separators as ``_`` and "Saint"/"St."/"Ste." folded to
+``st``/``ste``.  A key minus a trailing "county"/"parish"/"borough"/"city"...
+suffix is an alias.
+
+``CountyIndex`` is built once per map from its element ids.  A name resolves
+by trying its key, then its aliases, against the ids' keys first and their
+aliases second; where several ids share an alias, the one that lost a
+county-type suffix wins over one that lost "city" ("Fairfax" is
+Fairfax_County, not Fairfax_City), then document order.  Every lookup is a
+couple of dict probes and the answer never depends on row order.
+"""
+from functools import lru_cache
+import os
+import re
+import unicodedata
+
+from .svgmaps import load_template
+
+_DROP = re.compile(r"[.'’`]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+_SAINT = re.compile(r"(?:^|(?<=_))(?:(saint|st)|(sainte|ste))_")
+_SUFFIX = re.compile(r"_(city_and_borough|census_area|county|parish|borough|municipality|city)$")
+# Suffixes that mark a county equivalent rank ahead of "city".
+_SUFFIX_RANK = {"city": 1}
+
+
+def county_key(name):
+    """Matching key of a county name or element id ("St. Louis City" -> "stlouis_city")."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    text = _SEPARATORS.sub("_", _DROP.sub("", text.lower())).strip("_")
+    return _SAINT.sub(lambda m: "st" if m.group(1) else "ste", text)
+
+
+def county_aliases(key):
+    """``(alias, rank)`` for ``key`` with one, then two... suffixes removed."""
+    aliases = []
+    depth = 0
+    while True:
+        match = _SUFFIX.search(key)
+        if not match or match.start() == 0:
+            return aliases
+        depth += 1
+        key = key[:match.start()]
+        aliases.append((key, (depth, _SUFFIX_RANK.get(match.group(1), 0))))
+
+
+class CountyIndex:
+    """Resolves county names to the element ids of one county map."""
+
+    __slots__ = ("region_ids", "_exact", "_alias", "_resolved")
+
+    def __init__(self, region_ids):
+        self.region_ids = tuple(dict.fromkeys(region_ids))
+        self._exact = {}
+        ranked = {}
+        for order, region in enumerate(self.region_ids):
+            key = county_key(region)
+            self._exact.setdefault(key, region)
+            for alias, rank in county_aliases(key):
+                best = ranked.get(alias)
+                if best is None or (rank, order) < best[0]:
+                    ranked[alias] = ((rank, order), region)
+        self._alias = {alias: region for alias, (_, region) in ranked.items()}
+        self._resolved = {}
+
+    def resolve(self, name):
+        """Element id for county ``name``, or ``None`` if the map has no match."""
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        key = county_key(name)
+        region = None
+        for candidate in [key] + [alias for alias, _ in county_aliases(key)]:
+            region = self._exact.get(candidate) or self._alias.get(candidate)
+            if region is not None:
+                break
+        self._resolved[name] = region
+        return region
+
+
+@lru_cache(maxsize=64)
+def _county_index(path, mtime_ns, size):
+    return CountyIndex(load_template(path).slot_ids)
+
+
+def county_index(path):
+    """The ``CountyIndex`` of the county map at ``path``, rebuilt only when it changes."""
+    stat = os.stat(path)
+    return _county_index(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
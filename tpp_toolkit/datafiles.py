@@ -0,0 +1,97 @@
+"""Parquet, Arrow IPC and CSV export of ``ResultsTable``s.
+
+These are the machine-readable counterparts of the spreadsheet downloads:
+the same rows and columns, written straight from the table's frame with
+pyarrow, with nothing laid out for Excel.  Every grouped column is named
+"Group - Label" ("Democratic - %"; ``ResultsTable.labels(qualified=True)``),
+so no header depends on the column before it, and typed by kind:
+
+* counts are ``int64`` (``float64`` if any value is fractional),
+* percentages are ``float64`` in percent, as shown (12.5 is 12.5%),
+* text columns stay numbers when every value is one (district numbers),
+  and are strings otherwise.
+
+Missing values are nulls.  Each field's metadata keeps its ``group``,
+``label`` and ``kind``, so the two-level header can be rebuilt.  The totals
+row is left out; it is a sum over the rows for anyone reading them.
+"""
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from .tables import COUNT, PERCENT
+
+FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+    "csv": "text/csv",
+}
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+
+def _numbers(values):
+    numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    missing = np.isnan(numeric)
+    if np.array_equal(numeric[~missing], np.round(numeric[~missing])):
+        return pa.array(np.where(missing, 0, numeric).astype(np.int64), mask=missing)
+    return pa.array(numeric, mask=missing)
+
+
+def _text(values):
+    present = values.notna() & (values != "")
+    kind = pd.api.types.infer_dtype(values[present], skipna=True)
+    if present.any() and kind in ("integer", "floating", "mixed-integer-float", "decimal"):
+        return _numbers(values.where(present))
+    if kind != "string":
+        values = values.where(~present, "").astype(str)
+    return pa.array(values.where(present, None), type=pa.string())
+
+
+def to_arrow(table):
+    """``table``'s rows as a typed ``pyarrow.Table`` (no totals row)."""
+    arrays, fields = [], []
+    for label, column in zip(table.labels(qualified=True), table.columns):
+        values = table.rows[column.key] if column.key in table.rows else pd.Series([None] * len(table.rows))
+        values = values.reset_index(drop=True)
+        if column.kind == COUNT:
+            array = _numbers(values)
+        elif column.kind == PERCENT:
+            array = pa.array(pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64), from_pandas=True)
+        else:
+            array = _text(values.astype(object))
+        arrays.append(array)
+        fields.append(pa.field(label, array.type, metadata={
+            "group": column.group, "label": column.label, "kind": column.kind}))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata={"title": table.title}))
+
+
+def to_parquet(table) -> bytes:
+    stream = BytesIO()
+    pq.write_table(to_arrow(table), stream)
+    return stream.getvalue()
+
+
+def to_arrow_ipc(table) -> bytes:
+    """``table`` as an Arrow IPC file (Feather v2), readable with ``pyarrow.feather`` or ``pandas.read_feather``."""
+    stream = BytesIO()
+    feather.write_feather(to_arrow(table), stream, compression="uncompressed")
+    return stream.getvalue()
+
+
+def to_csv(table) -> bytes:
+    stream = BytesIO()
+    pacsv.write_csv(to_arrow(table), stream)
+    return stream.getvalue()
+
+
+WRITERS = {"parquet": to_parquet, "arrow": to_arrow_ipc, "csv": to_csv}
+
+
+def to_bytes(table, fmt):
+    """``table`` serialized as ``fmt`` (a key of ``FORMATS``)."""
+    return WRITERS[fmt](table)
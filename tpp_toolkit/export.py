@@ -0,0 +1,128 @@
+"""The app's spreadsheet and map downloads as plain functions.
+
+Everything the Streamlit views offer for download -- the national view
+spreadsheet of each election type, the colored national map, and the
+all-states county ZIP -- can be produced from a savefile here, with the same
+defaults the app starts with and the same file names.  National views can
+also be written as Parquet, Arrow IPC or CSV (``tpp_toolkit.datafiles``).  ``export_savefile``
+writes them all for one save; ``tpp_toolkit.cli`` runs it over many saves.
+"""
+import os
+
+from .batch import export_states
+from .colors import build_state_color_map
+from .columnar import build_tables
+from .ingest import ELECTION_TYPES, load_savefile
+from .palette import DEFAULT_COLOR_SETTINGS, PARTY_NAMES
+from .ratings import DEFAULT_THRESHOLDS
+from .svgassets import DEFAULT_SVG_DIR, minified_path
+from .svgmaps import export_svg, load_template, state_region_id
+from .views import house_table, legislature_table, presidential_table, statewide_table
+from .xlsx import to_xlsx
+
+# The app's initial slider positions for each view.
+VIEW_THRESHOLDS = {
+    "President": (1, 5, 15),
+    "Senate": (1, 5, 15),
+    "Governor": (1, 5, 15),
+    "U.S. House": (1, 5, 15),
+    "State House": DEFAULT_THRESHOLDS,
+    "State Senate": DEFAULT_THRESHOLDS,
+}
+
+NATIONAL_MAPS = {"President": "presidential.svg", "Senate": "states.svg", "Governor": "states.svg"}
+STATEWIDE_TYPES = ("President", "Senate", "Governor")
+
+
+def national_table(tables, election_type, thresholds=None):
+    """The national view ``ResultsTable`` of ``election_type``."""
+    thresholds = tuple(thresholds or VIEW_THRESHOLDS[election_type])
+    if election_type == "President":
+        return presidential_table(tables, thresholds)
+    if election_type in ("Senate", "Governor"):
+        return statewide_table(tables, election_type, thresholds)
+    if election_type == "U.S. House":
+        return house_table(tables, thresholds)
+    if election_type in ("State House", "State Senate"):
+        return legislature_table(tables, election_type, thresholds)
+    raise ValueError(f"Unknown election type: {election_type!r}")
+
+
+def national_table_file_name(election_type):
+    if election_type == "President":
+        return "Presidential_National_View.xlsx"
+    if election_type == "U.S. House":
+        return "House_National_View.xlsx"
+    return f"{election_type.replace(' ', '_')}_National_View.xlsx"
+
+
+def color_setting(settings=None):
+    """``(dem_colors, rep_colors, ind_colors)`` from a saved color settings dict."""
+    settings = settings or DEFAULT_COLOR_SETTINGS
+    return tuple(dict(settings[party]) for party in PARTY_NAMES)
+
+
+def national_map(table, election_type, colors=None, svg_dir=DEFAULT_SVG_DIR):
+    """The colored national map SVG of a statewide view, or ``None`` for other views."""
+    map_file = NATIONAL_MAPS.get(election_type)
+    if map_file is None:
+        return None
+    ratings = table.frame().iloc[:len(table.rows)]
+    color_map = build_state_color_map(ratings, *(colors or color_setting()))
+    template = load_template(minified_path(os.path.join(svg_dir, map_file)))
+    return export_svg(template.render(color_map, state_region_id))
+
+
+def table_file(table, fmt):
+    """``table`` written as ``fmt``: ``"xlsx"`` or a ``datafiles.FORMATS`` key."""
+    if fmt == "xlsx":
+        return to_xlsx(table)
+    from .datafiles import to_bytes
+
+    return to_bytes(table, fmt)
+
+
+def export_savefile(path, out_dir, election_types=None, thresholds=None, colors=None, states=False,
+                    png_dpi=None, svg_dir=DEFAULT_SVG_DIR, formats=("xlsx",)):
+    """Write every download for the savefile at ``path`` into ``out_dir``.
+
+    ``election_types`` defaults to all types present in the save, and each
+    national view is written in every one of ``formats``.  With
+    ``states``, statewide types also get the all-states county ZIP (with
+    PNG maps at ``png_dpi`` if given).  Returns the paths written.
+    """
+    with open(path, "rb") as f:
+        election_data = load_savefile(f.read()).election_data
+    colors = colors or color_setting()
+    os.makedirs(out_dir, exist_ok=True)
+
+    written = []
+
+    def write(name, data):
+        target = os.path.join(out_dir, name)
+        with open(target, "wb") as f:
+            f.write(data)
+        written.append(target)
+
+    for election_type in election_types or ELECTION_TYPES:
+        key = ELECTION_TYPES[election_type]
+        if key not in election_data:
+            continue
+        tables = build_tables(election_data[key])
+        view_thresholds = tuple(thresholds or VIEW_THRESHOLDS[election_type])
+        table = national_table(tables, election_type, view_thresholds)
+        stem = os.path.splitext(national_table_file_name(election_type))[0]
+        for fmt in formats:
+            write(f"{stem}.{fmt}", table_file(table, fmt))
+
+        svg_data = national_map(table, election_type, colors, svg_dir)
+        if svg_data is not None:
+            write(f"National_View_{election_type.replace(' ', '_')}_Election.svg", svg_data.encode("utf-8"))
+
+        if states and election_type in STATEWIDE_TYPES:
+            target = os.path.join(out_dir, f"{election_type.replace(' ', '_')}_All_States.zip")
+            with open(target, "wb") as f:
+                export_states(f, tables, election_type, view_thresholds, colors, png_dpi=png_dpi,
+                              svg_dir=svg_dir, workers=0)
+            written.append(target)
+    return written
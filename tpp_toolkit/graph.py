@@ -0,0 +1,67 @@
+"""A small memoizing dependency graph for the views' recompute stages.
+
+A view is a chain of stages -- columnar tables, aggregates, ratings, display
+frame, color map, rendered map -- where each stage depends on the stage
+before it plus a few parameters of its own (thresholds, colors, a map file)::
+
+    tables  = graph.node("tables", load, params=(digest, "electNightUSS"))
+    base    = graph.node("aggregates", statewide_aggregates, tables)
+    rated   = graph.node("ratings", lambda t: rate_table(t, thresholds), base, params=thresholds)
+
+A node's key is its name, its params and the keys of its dependencies, so it
+names everything its value was computed from.  ``value()`` returns the
+memoized value for that key or computes it from its dependencies' values.
+Moving a threshold slider changes the key of the ratings node and everything
+downstream of it, while the aggregates node keeps its key and its value.
+
+``compute`` must depend only on its dependencies' values and on what is in
+``params``; anything else it closes over has to be part of ``params``.
+"""
+from collections import Counter, OrderedDict
+from threading import Lock
+
+
+class Node:
+    __slots__ = ("graph", "name", "compute", "deps", "key")
+
+    def __init__(self, graph, name, compute, deps, key):
+        self.graph = graph
+        self.name = name
+        self.compute = compute
+        self.deps = deps
+        self.key = key
+
+    def value(self):
+        return self.graph._value(self)
+
+
+class Graph:
+    """Node values in a bounded LRU shared by every caller of the graph."""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.computed = Counter()
+        self._values = OrderedDict()
+        self._lock = Lock()
+
+    def node(self, name, compute, *deps, params=()):
+        """A stage computing ``compute(*dep values)``; nothing is computed until ``value()``."""
+        return Node(self, name, compute, deps, (name, params) + tuple(dep.key for dep in deps))
+
+    def _value(self, node):
+        with self._lock:
+            if node.key in self._values:
+                self._values.move_to_end(node.key)
+                return self._values[node.key]
+        value = node.compute(*(dep.value() for dep in node.deps))
+        with self._lock:
+            self.computed[node.name] += 1
+            self._values[node.key] = value
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self.computed.clear()
@@ -0,0 +1,51 @@
+"""Cold-start import report: ``python -X importtime`` for a script's imports, summarized.
+
+Runs the top-level import statements of a script (``main.py`` by default) in
+a fresh interpreter under ``-X importtime`` and reports the total, the
+slowest top-level imports with their cumulative time, the modules with the
+most self time, and whether the heavy libraries were loaded at all::
+
+    python -m tpp_toolkit importtime main.py --top 15
+"""
+import ast
+import subprocess
+import sys
+
+HEAVY_MODULES = ("streamlit", "pandas", "numpy", "pyarrow", "openpyxl", "lxml", "cairosvg")
+
+
+def script_imports(path):
+    """Source of the module-level ``import`` statements of the script at ``path``."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(statements, cwd=None):
+    """``[(module, self_us, cumulative_us, depth)]`` from importing ``statements`` in a new process."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "\n".join(statements)], cwd=cwd,
+                            capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def format_report(entries, top=15):
+    """Plain-text summary of ``measure`` output."""
+    roots = sorted((e for e in entries if e[3] == 0), key=lambda e: e[2], reverse=True)
+    total = sum(e[2] for e in roots)
+    loaded = {e[0] for e in entries}
+    lines = [f"Total import time: {total / 1000:.1f} ms ({len(entries)} modules)", "",
+             f"{'Top-level import':<40} {'cumulative ms':>14}"]
+    lines += [f"{name:<40} {cumulative / 1000:>14.1f}" for name, _, cumulative, _ in roots[:top]]
+    lines += ["", f"{'Module (self time)':<40} {'self ms':>14}"]
+    by_self = sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+    lines += [f"{name:<40} {self_us / 1000:>14.1f}" for name, self_us, _, _ in by_self]
+    lines += ["", "Heavy modules loaded: " + ", ".join(
+        f"{name} {'yes' if name in loaded else 'no'}" for name in HEAVY_MODULES)]
+    return "\n".join(lines)
@@ -0,0 +1,126 @@
+"""Savefile ingestion.
+
+Savefiles are many megabytes, so each one is parsed once and the extracted
+election data is kept in a small process-wide LRU keyed by a content hash of
+the upload.  Streamlit reruns (slider moves, color pickers, re-uploads of the
+same file) then get the already-extracted dict back without touching JSON.
+
+With a ``tpp_toolkit.store.TableStore`` the processed tables also outlive
+the process: a save already in the store is not parsed at all, and its
+``election_data`` only names the stored blocks (see ``IngestResult.stored``).
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+from .savefile import extract_keys
+
+ELECTION_KEYS = [
+    "electNightSB", "electNightCC", "electNightM",
+    "electNightStH", "electNightStS", "electNightG",
+    "electNightUSH", "electNightUSS", "electNightP"
+]
+
+# Display name -> block of the election types with a national view.
+ELECTION_TYPES = {
+    "President": "electNightP",
+    "Senate": "electNightUSS",
+    "Governor": "electNightG",
+    "U.S. House": "electNightUSH",
+    "State House": "electNightStH",
+    "State Senate": "electNightStS",
+}
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    digest: str
+    election_data: dict
+    payload_bytes: int
+    parse_seconds: float
+    cache_hit: bool = False
+    # True when the blocks' tables are read from a TableStore; ``election_data``
+    # then maps each block key to ``None``.
+    stored: bool = False
+
+
+class _LRU:
+    """Tiny thread-safe LRU; Streamlit serves every session from one process."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+
+_savefile_cache = _LRU(maxsize=8)
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def extract_election_data(data: dict) -> dict:
+    """Keep only the ``electNight*`` blocks the toolkit knows how to read."""
+    return {k: data[k] for k in ELECTION_KEYS if k in data}
+
+
+def load_savefile(raw: bytes, cache: _LRU = _savefile_cache, store=None) -> IngestResult:
+    """Parse ``raw`` savefile bytes, reusing a cached result for identical content.
+
+    Only the election blocks are decoded (see ``savefile.extract_keys``).
+    Raises ``json.JSONDecodeError`` for malformed files, like ``json.loads``.
+    With a ``store``, a save found there is not parsed, and a new one is
+    processed into it; both come back ``stored``.  A save the store cannot
+    take is kept in memory instead.
+    """
+    digest = content_hash(raw)
+    if store is not None:
+        blocks = store.blocks(digest)
+        if blocks is not None:
+            return IngestResult(digest, dict.fromkeys(blocks), len(raw), 0.0, cache_hit=True, stored=True)
+    cached = cache.get(digest)
+    if cached is not None:
+        return IngestResult(digest, cached.election_data, cached.payload_bytes,
+                            cached.parse_seconds, cache_hit=True)
+
+    start = time.perf_counter()
+    election_data = extract_keys(raw, ELECTION_KEYS)
+    parse_seconds = time.perf_counter() - start
+    if store is not None:
+        try:
+            store.save(digest, election_data)
+        except Exception:
+            # An unwritable store, or a save Parquet cannot hold (a column of
+            # mixed types), leaves the save in memory, as without one.
+            pass
+        else:
+            return IngestResult(digest, dict.fromkeys(election_data), len(raw), parse_seconds, stored=True)
+    result = IngestResult(digest, election_data, len(raw), parse_seconds)
+    cache.put(digest, result)
+    return result
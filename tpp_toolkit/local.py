@@ -0,0 +1,143 @@
+"""County Elections: the school board, city council and mayor blocks.
+
+These are the largest blocks in a save -- tens of thousands of small races
+-- and every race stands alone, so they are not normalized into
+per-candidate tables like the other blocks.  ``local_races`` streams the
+entries in chunks of ``chunk_size`` races: each chunk's candidates are
+reduced to one summary row per race (winner, runner-up margin, total) with
+the same per-race reductions as ``party_slots``, and only the summaries are
+kept.  Memory grows with the number of races, not candidates, and the
+work per race is constant.
+
+A race's county is its ``county`` field, or the name of its first county
+block.  ``local_aggregates`` orders the summaries by state, county, office
+and district into a ``ResultsTable`` (rated with ``views.rate_table``);
+``seat_tally`` counts the seats each party won per office.
+"""
+import numpy as np
+import pandas as pd
+
+from .aggregate import margin_percent, race_fields
+from .columnar import PARTY_LABELS
+from .states import STATE_NAMES
+from .tables import COUNT, Column, ResultsTable
+from .views import margin_columns, winner_labels
+
+OFFICES = {"electNightSB": "School Board", "electNightCC": "City Council", "electNightM": "Mayor"}
+CHUNK_SIZE = 4096
+
+
+def _race_county(entry):
+    county = entry.get("county")
+    if county is None:
+        blocks = entry.get("counties") or ()
+        county = blocks[0].get("name") if blocks else None
+    return "" if county is None else str(county)
+
+
+def _summarize(chunk):
+    """One summary row per race of ``chunk`` (a list of ``(office, entry)``)."""
+    race, names, parties, votes = [], [], [], []
+    for i, (_, entry) in enumerate(chunk):
+        for c in entry.get("cands", []):
+            race.append(i)
+            names.append(c.get("name", ""))
+            parties.append(c.get("party", ""))
+            votes.append(c.get("votes", 0))
+    cands = pd.DataFrame({
+        "race": np.asarray(race, dtype=np.int64),
+        "name": pd.Series(names, dtype=object),
+        "party": pd.Series(parties, dtype=object),
+        "votes": np.asarray(votes, dtype=np.float64),
+    })
+    fields = race_fields(cands, len(chunk))
+    count = fields["count"].fillna(0).to_numpy(dtype=np.int64)
+    top = np.rint(fields["top_votes"].fillna(0.0).to_numpy())
+    second = np.rint(fields["second_votes"].fillna(0.0).to_numpy())
+    total = fields["combined"].fillna(0.0).to_numpy()
+    margin = np.where(count > 1, top - second, top).astype(np.int64)
+    return pd.DataFrame({
+        "office": [office for office, _ in chunk],
+        "state": [entry.get("state") for _, entry in chunk],
+        "county": [_race_county(entry) for _, entry in chunk],
+        "district": [entry.get("district") for _, entry in chunk],
+        "winner_name": fields["top_name"].fillna("").to_numpy(dtype=object),
+        "winner_party": fields["top_party"].fillna("?").to_numpy(dtype=object),
+        "winner_votes": top.astype(np.int64),
+        "margin": margin,
+        "margin_pct": margin_percent(margin, total),
+        "total": np.rint(total).astype(np.int64),
+        "candidates": count,
+    })
+
+
+def local_races(election_data, chunk_size=CHUNK_SIZE):
+    """Summary frame of every race in the County Elections blocks of ``election_data``.
+
+    Columns: ``office``, ``state``, ``county``, ``district``,
+    ``winner_name``, ``winner_party``, ``winner_votes``, ``margin``
+    (winner minus runner-up, or the winner's vote when unopposed),
+    ``margin_pct``, ``total`` and ``candidates``; in file order.
+    """
+    parts, chunk = [], []
+    for key, office in OFFICES.items():
+        block = election_data.get(key)
+        for entry in block.get("elections", []) if isinstance(block, dict) else ():
+            chunk.append((office, entry))
+            if len(chunk) == chunk_size:
+                parts.append(_summarize(chunk))
+                chunk = []
+    if chunk or not parts:
+        parts.append(_summarize(chunk))
+    races = pd.concat(parts, ignore_index=True)
+    for column in ("office", "state", "county"):
+        races[column] = races[column].astype("category")
+    return races
+
+
+def local_aggregates(races, labels=PARTY_LABELS):
+    """``local_races`` as a ``ResultsTable`` grouped by state, county and office (ratings empty)."""
+    state_order = {code: i for i, code in enumerate(STATE_NAMES)}
+    office_order = {office: i for i, office in enumerate(OFFICES.values())}
+    district = pd.to_numeric(races["district"], errors="coerce")
+    order = np.lexsort((
+        races.index.to_numpy(),
+        district.fillna(np.inf).to_numpy(),
+        races["office"].astype(object).map(office_order).fillna(len(office_order)).to_numpy(),
+        races["county"].astype(str).to_numpy(),
+        races["state"].astype(object).map(state_order).fillna(len(state_order)).to_numpy(),
+    ))
+    ordered = races.iloc[order].reset_index(drop=True)
+
+    columns = (
+        Column("state", "State"), Column("county", "County"), Column("office", "Office"),
+        Column("district", "District"), Column("winner_name", "Name", "Winner"),
+        Column("winner", "Party", "Winner"), Column("winner_votes", "Votes", "Winner", COUNT),
+        *margin_columns(),
+    )
+    rows = pd.DataFrame({
+        "state": ordered["state"].astype(object).map(STATE_NAMES).fillna(ordered["state"].astype(object)),
+        "county": ordered["county"].astype(object),
+        "office": ordered["office"].astype(object),
+        "district": ordered["district"],
+        "winner_name": ordered["winner_name"],
+        "winner_votes": ordered["winner_votes"],
+        "margin": ordered["margin"],
+        "margin_pct": ordered["margin_pct"],
+        "total": ordered["total"],
+        "winner": winner_labels(ordered["winner_party"], labels),
+    })
+    return ResultsTable("County Elections", columns, rows)
+
+
+def seat_tally(table):
+    """Seats won per office (rows) and winning party (columns), with a Total row and column.
+
+    A table without races tallies to a single zero Total.
+    """
+    rows = table.rows
+    offices = [office for office in OFFICES.values() if office in set(rows["office"])] + ["Total"]
+    if rows.empty:
+        return pd.DataFrame({"Total": [0]}, index=pd.Index(offices, name="office")).rename_axis(columns="winner")
+    tally = pd.crosstab(rows["office"], rows["winner"], margins=True, margins_name="Total")
+    return tally.reindex(offices, fill_value=0)
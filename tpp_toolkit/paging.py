@@ -0,0 +1,64 @@
+"""Server-side filtering, sorting and paging of a ``ResultsTable``.
+
+Large views (thousands of legislative districts or local races) are shown a
+page at a time: the rows are filtered and sorted here, and only the page on
+screen is turned into a display frame and sent to the browser.
+
+Filters match the table's row values: ``state`` (as the view stores it),
+``winner`` (the winning party label) and ``rating``.  A table without a
+column is simply not filtered on it.  The totals row sums every row, so it
+is dropped while a filter is active and otherwise follows the last page.
+"""
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+FILTERS = {"state": "State", "winner": "Party", "rating": "Rating"}
+
+
+def filter_options(table):
+    """``{row key: [values]}`` for each filter the table's rows support, in first-seen order."""
+    return {key: list(dict.fromkeys(table.rows[key].dropna().astype(str)))
+            for key in FILTERS if key in table.rows}
+
+
+def filter_rows(table, selected):
+    """``table`` keeping rows whose values are in ``selected[key]`` for every non-empty selection."""
+    mask = np.ones(len(table.rows), dtype=bool)
+    active = False
+    for key, values in selected.items():
+        if values and key in table.rows:
+            mask &= table.rows[key].astype(str).isin(values).to_numpy()
+            active = True
+    if not active:
+        return table
+    return replace(table, rows=table.rows[mask], totals=None)
+
+
+def _sort_values(values):
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().sum() == values.notna().sum():
+        return numeric
+    return values.astype(str).str.lower()
+
+
+def sort_rows(table, key=None, descending=False):
+    """``table`` with rows ordered by ``key`` (stable, blanks last); ``None`` keeps the view's order."""
+    if key is None or key not in table.rows:
+        return table
+    order = _sort_values(table.rows[key].reset_index(drop=True))
+    positions = order.sort_values(ascending=not descending, kind="stable", na_position="last").index
+    return replace(table, rows=table.rows.iloc[positions.to_numpy()])
+
+
+def page_count(table, page_size):
+    return max(1, -(-len(table.rows) // page_size))
+
+
+def page(table, number, page_size):
+    """Rows of 1-based page ``number``; the totals row is shown on the last page only."""
+    number = min(max(int(number), 1), page_count(table, page_size))
+    start = (number - 1) * page_size
+    totals = table.totals if number == page_count(table, page_size) else None
+    return replace(table, rows=table.rows.iloc[start:start + page_size], totals=totals)
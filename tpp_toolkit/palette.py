@@ -0,0 +1,12 @@
+"""Rating palettes: the strengths and parties a palette covers, and the app's default one."""
+
+DEFAULT_COLOR = "#cccccc"
+STRENGTHS = ("Safe", "Likely", "Lean", "Tilt")
+PARTY_NAMES = ("Democratic", "Republican", "Independent")
+
+# The app's starting palette, in the shape of a saved color settings file.
+DEFAULT_COLOR_SETTINGS = {
+    "Democratic": {"Tilt": "#949BB3", "Lean": "#8AAFFF", "Likely": "#577CCC", "Safe": "#1C408C"},
+    "Republican": {"Tilt": "#CF8980", "Lean": "#FF8B98", "Likely": "#FF5865", "Safe": "#BF1D29"},
+    "Independent": {"Tilt": "#FEF4B4", "Lean": "#FED463", "Likely": "#FE9929", "Safe": "#CC4C02"},
+}
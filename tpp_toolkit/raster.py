@@ -0,0 +1,130 @@
+"""PNG/PDF export of colored maps, rendered off the caller's thread and cached.
+
+``cairosvg`` is imported on first use: it needs the native cairo library,
+and an install without it raises ``OSError`` rather than ``ImportError``.
+``available()`` tells whether rasterizing can work at all.
+
+``RasterCache`` runs renders on a small thread pool and keeps finished files
+in a bounded LRU keyed by ``(map, color map hash, format, dpi)``, so asking
+for the same map again is a dict hit and a render in progress is never
+started twice.  Callers poll: ``submit`` returns at once and ``result``
+returns ``None`` until the file is ready.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import threading
+
+FORMATS = {"png": "image/png", "pdf": "application/pdf"}
+DPI_CHOICES = (96, 150, 300)
+BACKGROUND = "black"
+
+_cairosvg = None
+_cairosvg_error = None
+
+
+class RasterUnavailable(RuntimeError):
+    """cairosvg (or the cairo library it wraps) is not installed."""
+
+
+def _load_cairosvg():
+    """The cairosvg module; a failed import is remembered rather than retried every rerun."""
+    global _cairosvg, _cairosvg_error
+    if _cairosvg is not None:
+        return _cairosvg
+    if _cairosvg_error is None:
+        try:
+            import cairosvg
+        except (ImportError, OSError) as exc:
+            _cairosvg_error = RasterUnavailable(f"PNG/PDF export needs cairosvg and the cairo library ({exc})")
+            _cairosvg_error.__cause__ = exc
+        else:
+            _cairosvg = cairosvg
+            return cairosvg
+    raise _cairosvg_error
+
+
+def available():
+    """Whether ``rasterize`` can run here."""
+    try:
+        _load_cairosvg()
+    except RasterUnavailable:
+        return False
+    return True
+
+
+def rasterize(svg_text, fmt="png", dpi=96):
+    """``svg_text`` rendered to PNG at ``dpi`` (96 is the SVG's own pixel size) or to PDF."""
+    cairosvg = _load_cairosvg()
+    data = svg_text.encode("utf-8") if isinstance(svg_text, str) else svg_text
+    if fmt == "png":
+        return cairosvg.svg2png(bytestring=data, scale=dpi / 96, background_color=BACKGROUND)
+    if fmt == "pdf":
+        return cairosvg.svg2pdf(bytestring=data, background_color=BACKGROUND)
+    raise ValueError(f"Unsupported map export format: {fmt!r}")
+
+
+def color_map_hash(color_map):
+    """Order-independent digest of a region -> color mapping."""
+    digest = hashlib.sha1()
+    for region, color in sorted(color_map.items()):
+        digest.update(f"{region}\0{color}\n".encode())
+    return digest.hexdigest()
+
+
+def raster_key(map_id, color_map, fmt, dpi):
+    """Cache key of one export; PDF output does not depend on ``dpi``."""
+    return (map_id, color_map_hash(color_map), fmt, dpi if fmt == "png" else None)
+
+
+class RasterCache:
+    """Bounded LRU of rendered maps filled by a background thread pool."""
+
+    def __init__(self, max_entries=32, max_bytes=128 * 1024 * 1024, workers=2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._done = OrderedDict()
+        self._pending = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="map-raster")
+
+    def submit(self, key, svg_text, fmt="png", dpi=96):
+        """Start rendering ``key`` unless it is cached or already running."""
+        with self._lock:
+            if key in self._done or key in self._pending:
+                return
+            self._pending[key] = self._pool.submit(rasterize, svg_text, fmt, dpi)
+
+    def result(self, key):
+        """The rendered file for ``key``, or ``None`` while it is still rendering.
+
+        A render that failed raises its exception here, once; submitting the
+        key again retries it.
+        """
+        with self._lock:
+            data = self._done.get(key)
+            if data is not None:
+                self._done.move_to_end(key)
+                return data
+            future = self._pending.get(key)
+            if future is None or not future.done():
+                return None
+            del self._pending[key]
+        data = future.result()
+        self._store(key, data)
+        return data
+
+    def pending(self, key):
+        with self._lock:
+            return key in self._pending
+
+    def _store(self, key, data):
+        with self._lock:
+            if key in self._done:
+                return
+            self._done[key] = data
+            self._bytes += len(data)
+            while self._done and (len(self._done) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._done.popitem(last=False)
+                self._bytes -= len(evicted)
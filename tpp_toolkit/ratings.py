@@ -0,0 +1,47 @@
+"""Margin -> rating labels ("Tilt Democratic", "Safe Republican", ...).
+
+``assign_rating`` is the scalar rule.  ``rate`` applies the same rule to whole
+columns: the margin is bucketed against the tilt/lean/likely thresholds with
+``np.searchsorted`` and the label is looked up from a small (level x winner)
+table, so re-rating thousands of rows on a slider move stays in NumPy.
+"""
+import numpy as np
+import pandas as pd
+
+RATING_LEVELS = ("Tilt", "Lean", "Likely", "Safe")
+DEFAULT_THRESHOLDS = (3, 7, 12)
+
+
+def assign_rating(margin, winner, tilt_max, lean_max, likely_max):
+    if margin <= tilt_max:
+        level = "Tilt"
+    elif margin <= lean_max:
+        level = "Lean"
+    elif margin <= likely_max:
+        level = "Likely"
+    else:
+        level = "Safe"
+    return f"{level} {winner}"
+
+
+def rating_levels(margins, tilt_max, lean_max, likely_max):
+    """Index into ``RATING_LEVELS`` for each margin.
+
+    ``margin <= tilt_max`` is Tilt, then Lean, Likely, and Safe above
+    ``likely_max`` (NaN margins are Safe, as every comparison fails).  The
+    running maximum keeps the buckets identical to ``assign_rating``'s if/elif
+    chain even when thresholds are not increasing.
+    """
+    bins = np.maximum.accumulate(np.asarray([tilt_max, lean_max, likely_max], dtype=np.float64))
+    return np.searchsorted(bins, np.asarray(margins, dtype=np.float64), side="left")
+
+
+def rate(margins, winners, tilt_max, lean_max, likely_max):
+    """Vectorized ``assign_rating`` over aligned margin and winner-label arrays."""
+    levels = rating_levels(margins, tilt_max, lean_max, likely_max)
+    codes, labels = pd.factorize(np.asarray(winners, dtype=object), use_na_sentinel=False)
+    if not len(labels):
+        return np.empty(0, dtype=object)
+    table = np.array([[f"{level} {label}" for label in labels] for level in RATING_LEVELS], dtype=object)
+    return table[levels, codes]
+
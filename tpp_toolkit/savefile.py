@@ -0,0 +1,180 @@
+"""Key-selective savefile reader.
+
+A TPP savefile is one large JSON object, and only the ``electNight*`` members
+are used.  Instead of building the whole document with ``json.loads``, the
+top-level object is walked with a byte-level scanner: unwanted values are
+skipped by bracket matching (strings are stepped over whole, so brackets inside
+them are ignored) and only the wanted values are decoded, a window at a time.
+Peak memory is therefore the raw bytes plus the election data, and with
+``read_savefile`` the raw bytes are an ``mmap`` rather than a heap copy.
+
+Skipped top-level strings, numbers and literals are still decoded, so a
+malformed member raises as it would with ``json.loads``; the inside of a
+skipped container is only checked for balanced brackets and terminated strings.
+"""
+import json
+import mmap
+import re
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_STR = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_STRING = re.compile(_STR, re.DOTALL)
+
+
+def _filler_pattern(levels):
+    # Non-string, non-bracket runs and whole strings, plus (recursively) whole
+    # containers nested up to ``levels`` deep.
+    inner = rb'(?:[^"\[\]{}]++|' + _STR + rb')*+'
+    for _ in range(levels):
+        inner = rb'(?:[^"\[\]{}]++|' + _STR + rb'|\{' + inner + rb'\}|\[' + inner + rb'\])*+'
+    return inner
+
+
+# Everything up to the next bracket that is not inside a string or inside a
+# shallow container.  Candidate, county and race records are consumed whole by
+# the regex engine, so the Python loop in _skip_value only runs for the few
+# containers nested deeper than that.
+_FILLER = re.compile(_filler_pattern(3), re.DOTALL)
+_SCALAR = re.compile(rb"[^,}\]\s]*")
+
+_OPEN = frozenset(b"{[")
+_CLOSE = frozenset(b"}]")
+_UTF8_BOM = b"\xef\xbb\xbf"
+_WINDOW = 1 << 20
+_decoder = json.JSONDecoder()
+
+
+def _error(msg, buf, pos):
+    doc = bytes(buf[:pos]).decode("utf-8", "replace")
+    return json.JSONDecodeError(msg, doc, len(doc))
+
+
+def _skip_ws(buf, pos):
+    return _WS.match(buf, pos).end()
+
+
+def _check_scalar(buf, pos, end):
+    """Return ``end`` if ``buf[pos:end]`` is one valid JSON string, number or literal."""
+    try:
+        json.loads(bytes(buf[pos:end]))
+    except ValueError:
+        raise _error("Invalid value", buf, pos) from None
+    return end
+
+
+def _skip_value(buf, pos):
+    """Return the offset just past the JSON value starting at ``pos``."""
+    if pos >= len(buf):
+        raise _error("Expecting value", buf, pos)
+    first = buf[pos]
+    if first == 0x22:  # '"'
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise _error("Unterminated string", buf, pos)
+        return _check_scalar(buf, pos, m.end())
+    if first not in _OPEN:
+        return _check_scalar(buf, pos, _SCALAR.match(buf, pos).end())
+
+    depth = 0
+    size = len(buf)
+    while True:
+        if pos >= size:
+            raise _error("Unterminated container", buf, pos)
+        ch = buf[pos]
+        if ch in _OPEN:
+            depth += 1
+        elif ch in _CLOSE:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        else:  # only an unterminated string stops the filler elsewhere
+            raise _error("Unterminated string", buf, pos)
+        pos = _FILLER.match(buf, pos + 1).end()
+
+
+def _decode_value(buf, pos):
+    """Decode the JSON value at ``pos``; return it with the offset past its end.
+
+    The value is decoded from a text window that grows until it holds the whole
+    value, so wanted blocks are parsed once by the C decoder without first
+    being bracket-matched and without decoding the rest of the file.
+    """
+    size = len(buf)
+    window = _WINDOW
+    while True:
+        end = min(size, pos + window)
+        while end < size and buf[end] & 0xC0 == 0x80:  # keep UTF-8 sequences whole
+            end -= 1
+        text = bytes(buf[pos:end]).decode("utf-8")
+        try:
+            value, idx = _decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            if end == size:
+                raise
+            window *= 4
+            continue
+        if idx == len(text) and end < size:
+            # A number cut by the window decodes as a shorter one; widen and retry.
+            window *= 4
+            continue
+        if not text.isascii():
+            idx = len(text[:idx].encode("utf-8"))
+        return value, pos + idx
+
+
+def extract_keys(buf, keys) -> dict:
+    """Decode only the top-level members of ``buf`` whose names are in ``keys``.
+
+    ``buf`` may be ``bytes`` or any buffer (``mmap``, ``memoryview``).  Raises
+    ``json.JSONDecodeError`` on malformed input, like ``json.loads``, except
+    inside skipped containers, which are only bracket-matched (see the module
+    docstring).  Only a top-level object can hold election data; any other
+    document is validated with ``json.loads`` and yields ``{}``.
+    """
+    wanted = set(keys)
+    pos = 3 if bytes(buf[:3]) == _UTF8_BOM else 0
+    pos = _skip_ws(buf, pos)
+    if pos >= len(buf) or buf[pos] != 0x7B:  # '{'
+        data = json.loads(bytes(buf))
+        return {k: data[k] for k in keys if k in data} if isinstance(data, dict) else {}
+
+    found = {}
+    pos = _skip_ws(buf, pos + 1)
+    if pos < len(buf) and buf[pos] == 0x7D:  # '}'
+        pos += 1
+    else:
+        while True:
+            m = _STRING.match(buf, pos)
+            if m is None:
+                raise _error("Expecting property name enclosed in double quotes", buf, pos)
+            key = json.loads(m.group())
+            pos = _skip_ws(buf, m.end())
+            if pos >= len(buf) or buf[pos] != 0x3A:  # ':'
+                raise _error("Expecting ':' delimiter", buf, pos)
+            start = _skip_ws(buf, pos + 1)
+            if key in wanted:
+                found[key], end = _decode_value(buf, start)
+            else:
+                end = _skip_value(buf, start)
+            pos = _skip_ws(buf, end)
+            if pos < len(buf) and buf[pos] == 0x2C:  # ','
+                pos = _skip_ws(buf, pos + 1)
+                continue
+            if pos < len(buf) and buf[pos] == 0x7D:
+                pos += 1
+                break
+            raise _error("Expecting ',' delimiter", buf, pos)
+
+    if _skip_ws(buf, pos) != len(buf):
+        raise _error("Extra data", buf, pos)
+    # Preserve the canonical key order regardless of file order.
+    return {k: found[k] for k in keys if k in found}
+
+
+def read_savefile(path, keys) -> dict:
+    """Memory-map the savefile at ``path`` and extract ``keys`` from it."""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            raise json.JSONDecodeError("Expecting value", "", 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return extract_keys(buf, keys)
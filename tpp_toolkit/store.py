@@ -0,0 +1,188 @@
+"""On-disk store of processed savefiles, keyed by content hash.
+
+Parsing a savefile and normalizing its blocks is the slow part of opening
+it, and every process (each Streamlit server, each Cloud Run instance)
+used to redo it for every upload.  ``TableStore.save`` writes the columnar
+tables of each ``electNight*`` block (``tpp_toolkit.columnar``) and the
+County Elections summaries (``tpp_toolkit.local``) to Parquet under the
+save's ``content_hash``; a later upload of the same file finds them with
+``TableStore.blocks`` and reads them back memory-mapped, one block at a
+time as views ask for it, without touching JSON::
+
+    <root>/<digest>/manifest.json
+    <root>/<digest>/<block>/races.parquet, candidates.parquet, counties.parquet, county_votes.parquet
+    <root>/<digest>/local.parquet
+
+An entry is written to a temporary folder and renamed into place, so a
+reader never sees half of one.  The store is kept under ``max_bytes`` by
+removing the least recently opened entries (``blocks`` and ``tables`` touch
+the manifest).
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .columnar import ElectionTables, build_tables, district_column
+from .local import OFFICES, local_races
+
+STORE_VERSION = 1
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE_DIR = os.path.join(_REPO_DIR, ".table_store")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Parquet keeps categoricals, except empty ones, which come back as objects.
+TABLES = {
+    "races": ("state",),
+    "candidates": ("name", "party", "caucus"),
+    "counties": ("name",),
+    "county_votes": ("name", "party"),
+}
+MANIFEST = "manifest.json"
+LOCAL = "local.parquet"
+
+
+def _writable_store_dir(root):
+    try:
+        os.makedirs(root, exist_ok=True)
+        return root
+    except OSError:
+        fallback = os.path.join(tempfile.gettempdir(), "tpp_table_store")
+        os.makedirs(fallback, exist_ok=True)
+        return fallback
+
+
+def _write(frame, path):
+    pq.write_table(pa.Table.from_pandas(frame), path, compression="none")
+
+
+def _read(path):
+    return pq.read_table(path, memory_map=True).to_pandas()
+
+
+def _entry_bytes(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file()) + sum(
+        _entry_bytes(entry.path) for entry in os.scandir(path) if entry.is_dir())
+
+
+class TableStore:
+    """Processed savefiles under ``root``, at most ``max_bytes`` of them."""
+
+    def __init__(self, root=DEFAULT_STORE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = _writable_store_dir(root)
+        self.max_bytes = max_bytes
+
+    def _path(self, digest, *parts):
+        return os.path.join(self.root, digest, *parts)
+
+    def _manifest(self, digest):
+        path = self._path(digest, MANIFEST)
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("version") == STORE_VERSION else None
+
+    def _read(self, digest, *parts):
+        # Another process may evict the entry between reading its manifest and its tables.
+        try:
+            return _read(self._path(digest, *parts))
+        except FileNotFoundError:
+            raise KeyError(f"{digest[:12]} was evicted from the store") from None
+
+    def blocks(self, digest):
+        """Keys of the blocks stored for ``digest``, or ``None`` if the save is not in the store."""
+        manifest = self._manifest(digest)
+        return None if manifest is None else tuple(manifest["blocks"])
+
+    def tables(self, digest, key):
+        """``ElectionTables`` of block ``key``; raises ``KeyError`` if it is not stored (or was just evicted)."""
+        manifest = self._manifest(digest)
+        if manifest is None or key not in manifest["blocks"]:
+            raise KeyError(f"{key} of {digest[:12]} is not in the store")
+        frames = {}
+        for name, categorical in TABLES.items():
+            frame = self._read(digest, key, f"{name}.parquet")
+            frames[name] = frame.astype({column: "category" for column in categorical
+                                         if not isinstance(frame[column].dtype, pd.CategoricalDtype)})
+        parties = manifest["blocks"][key]
+        return ElectionTables(**frames, parties=pd.Series(list(parties.values()), index=pd.Index(list(parties)),
+                                                          name="label"))
+
+    def local_races(self, digest):
+        """``local.local_races`` of the save; raises ``KeyError`` if the save has no County Elections."""
+        manifest = self._manifest(digest)
+        if manifest is None or not manifest["local"]:
+            raise KeyError(f"County Elections of {digest[:12]} are not in the store")
+        races = self._read(digest, LOCAL)
+        district = races["district"]
+        if isinstance(district.dtype, pd.api.extensions.ExtensionDtype):
+            district = district.astype(object)
+            races["district"] = district.where(district.notna(), None)
+        return races
+
+    def save(self, digest, election_data):
+        """Process and store every block of ``election_data`` under ``digest`` (a no-op if stored)."""
+        if self.blocks(digest) is not None:
+            return
+        staging = tempfile.mkdtemp(prefix=f".{digest[:12]}.", dir=self.root)
+        try:
+            manifest = {"version": STORE_VERSION, "blocks": {}, "local": False}
+            for key, block in election_data.items():
+                tables = build_tables(block)
+                os.mkdir(os.path.join(staging, key))
+                for name in TABLES:
+                    _write(getattr(tables, name), os.path.join(staging, key, f"{name}.parquet"))
+                manifest["blocks"][key] = tables.parties.to_dict()
+            if any(key in election_data for key in OFFICES):
+                races = local_races(election_data)
+                if races["district"].dtype == object:
+                    # Districts are kept as read, which Parquet needs to be of one type.
+                    races["district"] = district_column(races["district"])
+                _write(races, os.path.join(staging, LOCAL))
+                manifest["local"] = True
+            with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            try:
+                os.replace(staging, self._path(digest))
+            except OSError:
+                # Another process stored the same save first.
+                if self.blocks(digest) is None:
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict(keep=digest)
+
+    def entries(self):
+        """``[(digest, bytes, last opened)]`` of the stored saves, least recently opened first."""
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and not entry.name.startswith("."):
+                try:
+                    opened = os.stat(os.path.join(entry.path, MANIFEST)).st_mtime
+                    entries.append((entry.name, _entry_bytes(entry.path), opened))
+                except OSError:
+                    continue
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self, keep=None):
+        """Remove the least recently opened saves (other than ``keep``) until the store fits ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for digest, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if digest != keep:
+                shutil.rmtree(self._path(digest), ignore_errors=True)
+                total -= size
+        return total
+
+    def clear(self):
+        for digest, _, _ in self.entries():
+            shutil.rmtree(self._path(digest), ignore_errors=True)
@@ -0,0 +1,191 @@
+"""Minified copies of the ``SVG/`` maps, cached on disk by content hash.
+
+The maps are Inkscape output: editor metadata (``<metadata>``,
+``<sodipodi:namedview>``, ``inkscape:*``/``sodipodi:*`` attributes), text
+properties baked into every shape's ``style`` and coordinates with five
+decimals.  ``minify_svg`` drops all of that and rounds path coordinates to
+``precision`` decimals, keeping every element id and ``fill`` declaration so
+the result recolors exactly like the original (see ``tpp_toolkit.svgmaps``).
+
+``minified_path`` builds a map's minified copy on first use and returns its
+path.  Copies are named after the source's content hash, the precision and
+``MINIFIER_VERSION``, so an edited map or a changed minifier never serves a
+stale file.  ``build_assets`` minifies a whole folder ahead of time and
+reports the bytes saved per map::
+
+    python -m tpp_toolkit.svgassets SVG --precision 2
+"""
+from functools import lru_cache
+import hashlib
+import os
+import re
+import tempfile
+
+from .states import STATE_NAMES
+
+MINIFIER_VERSION = 2
+DEFAULT_PRECISION = 2
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SVG_DIR = os.path.join(_REPO_DIR, "SVG")
+DEFAULT_CACHE_DIR = os.path.join(_REPO_DIR, ".svg_cache")
+
+_EDITOR_PREFIXES = ("inkscape", "sodipodi")
+_EDITOR_ELEMENTS = re.compile(
+    r"<(metadata|sodipodi:namedview)\b[^>]*?(?:/>|>.*?</\1\s*>)|<!--.*?-->", re.S
+)
+_EDITOR_ATTR = re.compile(r"""\s+(?:inkscape|sodipodi):[\w.-]+\s*=\s*(?:"[^"]*"|'[^']*')""")
+_XMLNS_ATTR = re.compile(r"""\s+xmlns:([\w.-]+)\s*=\s*(?:"[^"]*"|'[^']*')""")
+_TAG = re.compile(r"<([A-Za-z][\w:.-]*)(\s[^>]*?)?(/?)>")
+# Attribute values may be double- or single-quoted; the output is always
+# double-quoted, which is what ``svgmaps.REGION_TAG`` matches.
+_ATTR = re.compile(r"""([\w:.-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_NUMBER = re.compile(r"-?(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?|-?\d+[eE][-+]?\d+")
+
+_SHAPES = {"path", "rect", "circle", "ellipse", "polygon", "polyline", "line"}
+_COORDINATE_ATTRS = {"d", "points", "transform"}
+# Text and editor properties Inkscape writes into every shape's style; they
+# have no effect on a shape, which has no text and no children to inherit them.
+_INERT_PREFIXES = ("font-", "text-", "-inkscape-")
+_INERT_PROPERTIES = {
+    "line-height", "letter-spacing", "word-spacing", "writing-mode", "direction", "dominant-baseline",
+    "baseline-shift", "white-space", "shape-padding", "shape-inside", "shape-margin", "inline-size",
+    "solid-color", "solid-opacity", "enable-background",
+}
+
+
+def _format_number(match, precision):
+    text = f"{round(float(match.group(0)), precision):.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    return "0" if text in ("-0", "") else text
+
+
+def _prune_style(style):
+    kept = []
+    for declaration in style.split(";"):
+        name = declaration.split(":", 1)[0].strip()
+        if not name or name in _INERT_PROPERTIES or name.startswith(_INERT_PREFIXES):
+            continue
+        kept.append(declaration.strip())
+    return ";".join(kept)
+
+
+def _minify_tag(match, precision):
+    name, attrs, close = match.group(1), match.group(2) or "", match.group(3)
+    shape = name in _SHAPES
+    out = []
+    for attr in _ATTR.finditer(attrs):
+        key = attr.group(1)
+        value = " ".join((attr.group(2) if attr.group(2) is not None else attr.group(3).replace('"', "&quot;")).split())
+        if key in _COORDINATE_ATTRS:
+            value = _NUMBER.sub(lambda m: _format_number(m, precision), value)
+        elif key == "style" and shape:
+            value = _prune_style(value)
+        out.append(f' {key}="{value}"')
+    return f"<{name}{''.join(out)}{close}>"
+
+
+def minify_svg(text, precision=DEFAULT_PRECISION):
+    """``text`` without editor metadata, with coordinates rounded to ``precision`` decimals."""
+    text = _EDITOR_ELEMENTS.sub("", text)
+    text = _EDITOR_ATTR.sub("", text)
+    text = _TAG.sub(lambda m: _minify_tag(m, precision), text)
+    text = re.sub(r">\s+<", "><", text).strip()
+    # Namespace declarations whose prefix is no longer used anywhere
+    used = {prefix for prefix in re.findall(r"[<\s]([\w.-]+):[\w.-]+", text)}
+    text = _XMLNS_ATTR.sub(lambda m: m.group(0) if m.group(1) in used and m.group(1) not in _EDITOR_PREFIXES
+                           else "", text)
+    return text + "\n"
+
+
+def _content_hash(data, precision):
+    digest = hashlib.sha256(data)
+    digest.update(f"\0{precision}\0{MINIFIER_VERSION}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _writable_cache_dir(cache_dir):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
+    except OSError:
+        fallback = os.path.join(tempfile.gettempdir(), "tpp_svg_cache")
+        os.makedirs(fallback, exist_ok=True)
+        return fallback
+
+
+@lru_cache(maxsize=128)
+def _minified_path(path, mtime_ns, size, precision, cache_dir):
+    with open(path, "rb") as f:
+        data = f.read()
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_dir = _writable_cache_dir(cache_dir)
+    target = os.path.join(cache_dir, f"{stem}.{_content_hash(data, precision)}.svg")
+    if not os.path.exists(target):
+        minified = minify_svg(data.decode("utf-8"), precision)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(minified)
+        os.replace(tmp, target)
+    return target
+
+
+def minified_path(path, precision=DEFAULT_PRECISION, cache_dir=DEFAULT_CACHE_DIR):
+    """Path of the minified copy of the SVG at ``path``, building it if needed."""
+    stat = os.stat(path)
+    target = _minified_path(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, precision, cache_dir)
+    if not os.path.exists(target):
+        _minified_path.cache_clear()
+        target = _minified_path(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, precision, cache_dir)
+    return target
+
+
+@lru_cache(maxsize=8)
+def _map_catalog(svg_dir, mtime_ns):
+    return frozenset(name for name in os.listdir(svg_dir) if name.endswith(".svg"))
+
+
+def map_catalog(svg_dir=DEFAULT_SVG_DIR):
+    """File names of the maps in ``svg_dir``, listed once until the folder changes."""
+    try:
+        mtime_ns = os.stat(svg_dir).st_mtime_ns
+    except OSError:
+        return frozenset()
+    return _map_catalog(os.path.abspath(svg_dir), mtime_ns)
+
+
+def build_assets(svg_dir, precision=DEFAULT_PRECISION, cache_dir=DEFAULT_CACHE_DIR):
+    """Minify every map in ``svg_dir``; one ``(map, original_bytes, minified_bytes)`` row per file."""
+    rows = []
+    for name in sorted(map_catalog(svg_dir)):
+        path = os.path.join(svg_dir, name)
+        stem = name[:-4]
+        label = STATE_NAMES.get(stem.upper(), stem)
+        rows.append((label, os.path.getsize(path), os.path.getsize(minified_path(path, precision, cache_dir))))
+    return rows
+
+
+def format_report(rows):
+    """Plain-text table of ``build_assets`` rows with a totals line."""
+    width = max([len(label) for label, _, _ in rows] + [6])
+    lines = [f"{'Map':<{width}}  {'Original':>10}  {'Minified':>10}  {'Saved':>10}  {'%':>6}"]
+    for label, original, minified in rows + [("TOTAL", sum(r[1] for r in rows), sum(r[2] for r in rows))]:
+        saved = original - minified
+        pct = saved / original * 100 if original else 0
+        lines.append(f"{label:<{width}}  {original:>10,}  {minified:>10,}  {saved:>10,}  {pct:>5.1f}%")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Minify the map SVGs into the asset cache.")
+    parser.add_argument("svg_dir", nargs="?", default="SVG")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+    print(format_report(build_assets(args.svg_dir, args.precision, args.cache_dir)))
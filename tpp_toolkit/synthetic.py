@@ -0,0 +1,162 @@
+"""Synthetic savefiles for benchmarks and load testing.
+
+``make_savefile`` builds a dict shaped like a TPP savefile: every
+``electNight*`` block with the fields the toolkit reads (``elections``,
+``state``, ``district``, ``cands`` with ``name``/``party``/``votes``/
+``electoralVotes``, and ``counties``).  At ``scale=1`` the sizes are
+real-world: 435 House districts, 5,411 state house and 1,973 state senate
+districts, and the statewide races broken down over the ~3,100 counties of
+the bundled county maps.  ``scale`` multiplies the race counts (the county
+breakdowns follow the maps), and the same ``seed`` always gives the same
+file::
+
+    python -m tpp_toolkit synth save.json --seed 1 --scale 2
+"""
+import os
+import random
+import re
+
+from .states import STATE_NAMES
+from .svgassets import DEFAULT_SVG_DIR, map_catalog, minified_path
+from .svgmaps import load_template
+
+# 2020 apportionment
+HOUSE_SEATS = {
+    "AL": 7, "AK": 1, "AZ": 9, "AR": 4, "CA": 52, "CO": 8, "CT": 5, "DE": 1, "FL": 28, "GA": 14,
+    "HI": 2, "ID": 2, "IL": 17, "IN": 9, "IA": 4, "KS": 4, "KY": 6, "LA": 6, "ME": 2, "MD": 8,
+    "MA": 9, "MI": 13, "MN": 8, "MS": 4, "MO": 8, "MT": 2, "NE": 3, "NV": 4, "NH": 2, "NJ": 12,
+    "NM": 3, "NY": 26, "NC": 14, "ND": 1, "OH": 15, "OK": 5, "OR": 6, "PA": 17, "RI": 2, "SC": 7,
+    "SD": 1, "TN": 9, "TX": 38, "UT": 4, "VT": 1, "VA": 11, "WA": 10, "WV": 2, "WI": 8, "WY": 1,
+}
+STATES = tuple(HOUSE_SEATS)
+STATE_HOUSE_SEATS = 5411
+STATE_SENATE_SEATS = 1973
+LOCAL_RACES = {"electNightSB": 3000, "electNightCC": 3000, "electNightM": 1000}
+SENATE_RACES = 34
+GOVERNOR_RACES = 36
+
+# Candidate fields by party; repeated parties and third parties exercise the
+# multi-candidate and spill-over slot rules.
+FIELDS = (("D", "R"),) * 6 + (("D", "R", "I"), ("D", "R", "L"), ("D", "D", "R"), ("D", "R", "R", "I"), ("R",), ("D",))
+NOMINEES = (("D", "Avery Collins"), ("R", "Morgan Hale"), ("I", "Jordan Pike"))
+_FIRST = ("Alex", "Blake", "Casey", "Dana", "Eli", "Frances", "Grant", "Harper", "Iris", "Jules",
+          "Kendall", "Logan", "Marisol", "Noel", "Owen", "Parker", "Quinn", "Reese", "Sasha", "Tatum")
+_LAST = ("Abbott", "Baker", "Castillo", "Dalton", "Ellis", "Fischer", "Garza", "Hughes", "Ibarra", "Jensen",
+         "Keller", "Lopez", "Mercer", "Nguyen", "Ortega", "Porter", "Quintero", "Ramsey", "Sutton", "Thornton",
+         "Underwood", "Vance", "Whitaker", "Xiong", "Yates", "Zimmerman", "Bishop", "Carver", "Doyle", "Emery")
+_NON_COUNTY_ID = re.compile(r"\d|^[^A-Z]")
+
+
+def county_names(code, svg_dir=DEFAULT_SVG_DIR, default=20):
+    """County names of state ``code``: its county map's regions, or ``default`` numbered counties."""
+    svg_file = f"{code.lower()}.svg"
+    if svg_file in map_catalog(svg_dir):
+        regions = load_template(minified_path(os.path.join(svg_dir, svg_file))).slot_ids
+        names = [region.replace("_", " ") for region in dict.fromkeys(regions)
+                 if not _NON_COUNTY_ID.search(region) and region != STATE_NAMES[code].replace(" ", "_")]
+        if names:
+            return [name if name.endswith(("County", "Parish", "Borough", "city", "City")) else f"{name} County"
+                    for name in names]
+    return [f"County {i}" for i in range(1, default + 1)]
+
+
+def _name(rng):
+    return f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"
+
+
+def _shares(rng, parties, lean):
+    """Vote shares of a field; ``lean`` > 0 favors Republicans."""
+    weights = []
+    for party in parties:
+        base = {"D": 1 - lean, "R": 1 + lean}.get(party, 0.12)
+        weights.append(max(base * rng.uniform(0.7, 1.3), 0.01))
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def _race(rng, state, district, lean, turnout):
+    parties = rng.choice(FIELDS)
+    names = [_name(rng) for _ in parties]
+    return {
+        "state": state,
+        "district": district,
+        "cands": [
+            {"name": name, "party": party, "votes": int(turnout * share), "incumbent": rng.random() < 0.3,
+             "caucus": party}
+            for party, name, share in zip(parties, names, _shares(rng, parties, lean))
+        ],
+    }
+
+
+def _statewide(rng, state, lean, counties, field=None, electoral_votes=0):
+    """A statewide race broken down by county; statewide votes are the county sums."""
+    parties = [party for party, _ in field] if field else rng.choice(FIELDS)
+    names = [name for _, name in field] if field else [_name(rng) for _ in parties]
+    totals = [0] * len(parties)
+    county_blocks = []
+    for county in counties:
+        size = int(rng.lognormvariate(10, 1.2))
+        shares = _shares(rng, parties, lean + rng.uniform(-0.6, 0.6))
+        votes = [int(size * share) for share in shares]
+        totals = [t + v for t, v in zip(totals, votes)]
+        county_blocks.append({
+            "name": county,
+            "cands": [{"name": name, "party": party, "votes": v} for party, name, v in zip(parties, names, votes)],
+        })
+    cands = [{"name": name, "party": party, "votes": v, "incumbent": rng.random() < 0.3, "caucus": party}
+             for party, name, v in zip(parties, names, totals)]
+    if electoral_votes:
+        winner = max(range(len(cands)), key=lambda i: cands[i]["votes"])
+        for i, cand in enumerate(cands):
+            cand["electoralVotes"] = electoral_votes if i == winner else 0
+    return {"state": state, "district": 0, "cands": cands, "counties": county_blocks}
+
+
+def _spread(total):
+    """``total`` districts dealt round-robin over the states: ``[(state, district number)]``."""
+    per_state = dict.fromkeys(STATES, 0)
+    out = []
+    for i in range(total):
+        state = STATES[i % len(STATES)]
+        per_state[state] += 1
+        out.append((state, per_state[state]))
+    return out
+
+
+def make_savefile(seed=0, scale=1.0, svg_dir=DEFAULT_SVG_DIR):
+    """A synthetic savefile dict with every ``electNight*`` block."""
+    rng = random.Random(seed)
+    lean = {state: rng.uniform(-0.5, 0.5) for state in STATES}
+    counties = {state: county_names(state, svg_dir) for state in STATES}
+
+    def n(count):
+        return max(1, round(count * scale))
+
+    data = {"electNightUSH": {"elections": [
+        _race(rng, state, district, lean[state] + rng.uniform(-0.8, 0.8), rng.randint(150_000, 400_000))
+        for state, seats in HOUSE_SEATS.items() for district in range(1, n(seats) + 1)
+    ]}}
+    data["electNightP"] = {"elections": [
+        _statewide(rng, state, lean[state], counties[state], NOMINEES, HOUSE_SEATS[state] + 2) for state in STATES
+    ]}
+    data["electNightUSS"] = {"elections": [
+        _statewide(rng, state, lean[state], counties[state]) for state in sorted(rng.sample(STATES, SENATE_RACES))
+    ]}
+    data["electNightG"] = {"elections": [
+        _statewide(rng, state, lean[state], counties[state]) for state in sorted(rng.sample(STATES, GOVERNOR_RACES))
+    ]}
+    for key, seats in (("electNightStH", STATE_HOUSE_SEATS), ("electNightStS", STATE_SENATE_SEATS)):
+        data[key] = {"elections": [
+            _race(rng, state, district, lean[state] + rng.uniform(-1, 1), rng.randint(8_000, 80_000))
+            for state, district in _spread(n(seats))
+        ]}
+    for key, races in LOCAL_RACES.items():
+        elections = []
+        for state, district in _spread(n(races)):
+            race = _race(rng, state, district, lean[state] + rng.uniform(-1, 1), rng.randint(1_000, 40_000))
+            race["counties"] = [{"name": rng.choice(counties[state]), "cands": [
+                {"name": c["name"], "party": c["party"], "votes": c["votes"]} for c in race["cands"]
+            ]}]
+            elections.append(race)
+        data[key] = {"elections": elections}
+    return data
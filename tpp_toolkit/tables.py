@@ -0,0 +1,99 @@
+"""Numeric results tables behind the on-screen views and spreadsheet exports.
+
+A ``ResultsTable`` keeps votes, percentages and margins as numbers.  Its
+columns carry a two-level header (a group such as "Democratic" or "Margins &
+Rating" over a per-column label) and a ``kind`` that decides formatting, which
+happens only at the edges: ``styler`` for display and the openpyxl number
+formats in ``tpp_toolkit.xlsx`` for export.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TEXT = "text"
+COUNT = "count"
+PERCENT = "percent"
+
+DISPLAY_FORMATS = {COUNT: "{:,.0f}", PERCENT: "{:.2f}%"}
+
+
+@dataclass(frozen=True)
+class Column:
+    key: str
+    label: str = ""
+    group: str = ""
+    kind: str = TEXT
+    na_rep: str = ""
+
+
+@dataclass(frozen=True)
+class ResultsTable:
+    """Rows keyed by ``Column.key`` plus an optional bold totals row."""
+
+    title: str
+    columns: tuple
+    rows: pd.DataFrame
+    totals: dict = None
+
+    def group_spans(self):
+        """``(group, first, last)`` column positions for each header group."""
+        spans = []
+        for i, column in enumerate(self.columns):
+            if column.group and spans and spans[-1][0] == column.group and i == spans[-1][2] + 1 and column.label:
+                spans[-1] = (column.group, spans[-1][1], i)
+            elif column.group:
+                spans.append((column.group, i, i))
+        return spans
+
+    def labels(self, qualified=False):
+        """Flat, unique column labels: the two header rows joined as "Group - Label".
+
+        On screen only the first column of a group is qualified ("Democratic -
+        Votes", then "%"); ``qualified`` names every grouped column that way,
+        for files read without the two-level header.
+        """
+        starts = {first for _, first, _ in self.group_spans()}
+        used, labels = {}, []
+        for i, column in enumerate(self.columns):
+            if column.group and column.label and (qualified or i in starts):
+                label = f"{column.group} - {column.label}"
+            else:
+                label = column.label or column.group or "Unnamed"
+            if label in used:
+                used[label] += 1
+                label = f"{label} ({used[label]})"
+            else:
+                used[label] = 1
+            labels.append(label)
+        return labels
+
+    def column_values(self, column):
+        """Data values for ``column`` followed by its totals-row value."""
+        values = self.rows[column.key] if column.key in self.rows else pd.Series([None] * len(self.rows))
+        if self.totals is not None:
+            total = pd.Series([self.totals.get(column.key)])
+            # No rows: the totals row alone (concat would type it by an empty piece).
+            values = pd.concat([values.reset_index(drop=True), total], ignore_index=True) if len(values) else total
+        return values.reset_index(drop=True)
+
+    def frame(self):
+        """Display DataFrame: numeric columns stay numeric, text columns are ``str``."""
+        data = {}
+        for label, column in zip(self.labels(), self.columns):
+            values = self.column_values(column)
+            if column.kind == TEXT:
+                data[label] = values.map(lambda v: "" if v is None or (isinstance(v, float) and np.isnan(v)) else str(v))
+            else:
+                data[label] = pd.to_numeric(values, errors="coerce")
+        return pd.DataFrame(data)
+
+    def styler(self, frame=None):
+        """``frame`` (default ``self.frame()``) with per-kind display formats."""
+        frame = self.frame() if frame is None else frame
+        styler = frame.style
+        for label, column in zip(frame.columns, self.columns):
+            fmt = DISPLAY_FORMATS.get(column.kind)
+            if fmt is not None:
+                styler = styler.format(fmt, subset=[label], na_rep=column.na_rep)
+        return styler
@@ -0,0 +1,263 @@
+"""``ResultsTable`` builders for the national and county views.
+
+Each builder turns the aggregates from ``tpp_toolkit.aggregate`` into the rows,
+two-level header and totals row of one spreadsheet view.  Building happens in
+two steps so a threshold change does not redo the aggregation: the
+``*_aggregates`` functions depend only on the data and leave the Rating column
+empty, keeping each row's winner label in a ``winner`` field; ``rate_table``
+then fills in the ratings for a ``(tilt_max, lean_max, likely_max)`` triple.
+``house_table`` and friends do both.
+"""
+from dataclasses import replace
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import county_results, county_results_by_race, margin_percent, party_slots, statewide_party_votes
+from .columnar import PARTY_LABELS
+from .ratings import assign_rating, rate
+from .states import STATE_NAMES
+from .tables import COUNT, PERCENT, Column, ResultsTable
+
+MARGIN_GROUP = "Margins & Rating"
+
+
+def margin_columns():
+    """The "Margins & Rating" columns every results table ends with."""
+    return [
+        Column("margin", "Margin #", MARGIN_GROUP, COUNT),
+        Column("margin_pct", "Margin %", MARGIN_GROUP, PERCENT),
+        Column("total", "Total Vote", MARGIN_GROUP, COUNT),
+        Column("rating", "Rating", MARGIN_GROUP),
+    ]
+
+
+def _pct(votes, total):
+    return round(votes / total * 100, 2) if total else 0
+
+
+def winner_labels(parties, labels):
+    """Party codes shown through ``labels`` (unknown codes as-is)."""
+    parties = pd.Series(np.asarray(parties, dtype=object))
+    return parties.map(labels).fillna(parties).to_numpy()
+
+
+def _totals_margin(totals, grand_total, labels):
+    """Margin, margin % and winner label of a totals row from per-party vote sums."""
+    ranked = heapq.nlargest(2, totals.items(), key=lambda x: x[1])
+    margin = ranked[0][1] - (ranked[1][1] if len(ranked) > 1 else 0) if ranked else 0
+    winner = ranked[0][0] if ranked else ""
+    return {
+        "margin": margin,
+        "margin_pct": _pct(margin, grand_total),
+        "total": int(round(grand_total)),
+        "winner": labels.get(winner, winner),
+    }
+
+
+def rate_table(table, thresholds):
+    """``table`` from an ``*_aggregates`` builder with its ratings filled in."""
+    rows = table.rows.assign(rating=rate(table.rows["margin_pct"], table.rows["winner"], *thresholds))
+    if table.totals is None:
+        return replace(table, rows=rows)
+    totals = dict(table.totals)
+    totals["rating"] = assign_rating(totals["margin_pct"], totals["winner"], *thresholds)
+    return replace(table, rows=rows, totals=totals)
+
+
+def _slot_table(title, lead_columns, lead_rows, lead_totals, slots, party_order, seat_party,
+                labels=PARTY_LABELS):
+    """Shared layout of the D/R/I summary views (House, Senate/Governor, legislatures)."""
+    columns = list(lead_columns)
+    rows = dict(lead_rows)
+    totals = dict(lead_totals)
+    total = slots["total"].to_numpy(dtype=np.float64)
+    grand_total = float(total.sum())
+    seats = slots[seat_party].value_counts()
+    party_totals = {}
+    for party in party_order:
+        label = labels.get(party, party)
+        columns += [
+            Column(f"{party}_name", "Candidate", label),
+            Column(f"{party}_votes", "#", label, COUNT),
+            Column(f"{party}_pct", "%", label, PERCENT),
+        ]
+        votes = np.rint(slots[f"{party}_votes"].to_numpy(dtype=np.float64)).astype(np.int64)
+        rows[f"{party}_name"] = slots[f"{party}_name"].to_numpy()
+        rows[f"{party}_votes"] = votes
+        rows[f"{party}_pct"] = margin_percent(votes, total)
+        party_totals[party] = int(votes.sum())
+        totals[f"{party}_name"] = f"{int(seats.get(party, 0))} seats"
+        totals[f"{party}_votes"] = party_totals[party]
+        totals[f"{party}_pct"] = _pct(party_totals[party], grand_total)
+
+    columns += margin_columns()
+    rows["margin"] = slots["margin"].to_numpy()
+    rows["margin_pct"] = slots["margin_pct"].to_numpy()
+    rows["total"] = np.rint(total).astype(np.int64)
+    rows["winner"] = winner_labels(slots["slot_winner"], labels)
+    totals.update(_totals_margin(party_totals, grand_total, labels))
+    return ResultsTable(title, tuple(columns), pd.DataFrame(rows), totals)
+
+
+def house_aggregates(tables, party_order=("D", "R", "I")):
+    """U.S. House national view: one row per district, seats by top candidate's party."""
+    slots = party_slots(tables, party_order)
+    lead_columns = [Column("state", "State"), Column("district", "District")]
+    lead_rows = {
+        "state": slots["state"].fillna("??").to_numpy(),
+        "district": slots["district"].where(slots["district"].notna(), "?").to_numpy(),
+    }
+    return _slot_table("U.S. House National View", lead_columns, lead_rows, {"state": "TOTALS", "district": ""},
+                       slots, party_order, "winner_party")
+
+
+def statewide_aggregates(tables, election_type, party_order=("D", "R", "I")):
+    """Senate/Governor national view: one row per race, seats by leading slot."""
+    slots = party_slots(tables, party_order)
+    codes = slots["state"].fillna("???")
+    lead_rows = {"state": codes.map(lambda code: STATE_NAMES.get(code, code)).to_numpy()}
+    return _slot_table(f"{election_type} National View", [Column("state", "State")], lead_rows,
+                       {"state": "TOTALS"}, slots, party_order, "slot_winner")
+
+
+def legislature_aggregates(tables, election_type, party_order=("D", "R", "I")):
+    """State House/Senate national view: districts in numeric order, numbered from 1."""
+    slots = party_slots(tables, party_order)
+    slots = slots.iloc[pd.to_numeric(slots["district"]).fillna(0).argsort(kind="stable")]
+    # ``state`` is not shown, but lets the paged view filter districts by state.
+    lead_rows = {"district": np.arange(1, len(slots) + 1), "state": slots["state"].fillna("??").to_numpy()}
+    return _slot_table(f"{election_type} National View", [Column("district", group="District")], lead_rows,
+                       {"district": "TOTALS"}, slots, party_order, "winner_party")
+
+
+def presidential_aggregates(tables, labels=PARTY_LABELS):
+    """Presidential national view: party votes, % and electoral votes per state.
+
+    Parties and nominee names come from the first race.  A state's electoral
+    votes are shown only under its winning party ("-" elsewhere).
+    """
+    first = tables.candidates[tables.candidates["race"] == 0]
+    nominees = dict(zip(first["party"].astype(object), first["name"].astype(object)))
+    parties = list(nominees)
+
+    results, _ = statewide_party_votes(tables, nominees=nominees)
+    # The last entry listed for a state wins, as with a dict keyed by state.
+    by_state = results.drop_duplicates("state", keep="last").set_index("state")
+    by_state = by_state.loc[[code for code in STATE_NAMES if code in by_state.index]]
+
+    columns = [Column("state", "State"), Column("electoral_votes", "Electoral Votes", kind=COUNT)]
+    total = by_state["total"].to_numpy(dtype=np.float64)
+    winner = by_state["winner_party"].to_numpy(dtype=object)
+    rows = {
+        "state": [STATE_NAMES[code] for code in by_state.index],
+        "electoral_votes": by_state["electoral_votes"].to_numpy(dtype=np.int64),
+    }
+    totals = {"state": "TOTALS", "electoral_votes": int(rows["electoral_votes"].sum())}
+    party_totals = {}
+    for party in parties:
+        group = labels.get(party, party)
+        columns += [
+            Column(f"{party}_votes", nominees[party], group, COUNT),
+            Column(f"{party}_pct", "%", group, PERCENT),
+            Column(f"{party}_ev", "#", group, COUNT, na_rep="-"),
+        ]
+        votes = np.rint(by_state[f"{party}_votes"].to_numpy(dtype=np.float64)).astype(np.int64)
+        ev = by_state[f"{party}_ev"].to_numpy(dtype=np.float64)
+        won = winner == party
+        rows[f"{party}_votes"] = votes
+        rows[f"{party}_pct"] = margin_percent(votes, total)
+        rows[f"{party}_ev"] = np.where(won, ev, np.nan)
+        party_totals[party] = int(votes.sum())
+        totals[f"{party}_ev"] = int(ev[won].sum())
+
+    grand_total = sum(party_totals.values())
+    for party in parties:
+        totals[f"{party}_votes"] = party_totals[party]
+        totals[f"{party}_pct"] = _pct(party_totals[party], grand_total)
+
+    columns += margin_columns()
+    rows["margin"] = by_state["margin"].to_numpy(dtype=np.int64)
+    rows["margin_pct"] = by_state["margin_pct"].to_numpy()
+    rows["total"] = np.rint(total).astype(np.int64)
+    rows["winner"] = winner_labels(winner, labels)
+    totals.update(_totals_margin(party_totals, grand_total, labels))
+    return ResultsTable("Presidential National View", tuple(columns), pd.DataFrame(rows), totals)
+
+
+def county_aggregates(tables, race, labels=PARTY_LABELS):
+    """County-by-candidate view of one statewide race, or ``None`` without county data."""
+    results = county_results(tables, race)
+    return None if results is None else _county_table(tables, race, results, labels)
+
+
+def county_aggregates_by_state(tables, labels=PARTY_LABELS):
+    """``{state code: county_aggregates}`` of each state's first race, for every state with county data.
+
+    All states are aggregated in one pass (``county_results_by_race``), so
+    switching the state view afterwards is a dict lookup.
+    """
+    first_races = tables.races.index.to_series().groupby(tables.races["state"], observed=True).first()
+    results = county_results_by_race(tables, first_races.to_numpy())
+    return {state: _county_table(tables, race, results[race], labels)
+            for state, race in first_races.items() if race in results}
+
+
+def _county_table(tables, race, results, labels):
+    ordered, frame, county_totals = results
+    state_code = tables.races["state"].iloc[race]
+
+    columns = [Column("county", "County")]
+    rows = {"county": frame["county"].to_numpy()}
+    totals = {"county": "TOTALS"}
+    total = frame["total"].to_numpy(dtype=np.float64)
+    grand_total = county_totals["total"]
+    for i, (party, name) in enumerate(ordered):
+        group = labels.get(party, party)
+        columns += [Column(f"c{i}_votes", name, group, COUNT), Column(f"c{i}_pct", "%", group, PERCENT)]
+        rows[f"c{i}_votes"] = frame[i].to_numpy()
+        rows[f"c{i}_pct"] = margin_percent(frame[i], total)
+        votes = int(round(county_totals["votes"][i]))
+        totals[f"c{i}_votes"] = votes
+        totals[f"c{i}_pct"] = _pct(votes, grand_total)
+
+    columns += margin_columns()
+    rows["margin"] = frame["margin"].to_numpy()
+    rows["margin_pct"] = frame["margin_pct"].to_numpy()
+    rows["total"] = np.rint(total).astype(np.int64)
+    rows["winner"] = winner_labels(frame["winner_party"], labels)
+    winner = county_totals["winner_party"]
+    totals.update({
+        "margin": county_totals["margin"],
+        "margin_pct": county_totals["margin_pct"],
+        "total": int(round(grand_total)),
+        "winner": labels.get(winner, winner),
+    })
+    return ResultsTable(f"{state_code} County Results", tuple(columns), pd.DataFrame(rows), totals)
+
+
+def house_table(tables, thresholds, party_order=("D", "R", "I")):
+    """``house_aggregates`` rated for ``thresholds``."""
+    return rate_table(house_aggregates(tables, party_order), thresholds)
+
+
+def statewide_table(tables, election_type, thresholds, party_order=("D", "R", "I")):
+    """``statewide_aggregates`` rated for ``thresholds``."""
+    return rate_table(statewide_aggregates(tables, election_type, party_order), thresholds)
+
+
+def legislature_table(tables, election_type, thresholds, party_order=("D", "R", "I")):
+    """``legislature_aggregates`` rated for ``thresholds``."""
+    return rate_table(legislature_aggregates(tables, election_type, party_order), thresholds)
+
+
+def presidential_table(tables, thresholds, labels=PARTY_LABELS):
+    """``presidential_aggregates`` rated for ``thresholds``."""
+    return rate_table(presidential_aggregates(tables, labels), thresholds)
+
+
+def county_table(tables, race, thresholds, labels=PARTY_LABELS):
+    """``county_aggregates`` rated for ``thresholds``, or ``None`` without county data."""
+    table = county_aggregates(tables, race, labels)
+    return None if table is None else rate_table(table, thresholds)